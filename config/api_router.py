@@ -3,6 +3,7 @@ from rest_framework.routers import DefaultRouter
 from rest_framework.routers import SimpleRouter
 
 from webull_backend.company.api.urls import urlpatterns
+from webull_backend.polygon.api.urls import urlpatterns as polygon_urlpatterns
 from webull_backend.users.api.views import UserViewSet
 
 router = DefaultRouter() if settings.DEBUG else SimpleRouter()
@@ -11,4 +12,4 @@ router.register("users", UserViewSet)
 
 
 app_name = "api"
-urlpatterns = router.urls + urlpatterns
+urlpatterns = router.urls + urlpatterns + polygon_urlpatterns
@@ -31,6 +31,21 @@ django_application = get_asgi_application()
 
 # Import websocket application here, so apps from django_application are loaded first
 from config.websocket import websocket_application
+from webull_backend.polygon.client import close_clients
+
+
+async def lifespan_application(scope, receive, send):
+    """
+    Closes the pooled Polygon connections of the worker when the server shuts down.
+    """
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await close_clients()
+            await send({"type": "lifespan.shutdown.complete"})
+            return
 
 
 async def application(scope, receive, send):
@@ -38,6 +53,8 @@ async def application(scope, receive, send):
         await django_application(scope, receive, send)
     elif scope["type"] == "websocket":
         await websocket_application(scope, receive, send)
+    elif scope["type"] == "lifespan":
+        await lifespan_application(scope, receive, send)
     else:
         msg = f"Unknown scope type {scope['type']}"
         raise NotImplementedError(msg)
@@ -81,6 +81,7 @@ THIRD_PARTY_APPS = [
     "rest_framework.authtoken",
     "corsheaders",
     "drf_spectacular",
+    "adrf",
 ]
 
 LOCAL_APPS = [
@@ -88,6 +89,7 @@ LOCAL_APPS = [
     "webull_backend.tickers.apps.TickersConfig",
     "webull_backend.exchanges.apps.ExchangesConfig",
     "webull_backend.company.apps.CompanyConfig",
+    "webull_backend.polygon.apps.PolygonConfig",
     # Your stuff: custom apps go here
 ]
 # https://docs.djangoproject.com/en/dev/ref/settings/#installed-apps
@@ -309,3 +311,44 @@ SPECTACULAR_SETTINGS = {
 }
 # Your stuff...
 # ------------------------------------------------------------------------------
+# Listing files loaded by `extract_tickers`, keyed by exchange MIC. Values are paths
+# or glob patterns, e.g. TICKER_SOURCES="NYSE=/data/nyse.csv,OTC=/data/otc-*.csv"
+TICKER_SOURCES = env.dict(
+    "TICKER_SOURCES",
+    default={
+        "NYSE": str(APPS_DIR / "tickers" / "management" / "commands" / "nyse.csv"),
+    },
+)
+# Polygon API used for price history; the synchronous client reads the key from the
+# same POLYGON_API_KEY environment variable
+POLYGON_API_KEY = env("POLYGON_API_KEY", default="")
+POLYGON_API_URL = env("POLYGON_API_URL", default="https://api.polygon.io")
+# Keep-alive connections pooled per worker, and requests in flight per worker
+POLYGON_MAX_CONNECTIONS = env.int("POLYGON_MAX_CONNECTIONS", default=100)
+POLYGON_MAX_CONCURRENCY = env.int("POLYGON_MAX_CONCURRENCY", default=100)
+# Timeout of each Polygon request, in seconds
+POLYGON_TIMEOUT = env.float("POLYGON_TIMEOUT", default=10.0)
+# Requests per minute allowed by the Polygon plan, shared by every worker, and the
+# burst of requests allowed at once
+POLYGON_RATE_LIMIT = env.int("POLYGON_RATE_LIMIT", default=100)
+POLYGON_RATE_BURST = env.int("POLYGON_RATE_BURST", default=10)
+# Seconds a request waits for the rate limit before failing with a 503
+POLYGON_RATE_LIMIT_WAIT = env.float("POLYGON_RATE_LIMIT_WAIT", default=2.0)
+# The circuit breaker opens after THRESHOLD upstream failures within WINDOW seconds,
+# and fails fast for RESET seconds before trying Polygon again
+POLYGON_BREAKER_THRESHOLD = env.int("POLYGON_BREAKER_THRESHOLD", default=5)
+POLYGON_BREAKER_WINDOW = env.float("POLYGON_BREAKER_WINDOW", default=60.0)
+POLYGON_BREAKER_RESET = env.float("POLYGON_BREAKER_RESET", default=30.0)
+# Seconds history stays fresh while it includes an open session, and once all of
+# its sessions are closed; a history entry is then served stale for up to
+# POLYGON_HISTORY_STALE_TTL seconds while it is refreshed in the background
+POLYGON_HISTORY_INTRADAY_TTL = env.int("POLYGON_HISTORY_INTRADAY_TTL", default=60)
+POLYGON_HISTORY_FINAL_TTL = env.int("POLYGON_HISTORY_FINAL_TTL", default=60 * 60 * 24)
+POLYGON_HISTORY_STALE_TTL = env.int("POLYGON_HISTORY_STALE_TTL", default=120)
+# Companies per page of the company lists, and the largest page a client can ask
+# for with the page_size query parameter
+COMPANY_PAGE_SIZE = env.int("COMPANY_PAGE_SIZE", default=100)
+COMPANY_MAX_PAGE_SIZE = env.int("COMPANY_MAX_PAGE_SIZE", default=1000)
+# Whether an endpoint running more queries than its query budget raises, rather
+# than logging a warning
+QUERY_BUDGET_RAISE = env.bool("QUERY_BUDGET_RAISE", default=False)
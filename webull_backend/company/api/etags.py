@@ -0,0 +1,94 @@
+"""
+Module for computing the ETags of the company endpoints.
+
+Clients polling an endpoint send back the ETag of their last response in
+`If-None-Match`, and get an empty 304 response while it still matches. The ETags
+are computed from cheap summaries of the data a response shows, without building
+the response:
+
+* a page of a company list from the keys and `updated_at` of the companies of the
+  page and of their tickers, read through the same cursor as the page but without
+  serializing it, so checking the ETag does not count the table either;
+* a company detail from the `updated_at` of the company and its ticker, the
+  version of its cached history and the history options.
+
+No Last-Modified is sent: deleting a company or refreshing a history does not move
+any `updated_at`, so `If-Modified-Since` alone would answer 304 for changed data.
+"""
+
+import hashlib
+
+from django.utils.http import quote_etag  # pylint: disable=E0401
+
+from webull_backend.company.models import Company  # pylint: disable=E0402
+
+
+def make_etag(*parts: object) -> str:
+    """
+    Returns a strong ETag digesting some values.
+
+    Args:
+        *parts (object): The values the resource depends on.
+
+    Returns:
+        str: The quoted ETag.
+    """
+    content = "|".join(str(part) for part in parts).encode()
+    return quote_etag(hashlib.blake2b(content, digest_size=16).hexdigest())
+
+
+def companies_etag(request, *args, **kwargs) -> str:
+    """
+    Returns the ETag of a page of a company list; used with `condition`.
+
+    Args:
+        request (Request): The HTTP request of a list view.
+        *args: The positional arguments of the view.
+        **kwargs: The keyword arguments of the view.
+
+    Returns:
+        str: The ETag.
+    """
+    view = request.parser_context["view"]
+    rows = view.paginator.paginate_queryset(
+        view.get_queryset().values(
+            "uuid",
+            "created_at",
+            "updated_at",
+            "ticker__updated_at",
+        ),
+        request,
+        view=view,
+    )
+    # A deleted company changes the keys of its page even when no other row moves,
+    # and the links change with the rows around the page
+    return make_etag(
+        view.paginator.has_next,
+        view.paginator.has_previous,
+        *(
+            f"{row['uuid']}:{row['updated_at']}:{row['ticker__updated_at']}"
+            for row in rows
+        ),
+    )
+
+
+def company_etag(company: Company, history_version: str, options: dict) -> str:
+    """
+    Returns the ETag of a company detail.
+
+    Args:
+        company (Company): The company, with its ticker.
+        history_version (str): The version of the cached history.
+        options (dict): The validated history options.
+
+    Returns:
+        str: The ETag.
+    """
+    return make_etag(
+        company.pk,
+        company.updated_at,
+        company.ticker.updated_at,
+        history_version,
+        options["interval"],
+        ",".join(str(indicator) for indicator in options["indicators"]),
+    )
@@ -0,0 +1,38 @@
+"""
+Module for paginating the company lists.
+"""
+
+from django.conf import settings  # pylint: disable=E0401
+from rest_framework.pagination import CursorPagination  # pylint: disable=E0401
+
+
+class CompanyCursorPagination(CursorPagination):
+    """
+    Keyset pagination of companies, oldest first.
+
+    The cursor holds the creation time of the last company of the page, and the
+    next page is read from the `(created_at, uuid)` index from there on. Pages
+    cost the same wherever they start: there is no OFFSET to skip the previous
+    rows and no COUNT of the table.
+    """
+
+    ordering = ("created_at", "uuid")
+    page_size_query_param = "page_size"
+
+    def get_page_size(self, request) -> int:
+        """
+        Returns the size of the requested page.
+
+        Args:
+            request (Request): The HTTP request, with an optional `page_size`.
+        Returns:
+            int: The requested size, capped at `COMPANY_MAX_PAGE_SIZE`, or
+            `COMPANY_PAGE_SIZE` when none or an invalid one is requested.
+        """
+        try:
+            page_size = int(request.query_params[self.page_size_query_param])
+        except (KeyError, ValueError):
+            return settings.COMPANY_PAGE_SIZE
+        if page_size <= 0:
+            return settings.COMPANY_PAGE_SIZE
+        return min(page_size, settings.COMPANY_MAX_PAGE_SIZE)
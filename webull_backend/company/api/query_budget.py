@@ -0,0 +1,158 @@
+"""
+Module for capping the number of database queries of an endpoint.
+
+A view with the `QueryBudgetMixin` counts the queries it runs while handling a
+request, including those run by async views in worker threads, and compares them
+to its `query_budget`. Going over the budget is logged; with
+`QUERY_BUDGET_RAISE`, as in the test settings, it raises `QueryBudgetExceeded`
+instead, so an N+1 query pattern fails the tests of the endpoint.
+
+Queries are counted by a wrapper installed on every database connection, which
+increments the counter of the current request, if any; the counter is a context
+variable, so `sync_to_async` carries it to the thread running the queries.
+"""
+
+import logging
+from collections.abc import Callable
+from collections.abc import Iterator
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any
+
+from django.conf import settings  # pylint: disable=E0401
+from django.db.backends.signals import connection_created  # pylint: disable=E0401
+from django.dispatch import receiver  # pylint: disable=E0401
+
+logger = logging.getLogger(__name__)
+
+
+class QueryCounter:
+    """
+    Number of queries of a request, and the number it is allowed.
+    """
+
+    def __init__(self, budget: int):
+        """
+        Initializes the counter.
+
+        Args:
+            budget (int): The maximum number of queries.
+        """
+        self.queries = 0
+        self.budget = budget
+
+
+# Counter of the request being handled; the threads the context is copied to
+# update the same counter
+_counter: ContextVar[QueryCounter | None] = ContextVar("counter", default=None)
+
+
+class QueryBudgetExceeded(Exception):  # noqa: N818
+    """
+    Raised when an endpoint runs more queries than its budget allows.
+    """
+
+
+def count_query(
+    execute: Callable[..., Any],
+    sql: str,
+    params: Any,
+    many: bool,  # noqa: FBT001
+    context: dict[str, Any],
+) -> Any:
+    """
+    Counts a query in the current request's counter; installed on every connection.
+
+    The signature is the one Django calls execute wrappers with.
+    """
+    counter = _counter.get()
+    if counter is not None:
+        counter.queries += 1
+    return execute(sql, params, many, context)
+
+
+@receiver(connection_created)
+def install_query_counter(sender, connection, **kwargs) -> None:
+    """
+    Installs the query counter on a new database connection.
+    """
+    if count_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(count_query)
+
+
+def allow_queries(queries: int) -> None:
+    """
+    Raises the budget of the current request, for work that grows with the request
+    rather than with the data, e.g. one history per requested company.
+
+    Args:
+        queries (int): The number of queries to allow.
+    """
+    counter = _counter.get()
+    if counter is not None:
+        counter.budget += queries
+
+
+@contextmanager
+def query_budget(budget: int, name: str) -> Iterator[QueryCounter]:
+    """
+    Counts the queries run in a block and checks them against a budget.
+
+    Args:
+        budget (int): The maximum number of queries.
+        name (str): The name of the endpoint, for the logs.
+    Yields:
+        QueryCounter: The counter.
+    Raises:
+        QueryBudgetExceeded: If the block ran more queries than the budget and
+            `QUERY_BUDGET_RAISE` is set.
+    """
+    counter = QueryCounter(budget)
+    token = _counter.set(counter)
+    try:
+        yield counter
+    finally:
+        _counter.reset(token)
+
+    if counter.queries > counter.budget:
+        msg = (
+            f"{name} ran {counter.queries} queries, "
+            f"over its budget of {counter.budget}"
+        )
+        if settings.QUERY_BUDGET_RAISE:
+            raise QueryBudgetExceeded(msg)
+        logger.warning(msg)
+
+
+class QueryBudgetMixin:
+    """
+    Mixin for API views capping the number of queries of each request.
+
+    Attributes:
+        query_budget: The maximum number of queries of a request, including the
+            authentication and the transaction savepoints; None to not count them.
+    """
+
+    query_budget: int | None = None
+
+    def dispatch(self, request, *args, **kwargs):
+        """
+        Handles a request, counting its queries.
+        """
+        # The mixin comes before a view class, which defines dispatch
+        dispatch = super().dispatch  # type: ignore[misc]
+        budget = self.query_budget
+        if budget is None:
+            return dispatch(request, *args, **kwargs)
+
+        name = type(self).__name__
+        if getattr(self, "view_is_async", False):
+
+            async def budgeted():
+                with query_budget(budget, name):
+                    return await dispatch(request, *args, **kwargs)
+
+            return budgeted()
+
+        with query_budget(budget, name):
+            return dispatch(request, *args, **kwargs)
@@ -1,17 +1,20 @@
-import json
-from typing import cast
-
-from polygon import RESTClient  # API client for interacting with Polygon APIs
 from rest_framework import serializers
-from urllib3 import HTTPResponse
 
 from webull_backend.company.models import Company
 from webull_backend.company.models import Ticker
-from webull_backend.company.utils import get_current_date
-from webull_backend.company.utils import get_current_date_minus_n_days
+from webull_backend.company.utils import get_history_range
+from webull_backend.polygon.history import get_history
+from webull_backend.polygon.indicators import parse_indicators
+from webull_backend.polygon.models import Bar
+from webull_backend.polygon.resample import DEFAULT_INTERVAL
+from webull_backend.polygon.resample import Interval
+
+# Maximum number of companies requested in a single history batch
+MAX_BATCH_SIZE = 100
 
-# Initialize a RESTClient instance with an API key (not shown here)
-client = RESTClient()
+# Maximum number of days of a history batch, per timespan of the bars it is built
+# from; a session has up to 960 minute bars
+MAX_BATCH_DAYS = {Bar.TIMESPAN.minute: 31, Bar.TIMESPAN.day: 5 * 366}
 
 
 class TickerSerializer(serializers.ModelSerializer):
@@ -19,12 +22,20 @@ class TickerSerializer(serializers.ModelSerializer):
     Serializer for the Ticker model.
 
     Attributes:
-        symbol: The unique identifier for the company's stock (e.g., "AAPL").
+        symbol: The identifier for the company's stock (e.g., "AAPL").
+        exchange: The Market Identifier Code of the exchange the stock is listed
+            on; only read, to tell apart a symbol listed on several exchanges.
     """
 
+    exchange = serializers.CharField(
+        source="exchange.mic",
+        required=False,
+        write_only=True,
+    )
+
     class Meta:
         model = Ticker
-        fields = ["symbol"]
+        fields = ["symbol", "exchange"]
 
 
 class CompanySerializer(serializers.ModelSerializer):
@@ -45,6 +56,32 @@ class CompanySerializer(serializers.ModelSerializer):
         model = Company
         fields = ["uuid", "name", "description", "ticker"]
 
+    def validate_ticker(self, value):
+        """
+        Looks up the ticker of a symbol, on the given exchange if any.
+
+        Args:
+            value: The ticker data, with a symbol and optionally an exchange.
+
+        Returns:
+            The Ticker instance.
+        """
+        tickers = Ticker.objects.filter(symbol=value["symbol"])
+        if "exchange" in value:
+            tickers = tickers.filter(exchange__mic=value["exchange"]["mic"])
+
+        matches = list(tickers[:2])
+        if not matches:
+            msg = f'No ticker with the symbol "{value["symbol"]}".'
+            raise serializers.ValidationError(msg)
+        if len(matches) > 1:
+            msg = (
+                f'The symbol "{value["symbol"]}" is listed on several exchanges; '
+                "give the exchange too."
+            )
+            raise serializers.ValidationError(msg)
+        return matches[0]
+
     def create(self, validated_data):
         """
         Creates a new Company instance with a corresponding Ticker instance.
@@ -55,20 +92,9 @@ class CompanySerializer(serializers.ModelSerializer):
         Returns:
             A newly created Company instance.
         """
-        # Extract the ticker data and remove it from the validated data
-        ticker_data = validated_data.pop("ticker")
-
-        # Get the corresponding Ticker instance using the symbol
-        ticker = Ticker.objects.get(symbol=ticker_data["symbol"])
-
-        # Add the Ticker's UUID to the validated data
-        validated_data["ticker_id"] = ticker.uuid
-
-        # Create a new Company instance and save it to the database
-        company = Company.objects.create(**validated_data)
-        company.save()
-
-        return company
+        # The ticker was looked up by `validate_ticker`, so the response does not
+        # load it again; create a new Company instance and save it to the database
+        return Company.objects.create(**validated_data)
 
     def update(self, instance, validated_data):
         """
@@ -85,14 +111,8 @@ class CompanySerializer(serializers.ModelSerializer):
         instance.name = validated_data.get("name", instance.name)
         instance.description = validated_data.get("description", instance.description)
 
-        # Extract the ticker data and remove it from the validated data
-        ticker_data = validated_data.pop("ticker")
-
-        # Get the corresponding Ticker instance using the symbol
-        ticker = Ticker.objects.get(symbol=ticker_data["symbol"])
-
-        # Update the company's Ticker instance
-        instance.ticker = ticker
+        # Update the company's Ticker instance, looked up by `validate_ticker`
+        instance.ticker = validated_data.pop("ticker")
 
         # Save the updated Company instance to the database
         instance.save()
@@ -111,8 +131,8 @@ class CompanyDetailSerializer(serializers.BaseSerializer):
         ticker: The corresponding Ticker instance with its own details.
             - name: The human-readable name of the stock (e.g., "AAPL').
             - symbol: The unique identifier for the company's stock (e.g., "AAPL').
-            - history: The historical data for the stock, retrieved from the Polygon
-            API
+            - history: The historical data for the stock, read from the local bar
+            store and completed from the Polygon API
     """
 
     def to_representation(self, instance):
@@ -127,19 +147,13 @@ class CompanyDetailSerializer(serializers.BaseSerializer):
             A dictionary containing the company's details and its corresponding Ticker
             instance.
         """
-        # Retrieve historical data for the stock using the Polygon API
-        aggs = cast(
-            HTTPResponse,
-            client.get_aggs(
-                instance.ticker.symbol,  # Hardcoded symbol, should be replaced with a
-                # dynamic value
-                1,  # Time period (not specified in the code)
-                "day",
-                get_current_date_minus_n_days(7),
-                get_current_date(),
-                raw=True,
-            ),
-        )
+        # Async views fetch the history themselves and pass it in the context;
+        # otherwise retrieve it from the local bar store, only requesting the days
+        # missing from it from the Polygon API
+        ticker = instance.ticker
+        history = self.context.get("history")
+        if history is None:
+            history = get_history(ticker, *get_history_range())
 
         # Return a dictionary representation of the Company instance with additional
         # details
@@ -148,9 +162,112 @@ class CompanyDetailSerializer(serializers.BaseSerializer):
             "name": instance.name,
             "description": instance.description,
             "ticker": {
-                "name": instance.ticker.company_name,  # Not clear where this value
+                "name": ticker.company_name,  # Not clear where this value
                 # comes from
-                "symbol": instance.ticker.symbol,
-                "history": json.loads(aggs.data),  # Historical data for the stock
+                "symbol": ticker.symbol,
+                "history": history,  # Historical data for the stock
             },
         }
+
+
+class HistoryOptionsSerializer(serializers.Serializer):
+    """
+    Serializer for the options of a price history.
+
+    Attributes:
+        interval: The size of the history bars, e.g. "4hour"; defaults to a day.
+        indicators: The indicators computed over the bars, e.g. ["sma20", "rsi14"];
+            comma-separated values are split.
+    """
+
+    interval = serializers.CharField(default=DEFAULT_INTERVAL)
+    indicators = serializers.ListField(child=serializers.CharField(), default=list)
+
+    def validate_interval(self, value):
+        """
+        Parses the interval.
+
+        Args:
+            value: The interval, e.g. "4hour".
+
+        Returns:
+            The parsed Interval.
+        """
+        try:
+            return Interval.parse(value)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e)) from e
+
+    def validate_indicators(self, value):
+        """
+        Parses the indicators.
+
+        Args:
+            value: The indicators, e.g. ["sma20", "macd"].
+
+        Returns:
+            The parsed Indicator instances.
+        """
+        texts = [text for item in value for text in item.split(",") if text]
+        try:
+            return parse_indicators(texts)
+        except ValueError as e:
+            raise serializers.ValidationError(str(e)) from e
+
+
+class CompanyHistoryBatchSerializer(HistoryOptionsSerializer):
+    """
+    Serializer for a request of the price history of many companies.
+
+    Attributes:
+        uuids: The UUIDs of the companies.
+        symbols: The ticker symbols of the companies.
+        start: The first date of the history; defaults to a week ago.
+        end: The last date of the history; defaults to today.
+        interval: The size of the history bars, e.g. "4hour"; defaults to a day.
+        indicators: The indicators computed over the bars.
+    """
+
+    uuids = serializers.ListField(child=serializers.UUIDField(), default=list)
+    symbols = serializers.ListField(
+        child=serializers.CharField(max_length=50),
+        default=list,
+    )
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+
+    def validate(self, attrs):
+        """
+        Checks the size of the batch and fills in the default date range, which
+        must not span more than `MAX_BATCH_DAYS` for the bars of the interval.
+
+        Args:
+            attrs: The validated fields.
+
+        Returns:
+            The validated fields, with both dates set.
+        """
+        size = len(attrs["uuids"]) + len(attrs["symbols"])
+        if not size:
+            msg = "Provide at least one company UUID or symbol."
+            raise serializers.ValidationError(msg)
+        if size > MAX_BATCH_SIZE:
+            msg = f"Request at most {MAX_BATCH_SIZE} companies at once."
+            raise serializers.ValidationError(msg)
+
+        start, end = get_history_range()
+        attrs.setdefault("start", start)
+        attrs.setdefault("end", end)
+        if attrs["start"] > attrs["end"]:
+            msg = "The start date must not be after the end date."
+            raise serializers.ValidationError(msg)
+
+        interval = attrs["interval"]
+        max_days = MAX_BATCH_DAYS[interval.base]
+        if (attrs["end"] - attrs["start"]).days >= max_days:
+            msg = (
+                f"Request at most {max_days} days of history at a {interval} "
+                "interval."
+            )
+            raise serializers.ValidationError(msg)
+        return attrs
@@ -10,6 +10,7 @@ from django.urls import path
 from .views import AllCompaniesListView
 from .views import CompanyDeleteView
 from .views import CompanyDetailView
+from .views import CompanyHistoryBatchView
 from .views import CompanyListCreateView
 from .views import CompanyUpdateView
 
@@ -29,6 +30,14 @@ urlpatterns = [
         CompanyDetailView.as_view(),
         name="company-detail",
     ),
+    # Batch history endpoint
+    # POST: Retrieve the details and price history of many companies by UUID or
+    # ticker symbol.
+    path(
+        "companies/history/",
+        CompanyHistoryBatchView.as_view(),
+        name="company-history-batch",
+    ),
     # All companies list view endpoint
     # GET: Retrieve a list of all companies.
     path(
@@ -2,92 +2,348 @@
 Company views for the Webull backend.
 """
 
+import asyncio
+
+from adrf.generics import GenericAPIView as AsyncGenericAPIView
+from adrf.shortcuts import aget_object_or_404
+from adrf.views import APIView as AsyncAPIView
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Q
+from django.utils.cache import get_conditional_response  # pylint: disable=E0402
+from django.utils.cache import patch_cache_control  # pylint: disable=E0402
 from django.utils.decorators import method_decorator  # pylint: disable=E0402
-from django.views.decorators.cache import cache_page  # pylint: disable=E0402
+from django.views.decorators.http import condition  # pylint: disable=E0402
 from rest_framework import generics
+from rest_framework import mixins
 from rest_framework.response import Response  # pylint: disable=E0401
 
 from webull_backend.company.models import Company  # pylint: disable=E0402
-from webull_backend.company.utils import delete_cache  # pylint: disable=E0402
+from webull_backend.company.utils import LIST_CACHE_KEY_PREFIX  # pylint: disable=E0402
+from webull_backend.company.utils import detail_key_prefix  # pylint: disable=E0402
+from webull_backend.company.utils import get_history_range  # pylint: disable=E0402
+from webull_backend.company.utils import versioned_cache_page  # pylint: disable=E0402
+from webull_backend.polygon.history_cache import CachedHistory
+from webull_backend.polygon.history_cache import aget_cached_history
+from webull_backend.polygon.indicator_states import indicator_values
+from webull_backend.polygon.indicators import Indicator
+from webull_backend.polygon.limits import PolygonUnavailable
+from webull_backend.polygon.planner import aticker_calendar
+from webull_backend.polygon.resample import Interval
+from webull_backend.polygon.resample import resample_history
+from webull_backend.polygon.series import BarSeries
+from webull_backend.tickers.models import Ticker
 
+from .etags import companies_etag  # pylint: disable=E0402
+from .etags import company_etag  # pylint: disable=E0402
+from .pagination import CompanyCursorPagination  # pylint: disable=E0402
+from .query_budget import QueryBudgetMixin  # pylint: disable=E0402
+from .query_budget import allow_queries  # pylint: disable=E0402
 from .serializers import CompanyDetailSerializer  # pylint: disable=E0402
+from .serializers import CompanyHistoryBatchSerializer  # pylint: disable=E0402
 from .serializers import CompanySerializer  # pylint: disable=E0402
+from .serializers import HistoryOptionsSerializer  # pylint: disable=E0402
+
+# Queries of a price history missing from the cache: reading the bar store, then
+# storing the fetched bars and dropping the indicator states they invalidate
+HISTORY_QUERIES = 3
+
+# Queries of the session calendar of an exchange, built from its holidays once per
+# process and `CALENDAR_TTL`
+CALENDAR_QUERIES = 1
+
+# Queries of an indicator over a daily history: reading its stored values, its last
+# state and the bars to fold, then storing the new states
+INDICATOR_QUERIES = 4
+
+
+async def build_history(
+    ticker: Ticker,
+    history: dict,
+    interval: Interval,
+    indicators: list[Indicator],
+) -> dict:
+    """
+    Builds the history of a response from a cached base history.
 
+    The bars are resampled along the session calendar of the ticker's exchange.
 
-class CompanyListCreateView(generics.ListCreateAPIView):
+    Args:
+        ticker (Ticker): The ticker.
+        history (dict): The cached history of the interval's base timespan.
+        interval (Interval): The size of the history bars.
+        indicators (list[Indicator]): The indicators to add.
+    Returns:
+        dict: The resampled history, with the indicator values under `indicators`
+        when some are requested.
+    """
+    if not interval.is_base():
+        calendar = await aticker_calendar(ticker)
+        history = resample_history(history, interval, calendar)
+    if not indicators:
+        return history
+
+    values = await sync_to_async(indicator_values)(
+        ticker,
+        BarSeries.from_history(history),
+        indicators,
+        interval,
+    )
+    return {**history, "indicators": values}
+
+
+class CompanyListCreateView(QueryBudgetMixin, generics.ListCreateAPIView):
     """
     View to handle listing and creating companies.
+    The list is paginated with a cursor (see `CompanyCursorPagination`), and
+    answers 304 while its ETag matches (see `companies_etag`).
     """
 
-    queryset = Company.objects.all()
+    queryset = Company.objects.select_related("ticker__exchange")
+    # Authentication, the ETag and the page, or the ticker and the new company
+    query_budget = 4
     serializer_class = CompanySerializer
+    pagination_class = CompanyCursorPagination
+
+    @method_decorator(condition(etag_func=companies_etag))
+    def list(self, request, *args, **kwargs):
+        """
+        Lists a page of companies.
+        Returns:
+            Response: A JSON response with the company data.
+        """
+        return super().list(request, *args, **kwargs)
 
 
-class CompanyDetailView(generics.RetrieveUpdateDestroyAPIView):
+# ATOMIC_REQUESTS does not support async views; the writes below open their own
+# transaction instead
+@method_decorator(transaction.non_atomic_requests, name="dispatch")
+class CompanyDetailView(
+    QueryBudgetMixin,
+    mixins.UpdateModelMixin,
+    mixins.DestroyModelMixin,
+    AsyncGenericAPIView,
+):
     """
     View to handle retrieving, updating, and deleting a company by UUID.
-    Uses cache for 5 minutes (300 seconds).
+    Responses are cached for as long as their price history stays fresh: until the
+    next refresh while the market is open, a day once its sessions are closed.
+    Saving or deleting the company, its ticker or its exchange evicts them (see
+    `company.signals`).
+
+    The `interval` query parameter (e.g. `4hour`, `1week`) sets the size of the
+    history bars; they are built from the cached daily or minute bars. The
+    `indicators` query parameter (e.g. `sma20,rsi14`) adds the values of technical
+    indicators at each bar. Responses carry an ETag (see `company_etag`), and
+    requests whose `If-None-Match` still matches get an empty 304.
+
+    The view is asynchronous so that fetching the price history from Polygon does
+    not block the worker; updates and deletes run the regular handlers in a thread.
     """
 
-    CACHE_KEY_PREFIX = "company-view"
-    queryset = Company.objects.all()
+    queryset = Company.objects.select_related("ticker__exchange")
+    # Authentication, the company, its calendar and its history, or the ticker and
+    # the update in a savepoint; indicators are allowed on top
+    query_budget = 3 + CALENDAR_QUERIES + HISTORY_QUERIES + 1
     serializer_class = CompanySerializer
     detail_serializer = CompanyDetailSerializer
 
     lookup_url_kwarg = "uuid"
 
-    @method_decorator(cache_page(300, key_prefix=CACHE_KEY_PREFIX))
-    def retrieve(self, request, pk):
+    async def get(self, request, *args, **kwargs):
         """
-        Retrieves a company by UUID.
+        Retrieves a company, or answers 304 when the client's copy is current.
+
+        The company and its cached history are read first, without calling Polygon
+        once the history is cached. While they match the ETag sent in
+        `If-None-Match`, the response is neither built nor read from the cache.
 
         Args:
-            pk (str): The UUID of the company to retrieve.
+            request (Request): The HTTP request, with the history options.
         Returns:
-            Response: A JSON response with the company data.
+            Response: A JSON response with the company data, or an empty 304.
         """
-        # Note the use of `get_queryset()` instead of `self.queryset`
-        queryset = Company.objects.get(uuid=pk)
+        options = HistoryOptionsSerializer(data=request.query_params)
+        options.is_valid(raise_exception=True)
+        self.options = options.validated_data
+        allow_queries(INDICATOR_QUERIES * len(self.options["indicators"]))
 
-        serializer = CompanyDetailSerializer(queryset, many=False)
-        return Response(serializer.data)
+        # The ticker is joined up front, lazy loading is not available in async code
+        self.company = await aget_object_or_404(
+            Company.objects.select_related("ticker__exchange"),
+            uuid=kwargs["pk"],
+        )
+        self.cached_history = await aget_cached_history(
+            self.company.ticker,
+            *get_history_range(),
+            self.options["interval"].base,
+        )
 
-    @method_decorator(cache_page(300, key_prefix=CACHE_KEY_PREFIX))
-    def list(self, request, *args, **kwargs):
+        etag = company_etag(self.company, self.cached_history.version, self.options)
+        response = get_conditional_response(request, etag=etag)
+        if response is None:
+            response = await self.retrieve(request, *args, **kwargs)
+        else:
+            patch_cache_control(response, max_age=self.cached_history.max_age)
+        response.headers.setdefault("ETag", etag)
+        return response
+
+    async def put(self, request, *args, **kwargs):
+        update = transaction.atomic(self.update)
+        return await sync_to_async(update)(request, *args, **kwargs)
+
+    async def patch(self, request, *args, **kwargs):
+        partial_update = transaction.atomic(self.partial_update)
+        return await sync_to_async(partial_update)(request, *args, **kwargs)
+
+    async def delete(self, request, *args, **kwargs):
+        destroy = transaction.atomic(self.destroy)
+        return await sync_to_async(destroy)(request, *args, **kwargs)
+
+    # The timeout is taken from the max-age set by `retrieve`; each company has its
+    # own namespace, invalidated when the company, its ticker or its exchange change
+    @method_decorator(versioned_cache_page(None, key_prefix=detail_key_prefix))
+    async def retrieve(self, request, pk):
         """
-        Lists all companies.
+        Builds the detail of the company read by `get`.
+
+        Args:
+            pk (str): The UUID of the company to retrieve.
         Returns:
             Response: A JSON response with the company data.
         """
-        return super().list(request, *args, **kwargs)
+        company, cached = self.company, self.cached_history
+        history = await build_history(
+            company.ticker,
+            cached.history,
+            self.options["interval"],
+            self.options["indicators"],
+        )
+        serializer = CompanyDetailSerializer(
+            company,
+            many=False,
+            context={"history": history},
+        )
+        response = Response(serializer.data)
+        # A stale history gets a max-age of 0, which keeps the response uncached
+        # until the background refresh is done
+        patch_cache_control(response, max_age=cached.max_age)
+        return response
+
+
+@method_decorator(transaction.non_atomic_requests, name="dispatch")
+class CompanyHistoryBatchView(QueryBudgetMixin, AsyncAPIView):
+    """
+    View to handle retrieving the details and price history of many companies in a
+    single request, e.g. for a watchlist.
 
-    def create(self, request, *args, **kwargs):
+    The histories are read concurrently: hits are served from the cache or the bar
+    store, and misses are fetched from Polygon under the shared rate limit. A
+    history that cannot be fetched is reported in `errors` without failing the
+    rest of the batch. Every history is built at the requested `interval` from the
+    cached daily or minute bars, with the requested `indicators`.
+    """
+
+    # Authentication and the companies; their histories are allowed on top
+    query_budget = 3
+
+    async def post(self, request, *args, **kwargs):
         """
-        Creates a new company.
+        Retrieves the companies of a list of UUIDs and symbols with their history.
 
         Args:
-            request (Request): The HTTP request containing the company data.
-            *args: Additional arguments.
-            **kwargs: Additional keyword arguments.
+            request (Request): The HTTP request with the UUIDs, symbols and dates.
         Returns:
-            Response: A JSON response with the created company data.
+            Response: A JSON response with the company data, the histories that
+            could not be fetched and the UUIDs and symbols that were not found.
         """
-        response = super().create(request, *args, **kwargs)
-        delete_cache(self.CACHE_KEY_PREFIX)
-        return response
+        serializer = CompanyHistoryBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        uuids = serializer.validated_data["uuids"]
+        symbols = serializer.validated_data["symbols"]
+        start = serializer.validated_data["start"]
+        end = serializer.validated_data["end"]
+        interval = serializer.validated_data["interval"]
+        indicators = serializer.validated_data["indicators"]
+
+        companies = [
+            company
+            async for company in Company.objects.select_related("ticker__exchange")
+            .filter(Q(uuid__in=uuids) | Q(ticker__symbol__in=symbols))
+            .order_by("ticker__symbol")
+        ]
+
+        exchanges = {company.ticker.exchange_id for company in companies}
+        allow_queries(
+            len(exchanges) * CALENDAR_QUERIES
+            + len(companies) * (HISTORY_QUERIES + INDICATOR_QUERIES * len(indicators)),
+        )
+
+        async def fetch(company: Company) -> CachedHistory | PolygonUnavailable:
+            try:
+                return await aget_cached_history(
+                    company.ticker,
+                    start,
+                    end,
+                    interval.base,
+                )
+            except PolygonUnavailable as exc:
+                return exc
+
+        histories = await asyncio.gather(*(fetch(company) for company in companies))
+
+        results, errors = [], []
+        for company, cached in zip(companies, histories, strict=True):
+            if isinstance(cached, PolygonUnavailable):
+                errors.append(
+                    {
+                        "uuid": company.uuid,
+                        "symbol": company.ticker.symbol,
+                        "detail": cached.detail,
+                        "retry_after": cached.wait,
+                    },
+                )
+                continue
+            history = await build_history(
+                company.ticker,
+                cached.history,
+                interval,
+                indicators,
+            )
+            detail = CompanyDetailSerializer(company, context={"history": history})
+            results.append(detail.data)
+
+        found_uuids = {company.uuid for company in companies}
+        found_symbols = {company.ticker.symbol for company in companies}
+        return Response(
+            {
+                "results": results,
+                "errors": errors,
+                "not_found": [uuid for uuid in uuids if uuid not in found_uuids]
+                + [symbol for symbol in symbols if symbol not in found_symbols],
+            },
+        )
 
 
-class AllCompaniesListView(generics.ListAPIView):
+class AllCompaniesListView(QueryBudgetMixin, generics.ListAPIView):
     """
     View to handle listing all companies.
-    Uses cache for 5 minutes (300 seconds).
+    Uses cache for 5 minutes (300 seconds), per page; a change to any company
+    evicts every page (see `invalidate_companies`).
+    The list is paginated with a cursor (see `CompanyCursorPagination`), and
+    answers 304 while its ETag matches (see `companies_etag`).
     """
 
-    CACHE_KEY_PREFIX = "company-view"
-    queryset = Company.objects.all()
+    CACHE_KEY_PREFIX = LIST_CACHE_KEY_PREFIX
+    queryset = Company.objects.select_related("ticker__exchange")
+    # Authentication, the ETag and the page
+    query_budget = 4
     serializer_class = CompanySerializer
+    pagination_class = CompanyCursorPagination
 
-    @method_decorator(cache_page(300, key_prefix=CACHE_KEY_PREFIX))
+    # The ETag is checked before the cache
+    @method_decorator(condition(etag_func=companies_etag))
+    @method_decorator(versioned_cache_page(300, key_prefix=CACHE_KEY_PREFIX))
     def list(self, request, *args, **kwargs):
         """
         Lists all companies.
@@ -97,22 +353,26 @@ class AllCompaniesListView(generics.ListAPIView):
         return super().list(request, *args, **kwargs)
 
 
-class CompanyUpdateView(generics.RetrieveUpdateAPIView):
+class CompanyUpdateView(QueryBudgetMixin, generics.RetrieveUpdateAPIView):
     """
     View to handle updating a company by UUID.
     """
 
-    queryset = Company.objects.all()
+    queryset = Company.objects.select_related("ticker__exchange")
+    # Authentication, the company, then the ticker and the update
+    query_budget = 5
     serializer_class = CompanySerializer
     partial = True
 
 
-class CompanyDeleteView(generics.DestroyAPIView):
+class CompanyDeleteView(QueryBudgetMixin, generics.DestroyAPIView):
     """
     View to handle deleting a company by UUID.
     """
 
-    queryset = Company.objects.all()
+    queryset = Company.objects.select_related("ticker__exchange")
+    # Authentication, the company and its deletion
+    query_budget = 4
     serializer_class = CompanySerializer
 
     def destroy(self, request, *args, **kwargs):
@@ -128,6 +388,5 @@ class CompanyDeleteView(generics.DestroyAPIView):
         """
         instance = self.get_object()
         instance.delete()
-        delete_cache(self.CACHE_KEY_PREFIX)
 
         return Response(print("delete Company"))
@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class CompanyConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "webull_backend.company"
+
+    def ready(self):
+        from webull_backend.company import signals  # noqa: F401
+        from webull_backend.company.api import query_budget  # noqa: F401
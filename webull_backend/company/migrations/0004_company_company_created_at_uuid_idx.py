@@ -0,0 +1,18 @@
+# Generated by Django 5.0.8 on 2026-10-18 14:34
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0003_alter_company_name_alter_company_ticker'),
+        ('tickers', '0007_ingestioncheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='company',
+            index=models.Index(fields=['created_at', 'uuid'], name='company_created_at_uuid_idx'),
+        ),
+    ]
@@ -56,6 +56,16 @@ class Company(models.Model):
         choices_name="STATUS",  # Use STATUS Choices
     )
 
+    class Meta:
+        indexes = [
+            # Keyset pagination of the company lists walks this index, so a page
+            # costs the same wherever it starts
+            models.Index(
+                fields=["created_at", "uuid"],
+                name="company_created_at_uuid_idx",
+            ),
+        ]
+
     def __str__(self):
         """
         Returns a string representation of this Company instance.
@@ -0,0 +1,84 @@
+"""
+Module for invalidating the cached company views when the data they show changes.
+
+A company detail shows the company, its ticker and its exchange, and the lists show
+every company. Every write of these models, through the API, the admin or the bulk
+ticker loads, evicts the details of the companies it touches and the lists, and
+leaves the other details cached.
+
+The caches are invalidated once the transaction commits; invalidating them before
+would let a concurrent request cache the old rows again.
+"""
+
+from functools import partial
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+
+from webull_backend.company.models import Company
+from webull_backend.company.utils import invalidate_companies
+from webull_backend.exchanges.models import Exchange
+from webull_backend.tickers.models import Ticker
+from webull_backend.tickers.signals import tickers_written
+
+
+def invalidate_on_commit(companies: QuerySet) -> None:
+    """
+    Invalidates the cached views of some companies once the transaction commits.
+
+    The companies are looked up after the commit, outside of the transaction of the
+    write. Deleted companies are not found, but their own deletion invalidated them.
+
+    Args:
+        companies (QuerySet): The companies.
+    """
+    transaction.on_commit(
+        lambda: invalidate_companies(companies.values_list("pk", flat=True)),
+    )
+
+
+@receiver(post_save, sender=Company)
+@receiver(post_delete, sender=Company)
+def company_changed(sender, instance: Company, **kwargs) -> None:
+    """
+    Invalidates the cached views of a saved or deleted company.
+    """
+    transaction.on_commit(partial(invalidate_companies, [instance.pk]))
+
+
+@receiver(post_save, sender=Ticker)
+@receiver(post_delete, sender=Ticker)
+def ticker_changed(sender, instance: Ticker, **kwargs) -> None:
+    """
+    Invalidates the cached views of the company of a saved or deleted ticker.
+    """
+    invalidate_on_commit(Company.objects.filter(ticker_id=instance.pk))
+
+
+@receiver(post_save, sender=Exchange)
+@receiver(post_delete, sender=Exchange)
+def exchange_changed(sender, instance: Exchange, **kwargs) -> None:
+    """
+    Invalidates the cached views of the companies listed on a saved or deleted
+    exchange.
+    """
+    invalidate_on_commit(Company.objects.filter(ticker__exchange_id=instance.pk))
+
+
+@receiver(tickers_written, sender=Ticker)
+def tickers_loaded(
+    sender,
+    exchange: Exchange,
+    symbols: list[str] | None,
+    **kwargs,
+) -> None:
+    """
+    Invalidates the cached views of the companies of tickers written in bulk.
+    """
+    companies = Company.objects.filter(ticker__exchange_id=exchange.pk)
+    if symbols is not None:
+        companies = companies.filter(ticker__symbol__in=symbols)
+    invalidate_on_commit(companies)
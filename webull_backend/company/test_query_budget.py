@@ -0,0 +1,55 @@
+import logging
+
+import pytest
+from asgiref.sync import async_to_sync
+from asgiref.sync import sync_to_async
+
+from webull_backend.company.api.query_budget import QueryBudgetExceeded
+from webull_backend.company.api.query_budget import allow_queries
+from webull_backend.company.api.query_budget import query_budget
+from webull_backend.company.models import Company
+
+
+def test_query_budget_counts_queries(db):
+    queries = 2
+    with query_budget(queries, "test") as counter:
+        for _ in range(queries):
+            list(Company.objects.all())
+
+    assert counter.queries == queries
+
+
+def test_query_budget_raises(db):
+    def handle():
+        with query_budget(1, "test"):
+            list(Company.objects.all())
+            list(Company.objects.all())
+
+    with pytest.raises(QueryBudgetExceeded, match="over its budget of 1"):
+        handle()
+
+
+def test_query_budget_logs(db, settings, caplog):
+    settings.QUERY_BUDGET_RAISE = False
+
+    with caplog.at_level(logging.WARNING), query_budget(0, "test"):
+        list(Company.objects.all())
+
+    assert "test ran 1 queries, over its budget of 0" in caplog.text
+
+
+def test_allow_queries(db):
+    with query_budget(0, "test") as counter:
+        allow_queries(1)
+        list(Company.objects.all())
+
+    assert counter.budget == 1
+
+
+def test_query_budget_counts_queries_of_threads(db):
+    async def handle():
+        with query_budget(1, "test") as counter:
+            await sync_to_async(Company.objects.count)()
+        return counter
+
+    assert async_to_sync(handle)().queries == 1
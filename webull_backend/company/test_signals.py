@@ -0,0 +1,128 @@
+import pytest
+from django.core.cache import cache
+
+from webull_backend.company.models import Company
+from webull_backend.company.utils import LIST_CACHE_KEY_PREFIX
+from webull_backend.company.utils import detail_key_prefix
+from webull_backend.company.utils import get_generation
+from webull_backend.exchanges.models import Exchange
+from webull_backend.tickers import ingest
+from webull_backend.tickers.ingest import copy_tickers
+from webull_backend.tickers.ingest import upsert_tickers
+from webull_backend.tickers.models import Ticker
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def companies(db) -> list[Company]:
+    nyse = Exchange.objects.create(mic="NYSE")
+    nasdaq = Exchange.objects.create(mic="NASDAQ")
+    return [
+        Company.objects.create(
+            ticker=Ticker.objects.create(exchange=exchange, symbol=symbol),
+            name=symbol,
+        )
+        for exchange, symbol in ((nyse, "AA"), (nyse, "MO"), (nasdaq, "AAPL"))
+    ]
+
+
+def generations(companies: list[Company]) -> list[int]:
+    return [get_generation(detail_key_prefix(company.pk)) for company in companies]
+
+
+@pytest.fixture
+def changed(companies: list[Company], django_capture_on_commit_callbacks):
+    """
+    Returns a function reporting which company details and whether the lists were
+    invalidated by a write.
+    """
+
+    def changed(write) -> tuple[list[bool], bool]:
+        before = generations(companies)
+        lists = get_generation(LIST_CACHE_KEY_PREFIX)
+        with django_capture_on_commit_callbacks(execute=True):
+            write()
+        after = generations(companies)
+        return (
+            [old != new for old, new in zip(before, after, strict=True)],
+            get_generation(LIST_CACHE_KEY_PREFIX) != lists,
+        )
+
+    return changed
+
+
+def test_company_save(companies: list[Company], changed):
+    assert changed(companies[0].save) == ([True, False, False], True)
+
+
+def test_company_delete(companies: list[Company], changed):
+    assert changed(companies[1].delete) == ([False, True, False], True)
+
+
+def test_ticker_save(companies: list[Company], changed):
+    assert changed(companies[2].ticker.save) == ([False, False, True], True)
+
+
+def test_unlisted_ticker_save(companies: list[Company], changed):
+    ticker = Ticker(exchange=companies[0].ticker.exchange, symbol="T")
+
+    assert changed(ticker.save) == ([False, False, False], False)
+
+
+def test_exchange_save(companies: list[Company], changed):
+    assert changed(companies[0].ticker.exchange.save) == ([True, True, False], True)
+
+
+def test_bulk_ticker_upsert(companies: list[Company], changed):
+    exchange = companies[0].ticker.exchange
+
+    def write():
+        upsert_tickers(exchange, [("Altria Group", "MO"), ("AT&T", "T")])
+
+    assert changed(write) == ([False, True, False], True)
+
+
+@pytest.mark.parametrize("load", [upsert_tickers, copy_tickers])
+def test_unchanged_bulk_ticker_load_keeps_caches(
+    companies: list[Company],
+    changed,
+    load,
+):
+    exchange = companies[0].ticker.exchange
+    rows = [("Alcoa", "AA"), ("Altria Group", "MO")]
+    load(exchange, rows)
+
+    assert changed(lambda: load(exchange, rows)) == ([False, False, False], False)
+
+
+def test_bulk_ticker_copy(companies: list[Company], changed):
+    exchange = companies[0].ticker.exchange
+
+    def write():
+        copy_tickers(exchange, [("", "AA"), ("Altria Group", "MO"), ("AT&T", "T")])
+
+    assert changed(write) == ([False, True, False], True)
+
+
+def test_large_bulk_ticker_copy(companies: list[Company], changed, monkeypatch):
+    exchange = companies[0].ticker.exchange
+    monkeypatch.setattr(ingest, "MAX_WRITTEN_SYMBOLS", 1)
+
+    def write():
+        copy_tickers(exchange, [("Altria Group", "MO"), ("AT&T", "T")])
+
+    # Too many symbols were written to send them, the whole exchange is evicted
+    assert changed(write) == ([True, True, False], True)
+
+
+def test_invalidation_waits_for_commit(companies: list[Company]):
+    before = generations(companies)
+
+    # The test transaction is never committed
+    companies[0].save()
+
+    assert generations(companies) == before
@@ -0,0 +1,441 @@
+import uuid
+from datetime import date
+from datetime import timedelta
+from http import HTTPStatus
+
+import httpx
+import pytest
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from webull_backend.company.api.serializers import MAX_BATCH_DAYS
+from webull_backend.company.api.serializers import CompanyDetailSerializer
+from webull_backend.company.models import Company
+from webull_backend.company.utils import delete_cache
+from webull_backend.company.utils import generation_key
+from webull_backend.company.utils import get_generation
+from webull_backend.exchanges.models import Exchange
+from webull_backend.polygon import history
+from webull_backend.polygon.client import AsyncPolygonClient
+from webull_backend.polygon.history import session_start
+from webull_backend.polygon.limits import PolygonUnavailable
+from webull_backend.polygon.models import Bar
+from webull_backend.tickers.models import Ticker
+
+# Daily bars returned by the fake Polygon client, and the volume of each
+BARS = 2
+VOLUME = 100.0
+
+
+class FakeAsyncClient:
+    def __init__(self):
+        self.calls = []
+        self.failing = set()
+
+    async def get_aggs(self, symbol, multiplier, timespan, start, end):
+        self.calls.append((symbol, start, end))
+        if symbol in self.failing:
+            raise PolygonUnavailable(wait=1.0)
+        day = date(2024, 6, 3)
+        return [
+            {
+                "t": int(session_start(day + timedelta(days=i)).timestamp() * 1000),
+                "o": 1.0,
+                "h": 2.0,
+                "l": 0.5,
+                "c": 1.5,
+                "v": VOLUME,
+            }
+            for i in range(BARS)
+        ]
+
+
+@pytest.fixture(autouse=True)
+def _clear_cache():
+    cache.clear()
+
+
+@pytest.fixture
+def client(client, user):
+    client.force_login(user)
+    return client
+
+
+@pytest.fixture
+def polygon(monkeypatch) -> FakeAsyncClient:
+    client = FakeAsyncClient()
+    monkeypatch.setattr(history, "get_client", lambda: client)
+    return client
+
+
+@pytest.fixture
+def company(db) -> Company:
+    exchange = Exchange.objects.create(mic="NYSE")
+    ticker = Ticker.objects.create(exchange=exchange, symbol="AA", company_name="Alcoa")
+    return Company.objects.create(ticker=ticker, name="Alcoa", description="Aluminium")
+
+
+@pytest.fixture
+def other_company(company: Company) -> Company:
+    ticker = Ticker.objects.create(
+        exchange=company.ticker.exchange,
+        symbol="BB",
+        company_name="BlackBerry",
+    )
+    return Company.objects.create(ticker=ticker, name="BlackBerry")
+
+
+def test_company_detail(client, company: Company, polygon: FakeAsyncClient):
+    response = client.get(reverse("api:company-detail", kwargs={"pk": company.pk}))
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert data["name"] == "Alcoa"
+    assert data["ticker"]["symbol"] == "AA"
+    assert data["ticker"]["history"]["resultsCount"] == BARS
+    assert "max-age=" in response["Cache-Control"]
+    assert len(polygon.calls) == 1
+
+
+def test_company_detail_interval(client, company: Company, polygon: FakeAsyncClient):
+    url = reverse("api:company-detail", kwargs={"pk": company.pk})
+
+    response = client.get(url, {"interval": "1week"})
+
+    assert response.status_code == HTTPStatus.OK
+    history = response.json()["ticker"]["history"]
+    # Both daily bars are in the same week
+    assert history["resultsCount"] == 1
+    assert history["results"][0]["v"] == BARS * VOLUME
+
+
+def test_company_detail_indicators(
+    client,
+    company: Company,
+    polygon: FakeAsyncClient,
+):
+    url = reverse("api:company-detail", kwargs={"pk": company.pk})
+
+    response = client.get(url, {"indicators": "sma2,macd"})
+
+    assert response.status_code == HTTPStatus.OK
+    indicators = response.json()["ticker"]["history"]["indicators"]
+    assert indicators["sma2"]["sma"] == [None, 1.5]
+    assert indicators["macd"]["signal"] == [None, None]
+
+
+def test_company_detail_invalid_interval(client, company: Company):
+    url = reverse("api:company-detail", kwargs={"pk": company.pk})
+
+    response = client.get(url, {"interval": "1fortnight"})
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert "interval" in response.json()
+
+
+def test_company_detail_is_cached(client, company: Company, polygon: FakeAsyncClient):
+    url = reverse("api:company-detail", kwargs={"pk": company.pk})
+
+    first = client.get(url)
+    second = client.get(url)
+
+    assert second.json() == first.json()
+    assert len(polygon.calls) == 1
+
+
+def test_company_detail_cache_is_invalidated(
+    client,
+    company: Company,
+    polygon: FakeAsyncClient,
+    django_capture_on_commit_callbacks,
+):
+    url = reverse("api:company-detail", kwargs={"pk": company.pk})
+    client.get(url)
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.patch(
+            reverse("api:company-update", kwargs={"pk": company.pk}),
+            {"name": "Alcoa Corporation", "ticker": {"symbol": "AA"}},
+            content_type="application/json",
+        )
+
+    assert client.get(url).json()["name"] == "Alcoa Corporation"
+
+
+def test_create_company_on_an_exchange(client, company: Company):
+    nasdaq = Exchange.objects.create(mic="XNAS")
+    Ticker.objects.create(exchange=nasdaq, symbol="BB")
+    Ticker.objects.create(exchange=company.ticker.exchange, symbol="BB")
+    url = reverse("api:company-list-create")
+
+    response = client.post(
+        url,
+        {"name": "BlackBerry", "ticker": {"symbol": "BB"}},
+        content_type="application/json",
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert "several exchanges" in response.json()["ticker"][0]
+
+    response = client.post(
+        url,
+        {"name": "BlackBerry", "ticker": {"symbol": "BB", "exchange": "XNAS"}},
+        content_type="application/json",
+    )
+
+    assert response.status_code == HTTPStatus.CREATED
+    assert Company.objects.get(name="BlackBerry").ticker.exchange == nasdaq
+
+
+def test_update_company_unknown_symbol(client, company: Company):
+    response = client.patch(
+        reverse("api:company-update", kwargs={"pk": company.pk}),
+        {"name": "Alcoa", "ticker": {"symbol": "ZZ"}},
+        content_type="application/json",
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_delete_company_invalidates_list(
+    client,
+    other_company: Company,
+    django_capture_on_commit_callbacks,
+):
+    url = reverse("api:all-companies-list")
+    names = [company["name"] for company in client.get(url).json()["results"]]
+    assert names == ["Alcoa", "BlackBerry"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        client.delete(reverse("api:company-delete", kwargs={"pk": other_company.pk}))
+
+    names = [company["name"] for company in client.get(url).json()["results"]]
+    assert names == ["Alcoa"]
+
+
+@pytest.mark.parametrize("name", ["api:company-list-create", "api:all-companies-list"])
+def test_company_list_pages(client, company: Company, other_company: Company, name):
+    first = client.get(reverse(name), {"page_size": 1}).json()
+    second = client.get(first["next"]).json()
+
+    assert [company["name"] for company in first["results"]] == ["Alcoa"]
+    assert [company["name"] for company in second["results"]] == ["BlackBerry"]
+    assert second["next"] is None
+    assert "count" not in first
+
+
+def test_company_list_queries_do_not_grow(client, company: Company):
+    for symbol in ("BB", "CC", "DD", "EE"):
+        ticker = Ticker.objects.create(exchange=company.ticker.exchange, symbol=symbol)
+        Company.objects.create(ticker=ticker, name=symbol)
+
+    # Going over the budget of the view raises in the tests
+    response = client.get(reverse("api:company-list-create"))
+
+    assert len(response.json()["results"]) == Company.objects.count()
+
+
+def test_company_list_page_size_cap(
+    client,
+    company: Company,
+    other_company: Company,
+    settings,
+):
+    settings.COMPANY_MAX_PAGE_SIZE = 1
+
+    response = client.get(reverse("api:company-list-create"), {"page_size": 100})
+
+    assert len(response.json()["results"]) == 1
+
+
+def test_company_list_seeks_pages(client, company: Company, other_company: Company):
+    url = reverse("api:company-list-create")
+    cursor = client.get(url, {"page_size": 1}).json()["next"]
+
+    with CaptureQueriesContext(connection) as queries:
+        client.get(cursor)
+
+    statements = " ".join(query["sql"] for query in queries)
+    assert "COUNT(" not in statements
+    assert "OFFSET" not in statements
+
+
+def test_delete_cache_increments_generation(db):
+    generation = get_generation("company-view")
+
+    delete_cache("company-view")
+
+    assert get_generation("company-view") == generation + 1
+
+
+def test_delete_cache_without_generation(db):
+    cache.set(generation_key("company-view"), 1, timeout=None)
+    cache.delete(generation_key("company-view"))
+
+    delete_cache("company-view")
+
+    # A recreated counter starts after the generations it replaces
+    assert get_generation("company-view") > 1
+
+
+def test_company_detail_not_modified(
+    client,
+    company: Company,
+    polygon: FakeAsyncClient,
+    monkeypatch,
+):
+    url = reverse("api:company-detail", kwargs={"pk": company.pk})
+    etag = client.get(url).headers["ETag"]
+    # The response is not built again
+    monkeypatch.setattr(CompanyDetailSerializer, "to_representation", None)
+
+    response = client.get(url, headers={"if-none-match": etag})
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+    assert response.headers["ETag"] == etag
+    assert len(polygon.calls) == 1
+
+
+def test_company_detail_etag_changes(
+    client,
+    company: Company,
+    polygon: FakeAsyncClient,
+):
+    url = reverse("api:company-detail", kwargs={"pk": company.pk})
+    etag = client.get(url).headers["ETag"]
+
+    company.save()
+
+    assert client.get(url, headers={"if-none-match": etag}).status_code == HTTPStatus.OK
+    assert client.get(url, {"interval": "1week"}).headers["ETag"] != etag
+
+
+@pytest.mark.parametrize("name", ["api:company-list-create", "api:all-companies-list"])
+def test_company_list_not_modified(client, company: Company, name):
+    url = reverse(name)
+    etag = client.get(url).headers["ETag"]
+
+    response = client.get(url, headers={"if-none-match": etag})
+
+    assert response.status_code == HTTPStatus.NOT_MODIFIED
+
+
+def test_company_list_etag_changes(client, company: Company, other_company: Company):
+    url = reverse("api:company-list-create")
+    etag = client.get(url).headers["ETag"]
+
+    other_company.delete()
+
+    assert client.get(url, headers={"if-none-match": etag}).status_code == HTTPStatus.OK
+
+
+def test_company_detail_not_found(client, db, polygon: FakeAsyncClient):
+    response = client.get(reverse("api:company-detail", kwargs={"pk": uuid.uuid4()}))
+
+    assert response.status_code == HTTPStatus.NOT_FOUND
+    assert polygon.calls == []
+
+
+def test_company_detail_upstream_error(client, company: Company, monkeypatch):
+    transport = httpx.MockTransport(lambda request: httpx.Response(429))
+    polygon = AsyncPolygonClient(transport=transport)
+    monkeypatch.setattr(history, "get_client", lambda: polygon)
+
+    response = client.get(reverse("api:company-detail", kwargs={"pk": company.pk}))
+
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+
+
+def test_company_history_batch(
+    client,
+    company: Company,
+    other_company: Company,
+    polygon: FakeAsyncClient,
+):
+    missing = uuid.uuid4()
+
+    response = client.post(
+        reverse("api:company-history-batch"),
+        {
+            "uuids": [str(company.pk), str(missing)],
+            "symbols": ["BB", "ZZ"],
+            "start": "2024-06-03",
+            "end": "2024-06-07",
+        },
+        content_type="application/json",
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert [result["ticker"]["symbol"] for result in data["results"]] == ["AA", "BB"]
+    assert data["results"][0]["ticker"]["history"]["resultsCount"] == BARS
+    assert data["errors"] == []
+    assert data["not_found"] == [str(missing), "ZZ"]
+    assert sorted(call[0] for call in polygon.calls) == ["AA", "BB"]
+
+
+def test_company_history_batch_partial_errors(
+    client,
+    company: Company,
+    other_company: Company,
+    polygon: FakeAsyncClient,
+):
+    polygon.failing = {"BB"}
+
+    response = client.post(
+        reverse("api:company-history-batch"),
+        {"symbols": ["AA", "BB"], "start": "2024-06-03", "end": "2024-06-07"},
+        content_type="application/json",
+    )
+
+    assert response.status_code == HTTPStatus.OK
+    data = response.json()
+    assert [result["ticker"]["symbol"] for result in data["results"]] == ["AA"]
+    assert data["errors"][0]["symbol"] == "BB"
+    assert data["errors"][0]["retry_after"] == 1.0
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        {},
+        {"symbols": [f"S{i}" for i in range(101)]},
+        {"symbols": ["AA"], "start": "2024-06-07", "end": "2024-06-03"},
+        {"symbols": ["AA"], "interval": "1fortnight"},
+        {"symbols": ["AA"], "indicators": ["sma20", "wma20"]},
+        {"symbols": ["AA"], "start": "2014-06-03", "end": "2024-06-03"},
+    ],
+)
+def test_company_history_batch_invalid(client, db, payload: dict):
+    response = client.post(
+        reverse("api:company-history-batch"),
+        payload,
+        content_type="application/json",
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+
+
+def test_company_history_batch_span_cap(client, db):
+    max_days = MAX_BATCH_DAYS[Bar.TIMESPAN.minute]
+    start = date(2024, 6, 3)
+    payload = {"symbols": ["AA"], "interval": "5minute", "start": str(start)}
+
+    response = client.post(
+        reverse("api:company-history-batch"),
+        {**payload, "end": str(start + timedelta(days=max_days))},
+        content_type="application/json",
+    )
+
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert f"at most {max_days} days" in response.json()["non_field_errors"][0]
+
+    response = client.post(
+        reverse("api:company-history-batch"),
+        {**payload, "end": str(start + timedelta(days=max_days - 1))},
+        content_type="application/json",
+    )
+
+    assert response.status_code == HTTPStatus.OK
@@ -2,33 +2,179 @@
 Module for handling cache operations and date manipulation.
 """
 
+import time
+from collections.abc import Callable
+from collections.abc import Iterable
 from datetime import date  # pylint: disable=E0401
 from datetime import timedelta  # pylint: disable=E0401
+from functools import wraps
 
-from django.conf import settings  # pylint: disable=E0401
+from asgiref.sync import iscoroutinefunction
 from django.core.cache import cache  # pylint: disable=E0401
+from django.views.decorators.cache import cache_page  # pylint: disable=E0401
+
+# Prefix of the cached company lists
+LIST_CACHE_KEY_PREFIX = "company-list"
+
+# Prefix of the cached company details, followed by the UUID of the company
+DETAIL_CACHE_KEY_PREFIX = "company-view"
+
+
+def detail_key_prefix(pk: object) -> str:
+    """
+    Returns the prefix of the cached details of a company.
+
+    Args:
+        pk (object): The UUID of the company.
+
+    Returns:
+        str: The prefix.
+    """
+    return f"{DETAIL_CACHE_KEY_PREFIX}:{pk}"
+
+
+def generation_key(key_prefix: str) -> str:
+    """
+    Returns the cache key of the generation counter of a cache namespace.
+
+    Args:
+        key_prefix (str): The prefix of the namespace's cache keys.
+
+    Returns:
+        str: The key of the counter.
+    """
+    return f"{key_prefix}:generation"
+
+
+def initial_generation() -> int:
+    """
+    Returns the generation a namespace starts at when it has no counter.
+
+    The counter never expires but can still be evicted or deleted; starting from
+    the current time in microseconds, rather than from 1, keeps a recreated
+    counter above the generations of the entries still in the cache.
+    """
+    return time.time_ns() // 1000
+
+
+def get_generation(key_prefix: str) -> int:
+    """
+    Returns the current generation of a cache namespace, creating its counter on
+    first use.
+
+    Args:
+        key_prefix (str): The prefix of the namespace's cache keys.
+
+    Returns:
+        int: The generation.
+    """
+    key = generation_key(key_prefix)
+    generation = cache.get(key)
+    if generation is None:
+        # Another worker may create the counter first; its value wins
+        cache.add(key, initial_generation(), timeout=None)
+        generation = cache.get(key, initial_generation())
+    return generation
+
+
+async def aget_generation(key_prefix: str) -> int:
+    """
+    Async version of `get_generation`.
+    """
+    key = generation_key(key_prefix)
+    generation = await cache.aget(key)
+    if generation is None:
+        await cache.aadd(key, initial_generation(), timeout=None)
+        generation = await cache.aget(key, initial_generation())
+    return generation
 
 
 def delete_cache(key_prefix: str) -> None:
     """
-    Deletes all cache keys with the given prefix.
+    Invalidates all cache keys with the given prefix.
 
-    Uses Django's built-in caching system to scan and delete cache keys
-    that match the provided prefix. The keys are deleted in bulk, which can be more
-    efficient than deleting each key individually.
+    Rather than scanning the cache for the keys, which walks the whole keyspace of
+    a shared Redis, the namespace's generation counter is incremented. The keys of
+    `versioned_cache_page` include the generation, so the old entries are no
+    longer read and age out through their timeout.
 
     Args:
-        key_prefix (str): The prefix of the cache keys to delete.
+        key_prefix (str): The prefix of the cache keys to invalidate.
     """
-    # Construct the pattern for matching cache keys using the given prefix and Django
-    # settings
-    keys_pattern = (
-        f"views.decorators.cache.cache_*."
-        f"{key_prefix}.*.{settings.LANGUAGE_CODE}.{settings.TIME_ZONE}"
-    )
+    key = generation_key(key_prefix)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # The counter was evicted or never created
+        cache.add(key, initial_generation(), timeout=None)
+
+
+def invalidate_companies(uuids: Iterable[object]) -> None:
+    """
+    Invalidates the cached details of some companies and, if there are any, the
+    cached lists.
+
+    Each detail has its own generation counter; the counters are deleted in one
+    call and recreated above their old values on the next read.
+
+    The list pages are all evicted together. A page is cached under its cursor,
+    which only holds the position the page starts from, so which pages hold a
+    company, or border it through their `next` and `previous` links, is only known
+    by reading them again. Evicting them is a single counter increment, and each
+    page is then rebuilt with one read of the `(created_at, uuid)` index.
+
+    Args:
+        uuids (Iterable[object]): The UUIDs of the companies.
+    """
+    keys = [generation_key(detail_key_prefix(uuid)) for uuid in uuids]
+    if keys:
+        cache.delete_many(keys)
+        delete_cache(LIST_CACHE_KEY_PREFIX)
+
+
+def versioned_cache_page(
+    timeout: int | None,
+    key_prefix: str | Callable[..., str],
+) -> Callable:
+    """
+    Caches the responses of a view, like `cache_page`, under the current
+    generation of a cache namespace.
+
+    Args:
+        timeout (int | None): The cache timeout, in seconds; None to use the
+            max-age of the response.
+        key_prefix (str | Callable[..., str]): The prefix of the namespace's cache
+            keys, or a function of the view's keyword arguments returning it.
+
+    Returns:
+        Callable: The decorator, for sync and async views.
+    """
+
+    def prefix_of(kwargs: dict) -> str:
+        return key_prefix(**kwargs) if callable(key_prefix) else key_prefix
+
+    def decorator(view: Callable) -> Callable:
+        if iscoroutinefunction(view):
+
+            @wraps(view)
+            async def async_view(request, *args, **kwargs):
+                prefix = prefix_of(kwargs)
+                generation = await aget_generation(prefix)
+                cached = cache_page(timeout, key_prefix=f"{prefix}.{generation}")
+                return await cached(view)(request, *args, **kwargs)
+
+            return async_view
 
-    # Delete all cache keys that match the constructed pattern
-    cache.delete_pattern(keys_pattern)
+        @wraps(view)
+        def sync_view(request, *args, **kwargs):
+            prefix = prefix_of(kwargs)
+            generation = get_generation(prefix)
+            cached = cache_page(timeout, key_prefix=f"{prefix}.{generation}")
+            return cached(view)(request, *args, **kwargs)
+
+        return sync_view
+
+    return decorator
 
 
 def get_current_date() -> str:
@@ -58,3 +204,20 @@ def get_current_date_minus_n_days(days: int = 7) -> str:
     past_date = today - timedelta(days=days)
     formatted_date = past_date.strftime("%Y-%m-%d")
     return formatted_date
+
+
+def get_history_range(days: int = 7) -> tuple[date, date]:
+    """
+    Returns the first and last dates of the history shown for a company.
+
+    Args:
+        days (int): The number of days before today the history starts at.
+            Defaults to 7.
+
+    Returns:
+        tuple[date, date]: The first and last dates, both included.
+    """
+    return (
+        date.fromisoformat(get_current_date_minus_n_days(days)),
+        date.fromisoformat(get_current_date()),
+    )
@@ -1,5 +1,7 @@
 from django.contrib import admin
 
 from .models import Exchange
+from .models import ExchangeHoliday
 
 admin.site.register(Exchange)
+admin.site.register(ExchangeHoliday)
@@ -1,6 +1,16 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_delete
+from django.db.models.signals import post_save
 
 
 class ExchangesConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "webull_backend.exchanges"
+
+    def ready(self):
+        from webull_backend.exchanges.calendar import clear_calendars
+
+        # Session calendars are rebuilt once an exchange or a holiday changes
+        for model in (self.get_model("Exchange"), self.get_model("ExchangeHoliday")):
+            post_save.connect(clear_calendars, sender=model)
+            post_delete.connect(clear_calendars, sender=model)
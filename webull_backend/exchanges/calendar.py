@@ -0,0 +1,381 @@
+"""
+Module for answering session questions about an exchange.
+
+A `SessionCalendar` precomputes the sessions of an exchange, from its timezone,
+session hours and holidays, into sorted lists of trading days and of open and close
+timestamps. "Is this a trading day", "when is the next open or close" and "how many
+trading days are between two dates" are then answered by bisection, without touching
+the database. `sessions_of` does the same for whole arrays of timestamps, to group
+bars by session.
+
+`get_calendar` keeps the calendar of each exchange in memory. Saving an exchange or
+one of its holidays drops the calendars of this process; other processes rebuild
+theirs after `CALENDAR_TTL` seconds.
+"""
+
+import time as clock
+from bisect import bisect_left
+from bisect import bisect_right
+from collections.abc import Mapping
+from datetime import date
+from datetime import datetime
+from datetime import time
+from datetime import timedelta
+from functools import cached_property
+from typing import NamedTuple
+from zoneinfo import ZoneInfo
+
+import numpy as np
+
+from webull_backend.exchanges.models import Exchange
+
+# First year of the calendars built from exchanges
+FIRST_YEAR = 2000
+
+# Seconds a calendar is kept in memory
+CALENDAR_TTL = 3600
+
+# Weekday number of Saturday; Saturday and Sunday have no sessions
+SATURDAY = 5
+
+# Calendars of the exchanges, with the monotonic time they were built at
+_calendars: dict[object, tuple[float, "SessionCalendar"]] = {}
+
+
+class SessionHours(NamedTuple):
+    """
+    Session hours of an exchange, in its timezone.
+    """
+
+    regular_open: time
+    regular_close: time
+    extended_open: time
+    extended_close: time
+
+
+class Session(NamedTuple):
+    """
+    Session of a trading day, in the timezone of the exchange.
+    """
+
+    day: date
+    opens: datetime
+    closes: datetime
+    extended_opens: datetime
+    extended_closes: datetime
+
+
+class SessionCalendar:
+    """
+    Sorted index of the sessions of an exchange over a range of dates.
+    """
+
+    def __init__(
+        self,
+        timezone: ZoneInfo,
+        hours: SessionHours,
+        holidays: Mapping[date, time | None],
+        start: date,
+        end: date,
+    ):
+        """
+        Builds the sessions of every trading day between two dates.
+
+        Args:
+            timezone (ZoneInfo): The timezone of the exchange.
+            hours (SessionHours): The session hours.
+            holidays (Mapping[date, time | None]): The early close of each holiday,
+                or None for the days the exchange is closed.
+            start (date): The first date of the index.
+            end (date): The last date of the index.
+        """
+        self.timezone = timezone
+        self.start = start
+        self.end = end
+        self.days: list[date] = []
+        self.opens: list[float] = []
+        self.closes: list[float] = []
+        self.extended_opens: list[float] = []
+        self.extended_closes: list[float] = []
+
+        # The extended session ends as long after an early close as after a
+        # regular one
+        after_hours = datetime.combine(start, hours.extended_close) - datetime.combine(
+            start,
+            hours.regular_close,
+        )
+        for offset in range((end - start).days + 1):
+            day = start + timedelta(days=offset)
+            if day.weekday() >= SATURDAY:
+                continue
+            close = holidays.get(day, hours.regular_close)
+            if close is None:
+                continue
+
+            closes = datetime.combine(day, close, timezone)
+            self.days.append(day)
+            self.opens.append(
+                datetime.combine(day, hours.regular_open, timezone).timestamp(),
+            )
+            self.closes.append(closes.timestamp())
+            self.extended_opens.append(
+                datetime.combine(day, hours.extended_open, timezone).timestamp(),
+            )
+            self.extended_closes.append((closes + after_hours).timestamp())
+
+    @classmethod
+    def from_exchange(
+        cls,
+        exchange: Exchange,
+        end: date | None = None,
+        default_holidays: Mapping[date, time | None] | None = None,
+    ):
+        """
+        Builds the calendar of an exchange from `FIRST_YEAR` on.
+
+        Holidays are usually loaded a year or two ahead, so the years without any
+        holiday of the exchange take theirs from `default_holidays` instead of
+        counting every weekday as a session.
+
+        Args:
+            exchange (Exchange): The exchange.
+            end (date | None): The last date of the index, the end of next year by
+                default.
+            default_holidays (Mapping[date, time | None] | None): The early close
+                of each holiday of the years the exchange has no holidays in.
+
+        Returns:
+            SessionCalendar: The calendar.
+        """
+        timezone = ZoneInfo(exchange.timezone)
+        end = end or date(datetime.now(timezone).year + 1, 12, 31)
+        loaded = dict(exchange.holidays.values_list("date", "early_close"))
+        years = {day.year for day in loaded}
+        holidays = {
+            day: close
+            for day, close in (default_holidays or {}).items()
+            if day.year not in years
+        }
+        return cls(
+            timezone,
+            SessionHours(
+                exchange.regular_open,
+                exchange.regular_close,
+                exchange.extended_open,
+                exchange.extended_close,
+            ),
+            holidays | loaded,
+            date(FIRST_YEAR, 1, 1),
+            end,
+        )
+
+    def _datetime(self, timestamp: float) -> datetime:
+        """
+        Returns a timestamp of the index as a datetime in the exchange timezone.
+        """
+        return datetime.fromtimestamp(timestamp, self.timezone)
+
+    def _at(self, timestamps: list[float], index: int) -> datetime | None:
+        """
+        Returns a timestamp of the index as a datetime, or None past its end.
+        """
+        if index >= len(timestamps):
+            return None
+        return self._datetime(timestamps[index])
+
+    def is_trading_day(self, day: date) -> bool:
+        """
+        Returns whether the exchange has a session on a date.
+
+        Args:
+            day (date): The date.
+
+        Returns:
+            bool: False on weekends, holidays and dates outside the index.
+        """
+        index = bisect_left(self.days, day)
+        return index < len(self.days) and self.days[index] == day
+
+    def trading_days(self, start: date, end: date) -> list[date]:
+        """
+        Returns the trading days between two dates, both included.
+
+        Args:
+            start (date): The first date.
+            end (date): The last date.
+
+        Returns:
+            list[date]: The trading days, in order.
+        """
+        return self.days[bisect_left(self.days, start) : bisect_right(self.days, end)]
+
+    def count_trading_days(self, start: date, end: date) -> int:
+        """
+        Returns the number of trading days between two dates, both included.
+
+        Args:
+            start (date): The first date.
+            end (date): The last date.
+
+        Returns:
+            int: The number of trading days.
+        """
+        return max(0, bisect_right(self.days, end) - bisect_left(self.days, start))
+
+    def session(self, day: date) -> Session | None:
+        """
+        Returns the session of a date.
+
+        Args:
+            day (date): The date.
+
+        Returns:
+            Session | None: The session, or None if the date is not a trading day.
+        """
+        index = bisect_left(self.days, day)
+        if index == len(self.days) or self.days[index] != day:
+            return None
+        return Session(
+            day,
+            self._datetime(self.opens[index]),
+            self._datetime(self.closes[index]),
+            self._datetime(self.extended_opens[index]),
+            self._datetime(self.extended_closes[index]),
+        )
+
+    @cached_property
+    def extended_closes_ms(self) -> np.ndarray:
+        """
+        Returns the extended closes as epoch milliseconds.
+        """
+        return (np.asarray(self.extended_closes) * 1000).astype(np.int64)
+
+    @cached_property
+    def opens_ms(self) -> np.ndarray:
+        """
+        Returns the regular opens as epoch milliseconds, one per trading day.
+        """
+        return (np.asarray(self.opens) * 1000).astype(np.int64)
+
+    @cached_property
+    def ordinals(self) -> np.ndarray:
+        """
+        Returns the proleptic Gregorian ordinals of the trading days.
+        """
+        return np.fromiter((day.toordinal() for day in self.days), dtype=np.int64)
+
+    @cached_property
+    def months(self) -> np.ndarray:
+        """
+        Returns the months of the trading days, counted from year 0.
+        """
+        return np.fromiter(
+            (day.year * 12 + day.month - 1 for day in self.days),
+            dtype=np.int64,
+        )
+
+    def sessions_of(self, timestamps: np.ndarray) -> np.ndarray:
+        """
+        Returns the session each of many timestamps belongs to.
+
+        A timestamp belongs to the first session whose extended close is after it,
+        so bars of the pre-market, the regular and the after-hours sessions, and
+        daily bars stamped at midnight, all map to their trading day.
+
+        Args:
+            timestamps (np.ndarray): Epoch milliseconds.
+
+        Returns:
+            np.ndarray: The indices of the sessions in `days`; `len(days)` for
+                timestamps past the end of the index.
+        """
+        return np.searchsorted(self.extended_closes_ms, timestamps, side="right")
+
+    def is_open(self, moment: datetime, *, extended: bool = False) -> bool:
+        """
+        Returns whether a session is under way.
+
+        Args:
+            moment (datetime): An aware datetime.
+            extended (bool): Whether to count the extended sessions.
+
+        Returns:
+            bool: True between an open and the following close.
+        """
+        opens = self.extended_opens if extended else self.opens
+        closes = self.extended_closes if extended else self.closes
+        timestamp = moment.timestamp()
+        index = bisect_right(opens, timestamp) - 1
+        return index >= 0 and timestamp < closes[index]
+
+    def next_open(self, moment: datetime) -> datetime | None:
+        """
+        Returns the first regular open after a moment.
+
+        Args:
+            moment (datetime): An aware datetime.
+
+        Returns:
+            datetime | None: The open, or None past the end of the index.
+        """
+        return self._at(self.opens, bisect_right(self.opens, moment.timestamp()))
+
+    def next_close(self, moment: datetime) -> datetime | None:
+        """
+        Returns the first regular close after a moment.
+
+        Args:
+            moment (datetime): An aware datetime.
+
+        Returns:
+            datetime | None: The close, or None past the end of the index.
+        """
+        return self._at(self.closes, bisect_right(self.closes, moment.timestamp()))
+
+
+def cached_calendar(exchange_id: object) -> SessionCalendar | None:
+    """
+    Returns the calendar of an exchange if this process has built it recently.
+
+    Args:
+        exchange_id (object): The primary key of the exchange.
+
+    Returns:
+        SessionCalendar | None: The calendar, or None if it has to be built.
+    """
+    cached = _calendars.get(exchange_id)
+    if cached is None or clock.monotonic() - cached[0] > CALENDAR_TTL:
+        return None
+    return cached[1]
+
+
+def get_calendar(
+    exchange: Exchange,
+    default_holidays: Mapping[date, time | None] | None = None,
+) -> SessionCalendar:
+    """
+    Returns the calendar of an exchange, building it on first use.
+
+    Args:
+        exchange (Exchange): The exchange.
+        default_holidays (Mapping[date, time | None] | None): The holidays of the
+            years the exchange has no holidays in (see `from_exchange`).
+
+    Returns:
+        SessionCalendar: The calendar.
+    """
+    calendar = cached_calendar(exchange.pk)
+    if calendar is None:
+        calendar = SessionCalendar.from_exchange(
+            exchange,
+            default_holidays=default_holidays,
+        )
+        _calendars[exchange.pk] = (clock.monotonic(), calendar)
+    return calendar
+
+
+def clear_calendars(**kwargs) -> None:
+    """
+    Drops the calendars of this process; connected to the exchange signals.
+    """
+    _calendars.clear()
@@ -0,0 +1,57 @@
+# Generated by Django 5.0.8 on 2026-10-18 14:16
+
+import datetime
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exchanges', '0003_alter_exchange_description_alter_exchange_mic_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='exchange',
+            name='extended_close',
+            field=models.TimeField(default=datetime.time(20, 0)),
+        ),
+        migrations.AddField(
+            model_name='exchange',
+            name='extended_open',
+            field=models.TimeField(default=datetime.time(4, 0)),
+        ),
+        migrations.AddField(
+            model_name='exchange',
+            name='regular_close',
+            field=models.TimeField(default=datetime.time(16, 0)),
+        ),
+        migrations.AddField(
+            model_name='exchange',
+            name='regular_open',
+            field=models.TimeField(default=datetime.time(9, 30)),
+        ),
+        migrations.AddField(
+            model_name='exchange',
+            name='timezone',
+            field=models.CharField(default='America/New_York', help_text='IANA timezone of the session hours', max_length=50),
+        ),
+        migrations.CreateModel(
+            name='ExchangeHoliday',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('name', models.CharField(blank=True, max_length=50)),
+                ('early_close', models.TimeField(blank=True, help_text='Close time of a shortened session', null=True)),
+                ('exchange', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='holidays', to='exchanges.exchange')),
+            ],
+            options={
+                'ordering': ['date'],
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='exchangeholiday',
+            constraint=models.UniqueConstraint(fields=('exchange', 'date'), name='unique_exchange_holiday_date'),
+        ),
+    ]
@@ -1,10 +1,13 @@
 """
-Module for defining Exchange model.
+Module for defining Exchange and ExchangeHoliday models.
 
-This module imports necessary libraries and defines the Exchange model using Django's
-ORM.
+This module imports necessary libraries and defines the Exchange model, with the
+session hours of the exchange, and the ExchangeHoliday model, with the days it is
+closed or closes early, using Django's ORM.
 """
 
+from datetime import time
+
 from django.db import models
 from django.utils.translation import gettext as _
 from model_utils import Choices
@@ -49,6 +52,21 @@ class Exchange(models.Model):
         help_text=_("Website"),  # Help text for users
     )
 
+    # Timezone the session hours are expressed in
+    timezone = models.CharField(
+        max_length=50,  # Maximum length of 50 characters
+        default="America/New_York",  # Timezone of the US exchanges
+        help_text=_("IANA timezone of the session hours"),  # Help text for users
+    )
+
+    # Regular session hours
+    regular_open = models.TimeField(default=time(9, 30))
+    regular_close = models.TimeField(default=time(16))
+
+    # Extended session hours, from the pre-market open to the after-hours close
+    extended_open = models.TimeField(default=time(4))
+    extended_close = models.TimeField(default=time(20))
+
     # Timestamps for creation and update
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -65,3 +83,46 @@ class Exchange(models.Model):
         :return: String representation of the exchange.
         """
         return f"{self.mic} - {self.description}"
+
+
+class ExchangeHoliday(models.Model):
+    """
+    Represents a day an exchange is closed or closes early.
+    """
+
+    # Exchange the holiday applies to
+    exchange = models.ForeignKey(
+        Exchange,
+        on_delete=models.CASCADE,  # Delete the holidays with the exchange
+        related_name="holidays",
+    )
+
+    # Date of the holiday
+    date = models.DateField()
+
+    # Name of the holiday
+    name = models.CharField(max_length=50, blank=True)
+
+    # Time of an early close; the exchange is closed all day when it is empty
+    early_close = models.TimeField(
+        null=True,  # Allow null values
+        blank=True,  # Allow blank values
+        help_text=_("Close time of a shortened session"),  # Help text for users
+    )
+
+    class Meta:
+        ordering = ["date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["exchange", "date"],
+                name="unique_exchange_holiday_date",
+            ),
+        ]
+
+    def __str__(self):
+        """
+        Returns a string representation of this ExchangeHoliday instance.
+
+        :return: String representation of the holiday.
+        """
+        return f"{self.exchange.mic} - {self.date} {self.name}"
@@ -0,0 +1,86 @@
+from datetime import date
+from datetime import datetime
+from datetime import time
+from zoneinfo import ZoneInfo
+
+import pytest
+
+from webull_backend.exchanges.calendar import SessionCalendar
+from webull_backend.exchanges.calendar import SessionHours
+from webull_backend.exchanges.calendar import get_calendar
+from webull_backend.exchanges.models import Exchange
+from webull_backend.exchanges.models import ExchangeHoliday
+
+NEW_YORK = ZoneInfo("America/New_York")
+
+
+@pytest.fixture
+def calendar() -> SessionCalendar:
+    # Independence Day and its early close eve
+    return SessionCalendar(
+        NEW_YORK,
+        SessionHours(time(9, 30), time(16), time(4), time(20)),
+        {date(2024, 7, 3): time(13), date(2024, 7, 4): None},
+        date(2024, 7, 1),
+        date(2024, 7, 31),
+    )
+
+
+def at(day: int, hour: int, minute: int = 0) -> datetime:
+    return datetime(2024, 7, day, hour, minute, tzinfo=NEW_YORK)
+
+
+def test_trading_days(calendar: SessionCalendar):
+    assert calendar.is_trading_day(date(2024, 7, 3))
+    assert not calendar.is_trading_day(date(2024, 7, 4))
+    assert not calendar.is_trading_day(date(2024, 7, 6))
+    assert not calendar.is_trading_day(date(2024, 8, 1))
+    assert calendar.trading_days(date(2024, 7, 3), date(2024, 7, 8)) == [
+        date(2024, 7, 3),
+        date(2024, 7, 5),
+        date(2024, 7, 8),
+    ]
+    # The calendar covers July
+    assert calendar.count_trading_days(date(2024, 7, 1), date(2024, 7, 31)) == len(
+        calendar.days,
+    )
+    assert calendar.count_trading_days(date(2024, 7, 9), date(2024, 7, 1)) == 0
+
+
+def test_session_early_close(calendar: SessionCalendar):
+    session = calendar.session(date(2024, 7, 3))
+
+    assert session is not None
+    assert session.opens == at(3, 9, 30)
+    assert session.closes == at(3, 13)
+    assert session.extended_closes == at(3, 17)
+    assert calendar.session(date(2024, 7, 4)) is None
+
+
+def test_is_open(calendar: SessionCalendar):
+    assert calendar.is_open(at(2, 10))
+    assert not calendar.is_open(at(2, 8))
+    assert calendar.is_open(at(2, 8), extended=True)
+    assert not calendar.is_open(at(3, 14))
+    assert not calendar.is_open(at(4, 10), extended=True)
+
+
+def test_next_open_and_close(calendar: SessionCalendar):
+    # From the eve of Independence Day to the next Friday
+    assert calendar.next_open(at(3, 10)) == at(5, 9, 30)
+    assert calendar.next_close(at(3, 10)) == at(3, 13)
+    assert calendar.next_close(at(3, 13)) == at(5, 16)
+    assert calendar.next_open(at(31, 10)) is None
+
+
+@pytest.mark.django_db
+def test_get_calendar_is_rebuilt_on_changes():
+    exchange = Exchange.objects.create(mic="XNYS")
+    day = date(2024, 7, 4)
+
+    assert get_calendar(exchange).is_trading_day(day)
+    assert get_calendar(exchange) is get_calendar(exchange)
+
+    ExchangeHoliday.objects.create(exchange=exchange, date=day)
+
+    assert not get_calendar(exchange).is_trading_day(day)
@@ -0,0 +1,7 @@
+from django.contrib import admin
+
+from .models import BackfilledDay
+from .models import Bar
+
+admin.site.register(Bar)
+admin.site.register(BackfilledDay)
@@ -0,0 +1,17 @@
+"""
+Module for defining URL patterns for Polygon-related views.
+"""
+
+from django.urls import path
+
+from .views import PolygonMetricsView
+
+urlpatterns = [
+    # Metrics endpoint
+    # GET: Retrieve the state of the Polygon rate limit and circuit breaker.
+    path(
+        "polygon/metrics/",
+        PolygonMetricsView.as_view(),
+        name="polygon-metrics",
+    ),
+]
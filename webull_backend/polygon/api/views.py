@@ -0,0 +1,41 @@
+"""
+Polygon views for the Webull backend.
+"""
+
+from rest_framework import permissions
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from webull_backend.polygon.limits import get_breaker
+from webull_backend.polygon.limits import get_bucket
+
+
+class PolygonMetricsView(APIView):
+    """
+    View exposing the state of the Polygon rate limit and circuit breaker.
+    """
+
+    permission_classes = [permissions.IsAdminUser]
+
+    def get(self, request):
+        """
+        Returns the fill level of the token bucket and the circuit breaker state.
+
+        Returns:
+            Response: A JSON response with the metrics.
+        """
+        bucket = get_bucket()
+        breaker = get_breaker()
+        return Response(
+            {
+                "rate_limit": {
+                    "tokens": round(bucket.level(), 3),
+                    "capacity": bucket.capacity,
+                    "per_minute": round(bucket.rate * 60, 3),
+                },
+                "circuit_breaker": {
+                    "state": breaker.state(),
+                    "failures": breaker.failures(),
+                },
+            },
+        )
@@ -0,0 +1,253 @@
+"""
+Module for backfilling the bar store from Polygon's grouped daily aggregates.
+
+A grouped daily response holds the daily bar of every US stock ticker for a date, so
+a day of history costs a single call instead of one call per symbol. The bars are
+matched to tickers through a symbol index loaded once, written in bulk, and the date
+is checkpointed in `BackfilledDay` for each exchange of the run in the same
+transaction, so an interrupted backfill resumes with the dates it did not finish,
+and a later run for other exchanges loads the dates again for their tickers.
+"""
+
+import asyncio
+import logging
+from collections import Counter
+from collections.abc import Iterable
+from collections.abc import Sequence
+from datetime import date
+from typing import NamedTuple
+from uuid import UUID
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count
+
+from webull_backend.exchanges.models import Exchange
+from webull_backend.polygon.client import get_client
+from webull_backend.polygon.history import UPSERT_OPTIONS
+from webull_backend.polygon.history import session_start
+from webull_backend.polygon.limits import PolygonUnavailable
+from webull_backend.polygon.models import BackfilledDay
+from webull_backend.polygon.models import Bar
+from webull_backend.polygon.models import IndicatorState
+from webull_backend.tickers.models import Ticker
+
+logger = logging.getLogger(__name__)
+
+# Number of dates fetched at the same time
+DEFAULT_CONCURRENCY = 4
+
+# Number of bars written per statement
+DEFAULT_BATCH_SIZE = 1000
+
+
+class BackfillResult(NamedTuple):
+    """
+    Outcome of a backfill.
+    """
+
+    # Number of bars stored per loaded date
+    loaded: dict[date, int]
+    # Dates that could not be fetched, to retry in a later run
+    failed: list[date]
+
+
+def symbol_index(exchanges: Iterable[Exchange]) -> dict[str, UUID]:
+    """
+    Returns the uuids of the active tickers of exchanges, keyed by symbol.
+
+    Grouped aggregates only carry the symbol, so the symbols listed on several of
+    the exchanges cannot be matched to a ticker and are left out.
+
+    Args:
+        exchanges (Iterable[Exchange]): The exchanges whose tickers are loaded.
+
+    Returns:
+        dict[str, UUID]: The index.
+    """
+    tickers = Ticker.objects.filter(
+        status=Ticker.STATUS.active,
+        exchange__in=exchanges,
+    ).values_list("symbol", "uuid")
+    index = dict(tickers.iterator())
+    ambiguous = (
+        tickers.values("symbol")
+        .annotate(listings=Count("uuid"))
+        .filter(listings__gt=1)
+        .values_list("symbol", flat=True)
+    )
+    for symbol in ambiguous:
+        logger.warning("Skipping %s, listed on several exchanges", symbol)
+        del index[symbol]
+    return index
+
+
+def pending_days(days: Iterable[date], exchanges: Sequence[Exchange]) -> list[date]:
+    """
+    Returns the dates that were not backfilled yet for every exchange.
+
+    Args:
+        days (Iterable[date]): The dates.
+        exchanges (Sequence[Exchange]): The exchanges whose tickers are loaded.
+
+    Returns:
+        list[date]: The dates without a checkpoint of one of the exchanges, in
+            order.
+    """
+    days = sorted(days)
+    if not days:
+        return []
+    done = Counter(
+        BackfilledDay.objects.filter(
+            exchange__in=exchanges,
+            date__range=(days[0], days[-1]),
+        ).values_list("date", flat=True),
+    )
+    return [day for day in days if done[day] < len(exchanges)]
+
+
+def build_grouped_bars(day: date, results: list[dict], index: dict[str, UUID]):
+    """
+    Converts grouped daily aggregates to unsaved bars of the indexed tickers.
+
+    Grouped bars are stamped at the close of the session, while range aggregates
+    start at midnight; the bars are stored at midnight so both requests write the
+    same rows.
+
+    Args:
+        day (date): The market date.
+        results (list[dict]): Polygon's grouped aggregates.
+        index (dict[str, UUID]): The ticker uuids, keyed by symbol.
+
+    Returns:
+        list[Bar]: The bars.
+    """
+    timestamp = session_start(day)
+    return [
+        Bar(
+            ticker_id=index[result["T"]],
+            timespan=Bar.TIMESPAN.day,
+            timestamp=timestamp,
+            open=result["o"],
+            high=result["h"],
+            low=result["l"],
+            close=result["c"],
+            volume=result["v"],
+            vwap=result.get("vw"),
+            transactions=result.get("n"),
+        )
+        for result in results
+        if result.get("T") in index
+    ]
+
+
+@transaction.atomic
+def store_day(
+    day: date,
+    bars: list[Bar],
+    exchanges: Sequence[Exchange],
+    batch_size: int,
+) -> int:
+    """
+    Upserts the bars of a date and checkpoints it for the exchanges, invalidating
+    the indicator states that depend on them.
+
+    Args:
+        day (date): The market date.
+        bars (list[Bar]): The bars.
+        exchanges (Sequence[Exchange]): The exchanges whose tickers are loaded.
+        batch_size (int): The number of bars written per statement.
+
+    Returns:
+        int: The number of bars stored.
+    """
+    Bar.objects.bulk_create(bars, batch_size=batch_size, **UPSERT_OPTIONS)
+    stored = Bar.objects.filter(timespan=Bar.TIMESPAN.day, timestamp=session_start(day))
+    IndicatorState.objects.filter(
+        ticker__in=stored.values("ticker"),
+        timespan=Bar.TIMESPAN.day,
+        timestamp__gte=session_start(day),
+    ).delete()
+    counts = dict(
+        stored.filter(ticker__exchange__in=exchanges)
+        .values("ticker__exchange")
+        .annotate(bars=Count("pk"))
+        .values_list("ticker__exchange", "bars"),
+    )
+    BackfilledDay.objects.bulk_create(
+        [
+            BackfilledDay(exchange=exchange, date=day, bars=counts.get(exchange.pk, 0))
+            for exchange in exchanges
+        ],
+        update_conflicts=True,
+        unique_fields=["exchange", "date"],
+        update_fields=["bars", "updated_at"],
+    )
+    return len(bars)
+
+
+async def backfill_day(
+    day: date,
+    index: dict[str, UUID],
+    exchanges: Sequence[Exchange],
+    batch_size: int,
+) -> int:
+    """
+    Fetches and stores the grouped daily bars of a date.
+
+    Args:
+        day (date): The market date.
+        index (dict[str, UUID]): The ticker uuids, keyed by symbol.
+        exchanges (Sequence[Exchange]): The exchanges whose tickers are loaded.
+        batch_size (int): The number of bars written per statement.
+
+    Returns:
+        int: The number of bars stored.
+    """
+    results = await get_client().get_grouped_daily(day)
+    bars = build_grouped_bars(day, results, index)
+    return await sync_to_async(store_day)(day, bars, exchanges, batch_size)
+
+
+async def backfill(
+    days: list[date],
+    index: dict[str, UUID],
+    exchanges: Sequence[Exchange],
+    concurrency: int = DEFAULT_CONCURRENCY,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> BackfillResult:
+    """
+    Backfills the grouped daily bars of dates, several dates at a time.
+
+    The calls go through the shared rate limit and circuit breaker; a date that
+    cannot be fetched is reported and left for a later run.
+
+    Args:
+        days (list[date]): The market dates.
+        index (dict[str, UUID]): The ticker uuids, keyed by symbol.
+        exchanges (Sequence[Exchange]): The exchanges whose tickers are loaded.
+        concurrency (int): The number of dates fetched at the same time.
+        batch_size (int): The number of bars written per statement.
+
+    Returns:
+        BackfillResult: The loaded and the failed dates.
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    result = BackfillResult({}, [])
+
+    async def run(day: date) -> None:
+        async with semaphore:
+            try:
+                result.loaded[day] = await backfill_day(
+                    day,
+                    index,
+                    exchanges,
+                    batch_size,
+                )
+            except PolygonUnavailable:
+                logger.warning("Could not backfill %s", day)
+                result.failed.append(day)
+
+    await asyncio.gather(*(run(day) for day in days))
+    result.failed.sort()
+    return result
@@ -0,0 +1,178 @@
+"""
+Module for calling the Polygon REST API from asyncio code.
+
+`AsyncPolygonClient` keeps a pool of keep-alive connections and caps the number of
+requests in flight with a semaphore, so async views can fan out many upstream calls
+from a single worker without opening a connection per call. `get_client` returns the
+client of the running event loop, since connections and semaphores cannot be shared
+across loops, and `close_clients` closes it when the ASGI server shuts the loop down
+(see `config.asgi`).
+"""
+
+import asyncio
+from datetime import date
+from weakref import WeakKeyDictionary
+
+import httpx
+from django.conf import settings
+
+from webull_backend.polygon.limits import aguard
+
+# Clients of the running event loops; each uvicorn worker runs a single loop
+_clients: WeakKeyDictionary[asyncio.AbstractEventLoop, "AsyncPolygonClient"] = (
+    WeakKeyDictionary()
+)
+
+
+class AsyncPolygonClient:
+    """
+    Asynchronous client for the Polygon REST API.
+    """
+
+    def __init__(
+        self,
+        api_key: str | None = None,
+        max_connections: int | None = None,
+        max_concurrency: int | None = None,
+        timeout: float | None = None,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        """
+        Initializes the client; unset arguments are read from the settings.
+
+        Args:
+            api_key (str | None): The Polygon API key.
+            max_connections (int | None): The size of the connection pool.
+            max_concurrency (int | None): The maximum number of requests in flight.
+            timeout (float | None): The timeout of each request, in seconds.
+            transport (httpx.AsyncBaseTransport | None): A custom transport, used in
+                tests.
+        """
+        max_connections = max_connections or settings.POLYGON_MAX_CONNECTIONS
+        self.http = httpx.AsyncClient(
+            base_url=settings.POLYGON_API_URL,
+            headers={"Authorization": f"Bearer {api_key or settings.POLYGON_API_KEY}"},
+            limits=httpx.Limits(
+                max_connections=max_connections,
+                max_keepalive_connections=max_connections,
+            ),
+            timeout=timeout or settings.POLYGON_TIMEOUT,
+            transport=transport,
+        )
+        self.semaphore = asyncio.Semaphore(
+            max_concurrency or settings.POLYGON_MAX_CONCURRENCY,
+        )
+
+    async def get(self, url: str, params: dict | None = None) -> dict:
+        """
+        Sends a GET request under the shared rate limit and circuit breaker, once a
+        concurrency slot is free.
+
+        Args:
+            url (str): The path of the endpoint, or an absolute URL.
+            params (dict | None): The query parameters.
+
+        Returns:
+            dict: The decoded JSON response.
+
+        Raises:
+            PolygonUnavailable: If the request is refused, fails or returns an error
+                status.
+        """
+
+        async def send() -> httpx.Response:
+            async with self.semaphore:
+                response = await self.http.get(url, params=params)
+            return response.raise_for_status()
+
+        response = await aguard(send)
+        return response.json()
+
+    async def get_aggs(  # noqa: PLR0913
+        self,
+        symbol: str,
+        multiplier: int,
+        timespan: str,
+        start: date,
+        end: date,
+        *,
+        adjusted: bool = True,
+        limit: int = 50000,
+    ) -> list[dict]:
+        """
+        Fetches the aggregate bars of a ticker, following Polygon's pagination.
+
+        Args:
+            symbol (str): The ticker symbol.
+            multiplier (int): The number of timespans in each bar.
+            timespan (str): The size of the aggregate window.
+            start (date): The first date to fetch.
+            end (date): The last date to fetch.
+            adjusted (bool): Whether the bars are adjusted for splits.
+            limit (int): The maximum number of bars per page.
+
+        Returns:
+            list[dict]: Polygon's aggregates, oldest first.
+        """
+        url = f"/v2/aggs/ticker/{symbol}/range/{multiplier}/{timespan}/{start}/{end}"
+        params = {"adjusted": str(adjusted).lower(), "sort": "asc", "limit": limit}
+
+        next_url: str | None = url
+        next_params: dict | None = params
+        results = []
+        while next_url:
+            page = await self.get(next_url, next_params)
+            results.extend(page.get("results", []))
+            # `next_url` already carries the query parameters
+            next_url, next_params = page.get("next_url"), None
+        return results
+
+    async def get_grouped_daily(
+        self,
+        day: date,
+        *,
+        adjusted: bool = True,
+    ) -> list[dict]:
+        """
+        Fetches the daily bars of every US stock ticker for a date.
+
+        Args:
+            day (date): The market date.
+            adjusted (bool): Whether the bars are adjusted for splits.
+
+        Returns:
+            list[dict]: Polygon's aggregates, with the symbol under `T`.
+        """
+        page = await self.get(
+            f"/v2/aggs/grouped/locale/us/market/stocks/{day}",
+            {"adjusted": str(adjusted).lower()},
+        )
+        return page.get("results", [])
+
+    async def aclose(self) -> None:
+        """
+        Closes the pooled connections.
+        """
+        await self.http.aclose()
+
+
+def get_client() -> AsyncPolygonClient:
+    """
+    Returns the client of the running event loop, creating it on first use.
+
+    Returns:
+        AsyncPolygonClient: The shared client.
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _clients:
+        _clients[loop] = AsyncPolygonClient()
+    return _clients[loop]
+
+
+async def close_clients() -> None:
+    """
+    Closes the client of the running event loop, if it was created.
+    """
+    client = _clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
@@ -0,0 +1,217 @@
+"""
+Module for coalescing identical Polygon requests.
+
+When a popular history entry expires, every worker misses at the same moment. Within
+a process, callers of the same request share a single in-flight future. Across
+workers, the first caller takes a short lock in the shared cache and publishes its
+result there; the other workers wait for that result instead of calling Polygon.
+
+Locks hold a token unique to their owner and are only released by it: a worker whose
+lock expired while it was still fetching must not delete the lock another worker has
+taken since. On Redis the token is compared and the lock deleted atomically by a Lua
+script; other cache backends fall back to a read followed by a delete.
+"""
+
+import asyncio
+import uuid
+from collections.abc import Awaitable
+from collections.abc import Callable
+from datetime import date
+from typing import Any
+from weakref import WeakKeyDictionary
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+
+# Seconds a published result stays available to the waiting workers
+RESULT_TIMEOUT = 5
+
+# Seconds between two checks of a waiting worker
+POLL_INTERVAL = 0.05
+
+# Prefix of the cache keys of the locks and of the published results
+CACHE_KEY_PREFIX = "polygon-flight"
+
+# Deletes the lock at `KEYS[1]` if it still holds the token `ARGV[1]`, and returns
+# whether it did
+RELEASE_SCRIPT = """
+if redis.call("GET", KEYS[1]) == ARGV[1] then
+    return redis.call("DEL", KEYS[1])
+end
+return 0
+"""
+
+
+async def acquire_lock(key: str, ttl: float) -> str | None:
+    """
+    Takes a lock in the shared cache, unless another worker holds it.
+
+    Args:
+        key (str): The cache key of the lock.
+        ttl (float): The seconds after which the lock expires.
+
+    Returns:
+        str | None: The token to release the lock with, or None if it is held.
+    """
+    token = uuid.uuid4().hex
+    return token if await cache.aadd(key, token, timeout=ttl) else None
+
+
+def release_lock(key: str, token: str) -> bool:
+    """
+    Deletes a lock taken by `acquire_lock`, if it still holds the given token.
+
+    Args:
+        key (str): The cache key of the lock.
+        token (str): The token returned by `acquire_lock`.
+
+    Returns:
+        bool: Whether the lock was deleted; False if it expired in the meantime.
+    """
+    client = getattr(cache, "client", None)
+    if client is None or not hasattr(client, "get_client"):
+        if cache.get(key) != token:
+            return False
+        cache.delete(key)
+        return True
+
+    script = client.get_client(write=True).register_script(RELEASE_SCRIPT)
+    # Values are stored serialized, so compare with the serialized token
+    return bool(script(keys=[cache.make_key(key)], args=[client.encode(token)]))
+
+
+async def arelease_lock(key: str, token: str) -> bool:
+    """
+    Deletes a lock taken by `acquire_lock` from async code; see `release_lock`.
+    """
+    return await sync_to_async(release_lock)(key, token)
+
+
+class SingleFlight:
+    """
+    Shares the in-flight call of a key between the callers of an event loop.
+    """
+
+    def __init__(self):
+        """
+        Initializes the table of calls in flight.
+        """
+        self.calls: dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, fetch: Callable[[], Awaitable]) -> Any:
+        """
+        Returns the result of `fetch`, sharing it with concurrent callers of `key`.
+
+        Args:
+            key (str): The identifier of the call.
+            fetch (Callable[[], Awaitable]): Starts the call.
+
+        Returns:
+            Any: The result of the call.
+        """
+        future = self.calls.get(key)
+        if future is None:
+            future = asyncio.ensure_future(fetch())
+            self.calls[key] = future
+            future.add_done_callback(lambda _: self.calls.pop(key, None))
+        # A cancelled caller must not cancel the call the others are waiting for
+        return await asyncio.shield(future)
+
+
+# Single flights of the running event loops
+_flights: WeakKeyDictionary[asyncio.AbstractEventLoop, SingleFlight] = (
+    WeakKeyDictionary()
+)
+
+
+def get_single_flight() -> SingleFlight:
+    """
+    Returns the single flight of the running event loop, creating it on first use.
+
+    Returns:
+        SingleFlight: The shared single flight.
+    """
+    loop = asyncio.get_running_loop()
+    if loop not in _flights:
+        _flights[loop] = SingleFlight()
+    return _flights[loop]
+
+
+def aggs_key(
+    symbol: str,
+    multiplier: int,
+    timespan: str,
+    start: date,
+    end: date,
+) -> str:
+    """
+    Returns the coalescing key of an aggregates request.
+
+    Args:
+        symbol (str): The ticker symbol.
+        multiplier (int): The number of timespans in each bar.
+        timespan (str): The size of the aggregate window.
+        start (date): The first date.
+        end (date): The last date.
+
+    Returns:
+        str: The key.
+    """
+    return f"aggs:{symbol}:{multiplier}:{timespan}:{start}:{end}"
+
+
+async def fetch_shared(key: str, fetch: Callable[[], Awaitable]) -> Any:
+    """
+    Returns the result of `fetch`, letting a single worker run it at a time.
+
+    The worker holding the lock publishes its result in the cache. Waiting workers
+    return that result, take the lock over if it is released without one, and call
+    `fetch` themselves if it is still held after a request timeout.
+
+    Args:
+        key (str): The identifier of the call.
+        fetch (Callable[[], Awaitable]): Starts the call.
+
+    Returns:
+        Any: The result of the call.
+    """
+    lock_key = f"{CACHE_KEY_PREFIX}:lock:{key}"
+    result_key = f"{CACHE_KEY_PREFIX}:result:{key}"
+    # The lock expires after a request timeout, so a crashed worker cannot block the
+    # others for longer than that
+    lock_timeout = settings.POLYGON_TIMEOUT
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + lock_timeout
+
+    while loop.time() < deadline:
+        result = await cache.aget(result_key)
+        if result is not None:
+            return result
+
+        token = await acquire_lock(lock_key, lock_timeout)
+        if token is not None:
+            try:
+                result = await fetch()
+                await cache.aset(result_key, result, timeout=RESULT_TIMEOUT)
+                return result
+            finally:
+                await arelease_lock(lock_key, token)
+
+        await asyncio.sleep(POLL_INTERVAL)
+
+    return await fetch()
+
+
+async def coalesce(key: str, fetch: Callable[[], Awaitable]) -> Any:
+    """
+    Returns the result of `fetch`, coalescing identical calls in and across workers.
+
+    Args:
+        key (str): The identifier of the call.
+        fetch (Callable[[], Awaitable]): Starts the call.
+
+    Returns:
+        Any: The result of the call.
+    """
+    return await get_single_flight().do(key, lambda: fetch_shared(key, fetch))
@@ -0,0 +1,11 @@
+import pytest
+from django.core.cache import cache
+
+from webull_backend.polygon import limits
+
+
+@pytest.fixture(autouse=True)
+def _reset_polygon_state(monkeypatch):
+    # Coalesced results, rate limits and the breaker are kept in the cache
+    cache.clear()
+    monkeypatch.setattr(limits, "_local_buckets", {})
@@ -0,0 +1,369 @@
+"""
+Module for serving price history from the local bar store.
+
+History is read from the `Bar` table with a single range scan over its unique index.
+Only the trading days missing from the store, or whose bars were stored before their
+session settled, are requested from Polygon (see `planner`), following the session
+calendar of the ticker's exchange, and the fetched bars are written back so later
+requests are served locally.
+
+`aget_history` does the same from async views, fetching the gaps concurrently
+through the pooled `AsyncPolygonClient`; identical requests from concurrent views
+and workers are coalesced into one (see `coalesce`).
+"""
+
+import asyncio
+import json
+from collections.abc import Iterable
+from datetime import date
+from datetime import datetime
+from datetime import time
+from datetime import timedelta
+from functools import partial
+from typing import TypedDict
+from typing import cast
+
+from polygon import RESTClient  # API client for interacting with Polygon APIs
+from urllib3 import HTTPResponse
+
+from webull_backend.exchanges.calendar import SessionCalendar
+from webull_backend.polygon.client import get_client
+from webull_backend.polygon.coalesce import aggs_key
+from webull_backend.polygon.coalesce import coalesce
+from webull_backend.polygon.limits import guard
+from webull_backend.polygon.models import Bar
+from webull_backend.polygon.models import IndicatorState
+from webull_backend.polygon.planner import MARKET_TIMEZONE
+from webull_backend.polygon.planner import aticker_calendar
+from webull_backend.polygon.planner import plan_ranges
+from webull_backend.polygon.planner import ticker_calendar
+from webull_backend.polygon.planner import unsettled_days
+from webull_backend.polygon.series import BAR_FIELDS
+from webull_backend.polygon.series import BarSeries
+from webull_backend.tickers.models import Ticker
+
+# Initialize a RESTClient instance with the API key from the environment
+client = RESTClient()
+
+
+def session_date(timestamp: datetime) -> date:
+    """
+    Returns the market date an aggregate window starts on.
+
+    Args:
+        timestamp (datetime): The start of the window.
+
+    Returns:
+        date: The date in the market timezone.
+    """
+    return timestamp.astimezone(MARKET_TIMEZONE).date()
+
+
+def session_start(day: date) -> datetime:
+    """
+    Returns the start of a market date as an aware datetime.
+
+    Args:
+        day (date): The market date.
+
+    Returns:
+        datetime: Midnight of that date in the market timezone.
+    """
+    return datetime.combine(day, time.min, MARKET_TIMEZONE)
+
+
+def fetch_bars(
+    symbol: str,
+    start: date,
+    end: date,
+    timespan: str = Bar.TIMESPAN.day,
+) -> list[dict]:
+    """
+    Fetches aggregate bars from Polygon.
+
+    Args:
+        symbol (str): The ticker symbol.
+        start (date): The first date to fetch.
+        end (date): The last date to fetch.
+        timespan (str): The size of the aggregate window.
+
+    Returns:
+        list[dict]: Polygon's aggregates, keyed as in `BAR_KEYS`.
+
+    Raises:
+        PolygonUnavailable: If the call is refused by the rate limit or the circuit
+            breaker, or fails upstream.
+    """
+    aggs = cast(
+        HTTPResponse,
+        guard(lambda: client.get_aggs(symbol, 1, timespan, start, end, raw=True)),
+    )
+    return json.loads(aggs.data).get("results", [])
+
+
+def build_bars(ticker: Ticker, timespan: str, results: list[dict]) -> list[Bar]:
+    """
+    Converts Polygon aggregates to unsaved bars.
+
+    Args:
+        ticker (Ticker): The ticker the bars belong to.
+        timespan (str): The size of the aggregate window.
+        results (list[dict]): Polygon's aggregates.
+
+    Returns:
+        list[Bar]: The bars.
+    """
+    return BarSeries.from_results(results).to_bars(ticker, timespan)
+
+
+class UpsertOptions(TypedDict):
+    """
+    Arguments of `bulk_create` that turn it into an upsert.
+    """
+
+    update_conflicts: bool
+    unique_fields: list[str]
+    update_fields: list[str]
+
+
+# Arguments of the bar store upserts
+UPSERT_OPTIONS: UpsertOptions = {
+    "update_conflicts": True,
+    "unique_fields": ["ticker", "timespan", "timestamp"],
+    "update_fields": [*BAR_FIELDS[1:], "updated_at"],
+}
+
+
+def stale_states(ticker: Ticker, timespan: str, bars: list[Bar]):
+    """
+    Returns the indicator states that folded in bars older than stored ones.
+
+    Args:
+        ticker (Ticker): The ticker the bars belong to.
+        timespan (str): The size of the aggregate window.
+        bars (list[Bar]): The stored bars.
+
+    Returns:
+        QuerySet: The states at or after the oldest stored bar.
+    """
+    return IndicatorState.objects.filter(
+        ticker=ticker,
+        timespan=timespan,
+        timestamp__gte=min(bar.timestamp for bar in bars),
+    )
+
+
+def store_bars(ticker: Ticker, timespan: str, results: list[dict]) -> list[Bar]:
+    """
+    Upserts Polygon aggregates into the bar store, invalidating the indicator
+    states that depend on them.
+
+    Args:
+        ticker (Ticker): The ticker the bars belong to.
+        timespan (str): The size of the aggregate window.
+        results (list[dict]): Polygon's aggregates.
+
+    Returns:
+        list[Bar]: The stored bars.
+    """
+    bars = Bar.objects.bulk_create(
+        build_bars(ticker, timespan, results),
+        **UPSERT_OPTIONS,
+    )
+    if bars:
+        stale_states(ticker, timespan, bars).delete()
+    return bars
+
+
+async def astore_bars(ticker: Ticker, timespan: str, results: list[dict]) -> list[Bar]:
+    """
+    Upserts Polygon aggregates into the bar store from async code, invalidating the
+    indicator states that depend on them.
+
+    Args:
+        ticker (Ticker): The ticker the bars belong to.
+        timespan (str): The size of the aggregate window.
+        results (list[dict]): Polygon's aggregates.
+
+    Returns:
+        list[Bar]: The stored bars.
+    """
+    bars = await Bar.objects.abulk_create(
+        build_bars(ticker, timespan, results),
+        **UPSERT_OPTIONS,
+    )
+    if bars:
+        await stale_states(ticker, timespan, bars).adelete()
+    return bars
+
+
+def stored_bars(ticker: Ticker, start: date, end: date, timespan: str):
+    """
+    Returns the range scan of the stored bars of a ticker between two dates.
+
+    Args:
+        ticker (Ticker): The ticker.
+        start (date): The first date.
+        end (date): The last date.
+        timespan (str): The size of the aggregate window.
+
+    Returns:
+        QuerySet: The bars as `BAR_FIELDS` tuples followed by the time they were
+            fetched at, oldest first.
+    """
+    return (
+        Bar.objects.filter(
+            ticker=ticker,
+            timespan=timespan,
+            timestamp__gte=session_start(start),
+            timestamp__lt=session_start(end + timedelta(days=1)),
+        )
+        .order_by("timestamp")
+        .values_list(*BAR_FIELDS, "updated_at")
+    )
+
+
+def index_rows(
+    rows: Iterable[tuple],
+) -> tuple[dict[datetime, tuple], dict[date, datetime]]:
+    """
+    Splits the rows of `stored_bars` into bars and fetch times.
+
+    Args:
+        rows (Iterable[tuple]): The rows of `stored_bars`.
+
+    Returns:
+        tuple[dict[datetime, tuple], dict[date, datetime]]: The `BAR_FIELDS` tuples
+            keyed by timestamp, and the earliest time the bars of each market date
+            were fetched at.
+    """
+    bars: dict[datetime, tuple] = {}
+    fetched: dict[date, datetime] = {}
+    for *bar, updated_at in rows:
+        bars[bar[0]] = tuple(bar)
+        day = session_date(bar[0])
+        fetched[day] = min(updated_at, fetched.get(day, updated_at))
+    return bars, fetched
+
+
+def missing_ranges(
+    fetched: dict[date, datetime],
+    start: date,
+    end: date,
+    calendar: SessionCalendar,
+) -> list[tuple[date, date]]:
+    """
+    Returns the ranges of a request that are not covered by settled stored bars.
+
+    Args:
+        fetched (dict[date, datetime]): The earliest time the stored bars of each
+            market date were fetched at.
+        start (date): The first date of the request.
+        end (date): The last date of the request.
+        calendar (SessionCalendar): The calendar of the ticker's exchange.
+
+    Returns:
+        list[tuple[date, date]]: The inclusive ranges to fetch.
+    """
+    today = datetime.now(calendar.timezone).date()
+    unsettled = unsettled_days(fetched, calendar)
+    return plan_ranges(fetched, start, end, today, unsettled, calendar)
+
+
+def merge_bars(bars: dict[datetime, tuple], fetched: list[Bar]) -> None:
+    """
+    Adds fetched bars to the stored ones, replacing bars with the same timestamp.
+
+    Args:
+        bars (dict[datetime, tuple]): The stored bars, keyed by timestamp.
+        fetched (list[Bar]): The fetched bars.
+    """
+    for bar in fetched:
+        bars[bar.timestamp] = tuple(getattr(bar, field) for field in BAR_FIELDS)
+
+
+def to_history(symbol: str, bars: dict[datetime, tuple]) -> dict:
+    """
+    Builds a history response from bars.
+
+    Args:
+        symbol (str): The ticker symbol.
+        bars (dict[datetime, tuple]): The bars, keyed by timestamp.
+
+    Returns:
+        dict: The history in the layout of Polygon's aggregates response.
+    """
+    series = BarSeries.from_rows(bars[timestamp] for timestamp in sorted(bars))
+    return series.to_history(symbol)
+
+
+def get_history(
+    ticker: Ticker,
+    start: date,
+    end: date,
+    timespan: str = Bar.TIMESPAN.day,
+) -> dict:
+    """
+    Returns the bars of a ticker between two dates, fetching missing ranges.
+
+    Args:
+        ticker (Ticker): The ticker.
+        start (date): The first date of the history.
+        end (date): The last date of the history.
+        timespan (str): The size of the aggregate window.
+
+    Returns:
+        dict: The history in the layout of Polygon's aggregates response.
+    """
+    bars, fetched = index_rows(stored_bars(ticker, start, end, timespan))
+    calendar = ticker_calendar(ticker)
+
+    for first, last in missing_ranges(fetched, start, end, calendar):
+        results = fetch_bars(ticker.symbol, first, last, timespan)
+        merge_bars(bars, store_bars(ticker, timespan, results))
+
+    return to_history(ticker.symbol, bars)
+
+
+async def aget_history(
+    ticker: Ticker,
+    start: date,
+    end: date,
+    timespan: str = Bar.TIMESPAN.day,
+) -> dict:
+    """
+    Returns the bars of a ticker between two dates from async code.
+
+    The missing ranges are fetched concurrently.
+
+    Args:
+        ticker (Ticker): The ticker.
+        start (date): The first date of the history.
+        end (date): The last date of the history.
+        timespan (str): The size of the aggregate window.
+
+    Returns:
+        dict: The history in the layout of Polygon's aggregates response.
+    """
+    bars, fetched = index_rows(
+        [row async for row in stored_bars(ticker, start, end, timespan)],
+    )
+
+    calendar = await aticker_calendar(ticker)
+
+    ranges = missing_ranges(fetched, start, end, calendar)
+    if ranges:
+        client = get_client()
+        pages = await asyncio.gather(
+            *(
+                coalesce(
+                    aggs_key(ticker.symbol, 1, timespan, first, last),
+                    partial(client.get_aggs, ticker.symbol, 1, timespan, first, last),
+                )
+                for first, last in ranges
+            ),
+        )
+        results = [result for page in pages for result in page]
+        merge_bars(bars, await astore_bars(ticker, timespan, results))
+
+    return to_history(ticker.symbol, bars)
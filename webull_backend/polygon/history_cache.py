@@ -0,0 +1,186 @@
+"""
+Module for caching history with session-aware freshness.
+
+History entries are cached for as long as the sessions of the ticker's exchange
+allow (see `planner.history_ttl`): entries made of closed sessions for a day,
+entries including the open session for a minute. Once an entry expires it is kept
+for another `POLYGON_HISTORY_STALE_TTL` seconds, during which it is served stale
+while a single worker refreshes it in the background, so requests never wait on
+Polygon for data that is only seconds old.
+
+Each entry records a version, a digest of its history, so that responses built
+from it can be validated with an ETag without rebuilding them.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import time
+from datetime import UTC
+from datetime import date
+from datetime import datetime
+from typing import NamedTuple
+
+from django.conf import settings
+from django.core.cache import cache
+
+from webull_backend.polygon.coalesce import acquire_lock
+from webull_backend.polygon.coalesce import arelease_lock
+from webull_backend.polygon.coalesce import get_single_flight
+from webull_backend.polygon.history import aget_history
+from webull_backend.polygon.limits import PolygonUnavailable
+from webull_backend.polygon.models import Bar
+from webull_backend.polygon.planner import aticker_calendar
+from webull_backend.polygon.planner import history_ttl
+from webull_backend.tickers.models import Ticker
+
+logger = logging.getLogger(__name__)
+
+# Prefix of the cache keys of the history entries
+CACHE_KEY_PREFIX = "polygon-history"
+
+# Background refreshes in flight, referenced so they are not garbage collected
+_refreshes: set[asyncio.Task] = set()
+
+
+class CachedHistory(NamedTuple):
+    """
+    History read through the cache.
+    """
+
+    history: dict
+    # Seconds the history stays fresh, 0 if it is served stale
+    max_age: int
+    # Digest of the history, which changes whenever the history does
+    version: str
+
+
+def history_version(history: dict) -> str:
+    """
+    Returns the digest of a history.
+
+    Args:
+        history (dict): The history.
+
+    Returns:
+        str: The hexadecimal digest.
+    """
+    content = json.dumps(history, sort_keys=True, default=str).encode()
+    return hashlib.blake2b(content, digest_size=16).hexdigest()
+
+
+def history_key(ticker: Ticker, start: date, end: date, timespan: str) -> str:
+    """
+    Returns the cache key of a history entry.
+
+    Args:
+        ticker (Ticker): The ticker.
+        start (date): The first date of the history.
+        end (date): The last date of the history.
+        timespan (str): The size of the aggregate window.
+
+    Returns:
+        str: The key.
+    """
+    return f"{CACHE_KEY_PREFIX}:{ticker.pk}:{timespan}:{start}:{end}"
+
+
+async def refresh_history(
+    ticker: Ticker,
+    start: date,
+    end: date,
+    timespan: str = Bar.TIMESPAN.day,
+) -> CachedHistory:
+    """
+    Reads history from the bar store and caches it.
+
+    Args:
+        ticker (Ticker): The ticker.
+        start (date): The first date of the history.
+        end (date): The last date of the history.
+        timespan (str): The size of the aggregate window.
+
+    Returns:
+        CachedHistory: The fresh history.
+    """
+    history = await aget_history(ticker, start, end, timespan)
+    ttl = history_ttl(end, datetime.now(UTC), await aticker_calendar(ticker))
+    version = history_version(history)
+    await cache.aset(
+        history_key(ticker, start, end, timespan),
+        {"history": history, "fresh_until": time.time() + ttl, "version": version},
+        timeout=ttl + settings.POLYGON_HISTORY_STALE_TTL,
+    )
+    return CachedHistory(history, ttl, version)
+
+
+async def refresh_in_background(
+    ticker: Ticker,
+    start: date,
+    end: date,
+    timespan: str,
+) -> None:
+    """
+    Refreshes a stale history entry, unless another worker already does.
+
+    Args:
+        ticker (Ticker): The ticker.
+        start (date): The first date of the history.
+        end (date): The last date of the history.
+        timespan (str): The size of the aggregate window.
+    """
+    lock_key = f"{history_key(ticker, start, end, timespan)}:refresh"
+    token = await acquire_lock(lock_key, settings.POLYGON_TIMEOUT)
+    if token is None:
+        return
+
+    try:
+        await refresh_history(ticker, start, end, timespan)
+    except PolygonUnavailable:
+        # The stale entry keeps being served until it expires
+        logger.warning("Could not refresh the history of %s", ticker.symbol)
+    except Exception:
+        # Nobody awaits the task, so anything else would only surface as a
+        # "Task exception was never retrieved" warning when it is collected
+        logger.exception("Failed to refresh the history of %s", ticker.symbol)
+    finally:
+        await arelease_lock(lock_key, token)
+
+
+async def aget_cached_history(
+    ticker: Ticker,
+    start: date,
+    end: date,
+    timespan: str = Bar.TIMESPAN.day,
+) -> CachedHistory:
+    """
+    Returns the history of a ticker, serving stale entries while they refresh.
+
+    Args:
+        ticker (Ticker): The ticker.
+        start (date): The first date of the history.
+        end (date): The last date of the history.
+        timespan (str): The size of the aggregate window.
+
+    Returns:
+        CachedHistory: The history and the seconds it stays fresh.
+    """
+    key = history_key(ticker, start, end, timespan)
+    entry = await cache.aget(key)
+
+    if entry is None:
+        # Concurrent misses of this worker share a single refresh
+        return await get_single_flight().do(
+            key,
+            lambda: refresh_history(ticker, start, end, timespan),
+        )
+
+    max_age = int(entry["fresh_until"] - time.time())
+    if max_age > 0:
+        return CachedHistory(entry["history"], max_age, entry["version"])
+
+    task = asyncio.create_task(refresh_in_background(ticker, start, end, timespan))
+    _refreshes.add(task)
+    task.add_done_callback(_refreshes.discard)
+    return CachedHistory(entry["history"], 0, entry["version"])
@@ -0,0 +1,274 @@
+"""
+Module for serving indicator values from persisted indicator states.
+
+The state and outputs of an indicator after each closed daily bar are stored in
+`IndicatorState`, next to the bars. `build_indicator_states` builds them over the
+whole bar store ahead of the requests. A request reads the stored outputs of its
+window; bars that have no state yet are folded one at a time into the last stored
+state before them, and their states are stored in turn, so each closed bar is only
+ever computed once. Without a state to resume from, a request only warms up over
+`WARMUP_FACTOR` times the lookback of the indicator, whose outputs then match the
+full history to well within the precision of the prices. The bar of the open
+session keeps changing, so its outputs are computed without being stored.
+
+Storing bars older than existing states invalidates those states (see
+`history.store_bars`); they are rebuilt on the next request.
+
+Other intervals are resampled on the fly, so their indicators are computed over the
+returned bars instead.
+"""
+
+import copy
+from collections.abc import Iterable
+from datetime import UTC
+from datetime import datetime
+
+import numpy as np
+from django.db.models import Subquery
+from django.db.models import Value
+from django.db.models.functions import Coalesce
+
+from webull_backend.polygon.history import session_date
+from webull_backend.polygon.history import session_start
+from webull_backend.polygon.indicators import Indicator
+from webull_backend.polygon.indicators import to_json
+from webull_backend.polygon.models import Bar
+from webull_backend.polygon.models import IndicatorState
+from webull_backend.polygon.resample import Interval
+from webull_backend.polygon.series import BarSeries
+from webull_backend.tickers.models import Ticker
+
+# Interval whose indicator states are persisted
+PERSISTED_INTERVAL = Interval(1, Bar.TIMESPAN.day)
+
+# Lookbacks of an indicator folded before the bars of a request that has no state
+# to resume from; the recursive averages forget their seed by a factor of at least
+# e^-10 over this many bars
+WARMUP_FACTOR = 10
+
+# Time before every bar, to fold the whole store from
+EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+def to_datetime(timestamp: int) -> datetime:
+    """
+    Converts epoch milliseconds to an aware datetime.
+    """
+    return datetime.fromtimestamp(timestamp / 1000, UTC)
+
+
+def to_milliseconds(timestamp: datetime) -> int:
+    """
+    Converts an aware datetime to epoch milliseconds.
+    """
+    return int(timestamp.timestamp() * 1000)
+
+
+def fold(
+    ticker: Ticker,
+    indicator: Indicator,
+    state: dict,
+    bars: Iterable[tuple[datetime, float]],
+    closed: datetime,
+) -> tuple[dict[int, dict], list[IndicatorState]]:
+    """
+    Folds daily bars into the state of an indicator, in place.
+
+    Args:
+        ticker (Ticker): The ticker.
+        indicator (Indicator): The indicator.
+        state (dict): The state before the first bar.
+        bars (Iterable[tuple[datetime, float]]): The timestamps and closes, in order.
+        closed (datetime): The start of the open session; earlier bars are closed.
+
+    Returns:
+        tuple[dict[int, dict], list[IndicatorState]]: The outputs, keyed by bar
+            timestamp in epoch milliseconds, and the unsaved states of the closed
+            bars.
+    """
+    outputs, states = {}, []
+    for timestamp, close in bars:
+        values = indicator.push(state, close)
+        outputs[to_milliseconds(timestamp)] = values
+        if timestamp < closed:
+            states.append(
+                IndicatorState(
+                    ticker=ticker,
+                    timespan=PERSISTED_INTERVAL.timespan,
+                    indicator=str(indicator),
+                    timestamp=timestamp,
+                    state=copy.deepcopy(state),
+                    values=values,
+                ),
+            )
+    return outputs, states
+
+
+def save_states(states: list[IndicatorState]) -> None:
+    """
+    Stores indicator states, replacing the ones of the same bars.
+    """
+    IndicatorState.objects.bulk_create(
+        states,
+        update_conflicts=True,
+        unique_fields=["ticker", "timespan", "indicator", "timestamp"],
+        update_fields=["state", "values"],
+    )
+
+
+def stored_outputs(
+    ticker: Ticker,
+    indicator: Indicator,
+    series: BarSeries,
+    now: datetime,
+) -> dict[int, dict]:
+    """
+    Returns the outputs of an indicator at the daily bars of a series, folding the
+    bars without a stored state into the last state before them.
+
+    Args:
+        ticker (Ticker): The ticker.
+        indicator (Indicator): The indicator.
+        series (BarSeries): The daily bars, all in the bar store.
+        now (datetime): The current time; bars of earlier sessions are closed.
+
+    Returns:
+        dict[int, dict]: The outputs, keyed by bar timestamp in epoch milliseconds.
+    """
+    timespan = PERSISTED_INTERVAL.timespan
+    states = IndicatorState.objects.filter(
+        ticker=ticker,
+        timespan=timespan,
+        indicator=str(indicator),
+    )
+    first, last = to_datetime(series.timestamp[0]), to_datetime(series.timestamp[-1])
+    outputs = {
+        to_milliseconds(timestamp): values
+        for timestamp, values in states.filter(
+            timestamp__range=(first, last),
+        ).values_list("timestamp", "values")
+    }
+    missing = [t for t in series.timestamp.tolist() if t not in outputs]
+    if not missing:
+        return outputs
+
+    first_missing = to_datetime(missing[0])
+    previous = (
+        states.filter(timestamp__lt=first_missing)
+        .order_by("-timestamp")
+        .values_list("timestamp", "state")
+        .first()
+    )
+    bars = Bar.objects.filter(ticker=ticker, timespan=timespan, timestamp__lte=last)
+    if previous is None:
+        # Only the last bars of the warm-up, or all of them if there are fewer
+        warmup = indicator.lookback * WARMUP_FACTOR
+        start = (
+            bars.filter(timestamp__lt=first_missing)
+            .order_by("-timestamp")
+            .values("timestamp")[warmup - 1 : warmup]
+        )
+        bars = bars.filter(timestamp__gte=Coalesce(Subquery(start), Value(EPOCH)))
+        state = indicator.initial_state()
+    else:
+        bars = bars.filter(timestamp__gt=previous[0])
+        state = previous[1]
+
+    folded, new_states = fold(
+        ticker,
+        indicator,
+        state,
+        bars.order_by("timestamp").values_list("timestamp", "close"),
+        session_start(session_date(now)),
+    )
+    outputs |= folded
+    if previous is None:
+        # The warm-up only approximates the states before the request
+        new_states = [new for new in new_states if new.timestamp >= first_missing]
+    save_states(new_states)
+    return outputs
+
+
+def build_states(ticker: Ticker, indicator: Indicator, now: datetime) -> int:
+    """
+    Folds the closed daily bars of a ticker that have no state yet, from its last
+    stored state or its first bar, and stores their states.
+
+    Args:
+        ticker (Ticker): The ticker.
+        indicator (Indicator): The indicator.
+        now (datetime): The current time; bars of earlier sessions are closed.
+
+    Returns:
+        int: The number of states stored.
+    """
+    timespan = PERSISTED_INTERVAL.timespan
+    previous = (
+        IndicatorState.objects.filter(
+            ticker=ticker,
+            timespan=timespan,
+            indicator=str(indicator),
+        )
+        .order_by("-timestamp")
+        .values_list("timestamp", "state")
+        .first()
+    )
+    since, state = previous or (EPOCH, indicator.initial_state())
+    closed = session_start(session_date(now))
+    bars = Bar.objects.filter(
+        ticker=ticker,
+        timespan=timespan,
+        timestamp__gt=since,
+        timestamp__lt=closed,
+    )
+    _, states = fold(
+        ticker,
+        indicator,
+        state,
+        bars.order_by("timestamp").values_list("timestamp", "close").iterator(),
+        closed,
+    )
+    save_states(states)
+    return len(states)
+
+
+def indicator_values(
+    ticker: Ticker,
+    series: BarSeries,
+    indicators: list[Indicator],
+    interval: Interval,
+    now: datetime | None = None,
+) -> dict[str, dict[str, list[float | None]]]:
+    """
+    Returns the outputs of indicators at each bar of a history.
+
+    Args:
+        ticker (Ticker): The ticker.
+        series (BarSeries): The bars of the history.
+        indicators (list[Indicator]): The indicators.
+        interval (Interval): The interval of the bars.
+        now (datetime | None): The current time, now by default.
+
+    Returns:
+        dict[str, dict[str, list[float | None]]]: A list of values per output of
+            each indicator, aligned with the bars.
+    """
+    now = now or datetime.now(UTC)
+    result = {}
+    for indicator in indicators:
+        if interval != PERSISTED_INTERVAL or not len(series):
+            columns = indicator.compute(series.close)
+        else:
+            outputs = stored_outputs(ticker, indicator, series, now)
+            bars = [outputs.get(t, {}) for t in series.timestamp.tolist()]
+            columns = {
+                name: np.array(
+                    [bar.get(name) for bar in bars],
+                    dtype=np.float64,
+                )
+                for name in indicator.outputs
+            }
+        result[str(indicator)] = {
+            name: to_json(column) for name, column in columns.items()
+        }
+    return result
@@ -0,0 +1,439 @@
+"""
+Module for computing technical indicators over bar closes.
+
+Each indicator can run in two modes that give the same values:
+
+* `compute` takes a whole column of closes and returns a column per output, with
+  NumPy operations over the column (cumulative sums, sliding windows and a chunked
+  closed form of the exponential recurrences).
+* `push` folds a single close into a state and returns the outputs at that bar, in
+  constant time. The state is a JSON-serializable dict, so it can be persisted with
+  the bars (see `indicator_states`) and updated when the next bar arrives, instead
+  of recomputing the whole window.
+
+Outputs are NaN, or None when pushed, until the indicator has seen enough bars.
+"""
+
+import math
+import re
+from collections.abc import Iterable
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+# Indicator format, e.g. "sma20" or "macd"
+INDICATOR_PATTERN = re.compile(r"^(?P<name>[a-z]+)(?P<period>[1-9]\d{0,2})?$")
+
+# Largest exponent of the decay factors of a chunk of `ewm`, so they stay finite
+MAX_EXPONENT = 30
+
+
+def ewm(values: np.ndarray, alpha: float, initial: float) -> np.ndarray:
+    """
+    Returns the exponential recurrence y = (1 - alpha) * y_prev + alpha * x.
+
+    The recurrence is unrolled in closed form over chunks of the column, short
+    enough that the decay factors stay within the float range.
+
+    Args:
+        values (np.ndarray): The inputs.
+        alpha (float): The smoothing factor, between 0 and 1.
+        initial (float): The value before the first input.
+
+    Returns:
+        np.ndarray: The value after each input.
+    """
+    decay = 1 - alpha
+    if decay == 0:
+        return values.astype(np.float64)
+
+    result = np.empty(len(values))
+    size = max(1, int(MAX_EXPONENT / -math.log(decay)))
+    previous = initial
+    for start in range(0, len(values), size):
+        chunk = values[start : start + size]
+        powers = decay ** np.arange(len(chunk))
+        result[start : start + len(chunk)] = (
+            powers * decay * previous + alpha * powers * np.cumsum(chunk / powers)
+        )
+        previous = result[start + len(chunk) - 1]
+    return result
+
+
+def seeded_ewm(values: np.ndarray, period: int, alpha: float) -> np.ndarray:
+    """
+    Returns an exponential average seeded with the mean of its first inputs.
+
+    Args:
+        values (np.ndarray): The inputs.
+        period (int): The number of inputs of the seed.
+        alpha (float): The smoothing factor.
+
+    Returns:
+        np.ndarray: The average after each input, NaN before the seed.
+    """
+    result = np.full(len(values), np.nan)
+    if len(values) < period:
+        return result
+    seed = values[:period].mean()
+    result[period - 1] = seed
+    result[period:] = ewm(values[period:], alpha, seed)
+    return result
+
+
+class Indicator:
+    """
+    Base class of the indicators.
+    """
+
+    # Name of the indicator in requests
+    name = ""
+
+    # Names of the values the indicator returns at each bar
+    outputs: tuple[str, ...] = ()
+
+    # Period used when none is requested
+    default_period = 0
+
+    def __init__(self, period: int | None = None):
+        """
+        Initializes the indicator.
+
+        Args:
+            period (int | None): The number of bars of the indicator's window.
+        """
+        self.period = period or self.default_period
+
+    def __str__(self) -> str:
+        """
+        Returns the indicator in the format read by `parse_indicators`.
+        """
+        return f"{self.name}{self.period}"
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Returns whether two indicators are the same.
+        """
+        return isinstance(other, Indicator) and str(self) == str(other)
+
+    def __hash__(self) -> int:
+        """
+        Returns the hash of the indicator.
+        """
+        return hash(str(self))
+
+    @property
+    def lookback(self) -> int:
+        """
+        Returns the number of bars folded until every output is available.
+        """
+        return self.period
+
+    def compute(self, close: np.ndarray) -> dict[str, np.ndarray]:
+        """
+        Computes the indicator over a column of closes.
+
+        Args:
+            close (np.ndarray): The closes, oldest first.
+
+        Returns:
+            dict[str, np.ndarray]: A column per output.
+        """
+        raise NotImplementedError
+
+    def initial_state(self) -> dict:
+        """
+        Returns the state before the first bar.
+        """
+        raise NotImplementedError
+
+    def push(self, state: dict, close: float) -> dict[str, float | None]:
+        """
+        Folds a close into a state, in place.
+
+        Args:
+            state (dict): The state after the previous bar.
+            close (float): The close of the bar.
+
+        Returns:
+            dict[str, float | None]: The outputs at the bar.
+        """
+        raise NotImplementedError
+
+
+class SMA(Indicator):
+    """
+    Simple moving average.
+    """
+
+    name = "sma"
+    outputs = ("sma",)
+    default_period = 20
+
+    def compute(self, close: np.ndarray) -> dict[str, np.ndarray]:
+        sma = np.full(len(close), np.nan)
+        if len(close) >= self.period:
+            sums = np.cumsum(np.insert(close, 0, 0.0))
+            window_sums = sums[self.period :] - sums[: -self.period]
+            sma[self.period - 1 :] = window_sums / self.period
+        return {"sma": sma}
+
+    def initial_state(self) -> dict:
+        return {"window": [], "sum": 0.0}
+
+    def push(self, state: dict, close: float) -> dict[str, float | None]:
+        window = state["window"]
+        window.append(close)
+        state["sum"] += close
+        if len(window) > self.period:
+            state["sum"] -= window.pop(0)
+        full = len(window) == self.period
+        return {"sma": state["sum"] / self.period if full else None}
+
+
+class EMA(Indicator):
+    """
+    Exponential moving average, seeded with the simple average of its first bars.
+    """
+
+    name = "ema"
+    outputs = ("ema",)
+    default_period = 20
+
+    @property
+    def alpha(self) -> float:
+        """
+        Returns the smoothing factor.
+        """
+        return 2 / (self.period + 1)
+
+    def compute(self, close: np.ndarray) -> dict[str, np.ndarray]:
+        return {"ema": seeded_ewm(close, self.period, self.alpha)}
+
+    def initial_state(self) -> dict:
+        return {"count": 0, "sum": 0.0, "value": None}
+
+    def push(self, state: dict, close: float) -> dict[str, float | None]:
+        state["count"] += 1
+        if state["value"] is not None:
+            state["value"] += self.alpha * (close - state["value"])
+        elif state["count"] < self.period:
+            state["sum"] += close
+        else:
+            state["value"] = (state["sum"] + close) / self.period
+        return {"ema": state["value"]}
+
+
+class RSI(Indicator):
+    """
+    Relative strength index, with Wilder's smoothing.
+    """
+
+    name = "rsi"
+    outputs = ("rsi",)
+    default_period = 14
+
+    @property
+    def lookback(self) -> int:
+        # The first close has no change
+        return self.period + 1
+
+    @staticmethod
+    def strength(gain: float, loss: float) -> float:
+        """
+        Returns the RSI of an average gain and loss.
+        """
+        if loss == 0:
+            return 100.0
+        return 100 - 100 / (1 + gain / loss)
+
+    def compute(self, close: np.ndarray) -> dict[str, np.ndarray]:
+        rsi = np.full(len(close), np.nan)
+        changes = np.diff(close)
+        gain = seeded_ewm(np.maximum(changes, 0), self.period, 1 / self.period)
+        loss = seeded_ewm(np.maximum(-changes, 0), self.period, 1 / self.period)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            # NaN averages, before the seed, stay NaN
+            rsi[1:] = np.where(loss == 0, 100.0, 100 - 100 / (1 + gain / loss))
+        return {"rsi": rsi}
+
+    def initial_state(self) -> dict:
+        return {"count": 0, "last": None, "gain": 0.0, "loss": 0.0}
+
+    def push(self, state: dict, close: float) -> dict[str, float | None]:
+        last, state["last"] = state["last"], close
+        if last is None:
+            return {"rsi": None}
+
+        change = close - last
+        gain, loss = max(change, 0.0), max(-change, 0.0)
+        state["count"] += 1
+        if state["count"] <= self.period:
+            # Sums of the first changes, averaged once there are enough of them
+            state["gain"] += gain
+            state["loss"] += loss
+            if state["count"] < self.period:
+                return {"rsi": None}
+            state["gain"] /= self.period
+            state["loss"] /= self.period
+        else:
+            state["gain"] += (gain - state["gain"]) / self.period
+            state["loss"] += (loss - state["loss"]) / self.period
+        return {"rsi": self.strength(state["gain"], state["loss"])}
+
+
+class MACD(Indicator):
+    """
+    Moving average convergence divergence, with the usual 12, 26 and 9 bar
+    averages.
+    """
+
+    name = "macd"
+    outputs = ("macd", "signal", "histogram")
+
+    def __init__(self, period: int | None = None):
+        """
+        Initializes the averages of the indicator.
+
+        Args:
+            period (int | None): Not supported; the periods are fixed.
+        """
+        if period is not None:
+            msg = "macd does not take a period"
+            raise ValueError(msg)
+        super().__init__()
+        self.fast, self.slow, self.signal = EMA(12), EMA(26), EMA(9)
+
+    def __str__(self) -> str:
+        return self.name
+
+    @property
+    def lookback(self) -> int:
+        # The signal averages the MACD from the first bar of the slow average on
+        return self.slow.period + self.signal.period - 1
+
+    def compute(self, close: np.ndarray) -> dict[str, np.ndarray]:
+        macd = self.fast.compute(close)["ema"] - self.slow.compute(close)["ema"]
+        signal = np.full(len(close), np.nan)
+        valid = ~np.isnan(macd)
+        signal[valid] = self.signal.compute(macd[valid])["ema"]
+        return {"macd": macd, "signal": signal, "histogram": macd - signal}
+
+    def initial_state(self) -> dict:
+        return {
+            "fast": self.fast.initial_state(),
+            "slow": self.slow.initial_state(),
+            "signal": self.signal.initial_state(),
+        }
+
+    def push(self, state: dict, close: float) -> dict[str, float | None]:
+        fast = self.fast.push(state["fast"], close)["ema"]
+        slow = self.slow.push(state["slow"], close)["ema"]
+        # The fast average is ready first, but both are needed
+        if fast is None or slow is None:
+            return {"macd": None, "signal": None, "histogram": None}
+        macd = fast - slow
+        signal = self.signal.push(state["signal"], macd)["ema"]
+        histogram = None if signal is None else macd - signal
+        return {"macd": macd, "signal": signal, "histogram": histogram}
+
+
+class BollingerBands(Indicator):
+    """
+    Bollinger bands, two standard deviations around a simple moving average.
+    """
+
+    name = "bbands"
+    outputs = ("middle", "upper", "lower")
+    default_period = 20
+
+    # Width of the bands, in standard deviations
+    width = 2
+
+    def compute(self, close: np.ndarray) -> dict[str, np.ndarray]:
+        middle, deviation = np.full(len(close), np.nan), np.full(len(close), np.nan)
+        if len(close) >= self.period:
+            windows = sliding_window_view(close, self.period)
+            middle[self.period - 1 :] = windows.mean(axis=1)
+            deviation[self.period - 1 :] = windows.std(axis=1)
+        return {
+            "middle": middle,
+            "upper": middle + self.width * deviation,
+            "lower": middle - self.width * deviation,
+        }
+
+    def initial_state(self) -> dict:
+        return {"window": [], "sum": 0.0, "squares": 0.0}
+
+    def push(self, state: dict, close: float) -> dict[str, float | None]:
+        window = state["window"]
+        window.append(close)
+        state["sum"] += close
+        state["squares"] += close * close
+        if len(window) > self.period:
+            dropped = window.pop(0)
+            state["sum"] -= dropped
+            state["squares"] -= dropped * dropped
+        if len(window) < self.period:
+            return {"middle": None, "upper": None, "lower": None}
+
+        middle = state["sum"] / self.period
+        deviation = math.sqrt(max(0.0, state["squares"] / self.period - middle**2))
+        return {
+            "middle": middle,
+            "upper": middle + self.width * deviation,
+            "lower": middle - self.width * deviation,
+        }
+
+
+# Indicators, by name
+INDICATORS: dict[str, type[Indicator]] = {
+    indicator.name: indicator for indicator in (SMA, EMA, RSI, MACD, BollingerBands)
+}
+
+# Maximum number of indicators of a request
+MAX_INDICATORS = 10
+
+
+def parse_indicators(texts: Iterable[str]) -> list[Indicator]:
+    """
+    Parses indicators such as "sma20", "rsi14" or "macd".
+
+    Args:
+        texts (Iterable[str]): The indicators.
+
+    Returns:
+        list[Indicator]: The indicators, without duplicates.
+
+    Raises:
+        ValueError: If an indicator is not valid or there are too many of them.
+    """
+    indicators = []
+    for text in texts:
+        match = INDICATOR_PATTERN.match(text.strip())
+        if match is None or match["name"] not in INDICATORS:
+            names = ", ".join(INDICATORS)
+            msg = f'Invalid indicator "{text}"; use one of {names}, e.g. sma20'
+            raise ValueError(msg)
+        period = int(match["period"]) if match["period"] else None
+        indicator = INDICATORS[match["name"]](period)
+        if indicator not in indicators:
+            indicators.append(indicator)
+
+    if len(indicators) > MAX_INDICATORS:
+        msg = f"Request at most {MAX_INDICATORS} indicators at once"
+        raise ValueError(msg)
+    return indicators
+
+
+def to_json(values: np.ndarray) -> list[float | None]:
+    """
+    Converts an output column to JSON values, NaN becoming None.
+
+    Args:
+        values (np.ndarray): The column.
+
+    Returns:
+        list[float | None]: The values.
+    """
+    return [None if math.isnan(value) else value for value in values.tolist()]
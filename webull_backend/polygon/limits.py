@@ -0,0 +1,395 @@
+"""
+Module for protecting the Polygon API plan from overload.
+
+Every Polygon call takes a token from a token bucket and goes through a circuit
+breaker, both kept in the shared cache so that every worker on every node draws
+from the same budget:
+
+* the bucket refills at `POLYGON_RATE_LIMIT` tokens per minute, up to
+  `POLYGON_RATE_BURST` tokens. A call waits for a token for up to
+  `POLYGON_RATE_LIMIT_WAIT` seconds; on Redis the bucket is updated atomically by a
+  Lua script, other cache backends fall back to a per-process bucket.
+* the breaker opens after `POLYGON_BREAKER_THRESHOLD` upstream failures within
+  `POLYGON_BREAKER_WINDOW` seconds, fails fast for `POLYGON_BREAKER_RESET` seconds,
+  then lets a single trial call through before closing again.
+
+Calls that are refused or that fail upstream raise `PolygonUnavailable`, which
+DRF turns into a 503 response.
+"""
+
+import asyncio
+import threading
+import time
+from collections.abc import Awaitable
+from collections.abc import Callable
+from typing import Any
+
+import httpx
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.cache import cache
+from django.utils.translation import gettext_lazy as _
+from polygon.exceptions import BadResponse
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from urllib3.exceptions import HTTPError
+
+# Cache key of the shared token bucket
+BUCKET_KEY = "polygon-rate"
+
+# Cache key prefix of the circuit breaker state
+BREAKER_KEY = "polygon-breaker"
+
+# Takes `ARGV[3]` tokens from the bucket at `KEYS[1]`, refilled at `ARGV[1]` tokens
+# per second up to `ARGV[2]`, and returns whether they were taken, the tokens left
+# and the seconds to wait for them. Redis' clock is shared by every worker.
+RATE_LIMIT_SCRIPT = """
+local rate = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local requested = tonumber(ARGV[3])
+local clock = redis.call("TIME")
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call("HMGET", KEYS[1], "tokens", "updated")
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local allowed = 0
+local wait = 0
+if tokens >= requested then
+    tokens = tokens - requested
+    allowed = 1
+else
+    wait = (requested - tokens) / rate
+end
+redis.call("HSET", KEYS[1], "tokens", tostring(tokens), "updated", tostring(now))
+redis.call("EXPIRE", KEYS[1], math.ceil(capacity / rate) + 1)
+return {allowed, tostring(tokens), tostring(wait)}
+"""
+
+# State of the per-process buckets, used when the cache is not Redis
+_local_buckets: dict[str, tuple[float, float]] = {}
+_local_lock = threading.Lock()
+
+
+class PolygonUnavailable(APIException):
+    """
+    Raised when a Polygon call is refused or fails upstream.
+    """
+
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = _("Price history is temporarily unavailable.")
+    default_code = "polygon_unavailable"
+
+    def __init__(self, detail=None, code=None, wait: float | None = None):
+        """
+        Initializes the exception.
+
+        Args:
+            detail: The error message.
+            code: The error code.
+            wait (float | None): The seconds after which the client may retry; DRF
+                sends them in the Retry-After header.
+        """
+        super().__init__(detail, code)
+        self.wait = wait
+
+
+class TokenBucket:
+    """
+    Token bucket shared through the cache.
+    """
+
+    def __init__(self, key: str, rate: float, capacity: float):
+        """
+        Initializes the bucket.
+
+        Args:
+            key (str): The cache key of the bucket.
+            rate (float): The tokens added per second.
+            capacity (float): The maximum number of tokens.
+        """
+        self.key = key
+        self.rate = rate
+        self.capacity = capacity
+
+    def take(self, tokens: float = 1) -> tuple[bool, float, float]:
+        """
+        Takes tokens from the bucket if there are enough of them.
+
+        Args:
+            tokens (float): The number of tokens to take; 0 only reads the level.
+
+        Returns:
+            tuple[bool, float, float]: Whether the tokens were taken, the tokens
+                left and the seconds to wait until enough tokens are available.
+        """
+        client = getattr(cache, "client", None)
+        if client is None or not hasattr(client, "get_client"):
+            return self._take_local(tokens)
+
+        script = client.get_client(write=True).register_script(RATE_LIMIT_SCRIPT)
+        allowed, level, wait = script(
+            keys=[cache.make_key(self.key)],
+            args=[self.rate, self.capacity, tokens],
+        )
+        return bool(allowed), float(level), float(wait)
+
+    def _take_local(self, tokens: float) -> tuple[bool, float, float]:
+        """
+        Takes tokens from a bucket kept in this process.
+
+        Args:
+            tokens (float): The number of tokens to take.
+
+        Returns:
+            tuple[bool, float, float]: See `take`.
+        """
+        with _local_lock:
+            now = time.monotonic()
+            level, updated = _local_buckets.get(self.key, (self.capacity, now))
+            level = min(self.capacity, level + (now - updated) * self.rate)
+            allowed = level >= tokens
+            if allowed:
+                level -= tokens
+            _local_buckets[self.key] = (level, now)
+
+        wait = 0.0 if allowed else (tokens - level) / self.rate
+        return allowed, level, wait
+
+    def level(self) -> float:
+        """
+        Returns the number of tokens in the bucket.
+        """
+        return self.take(0)[1]
+
+
+class CircuitBreaker:
+    """
+    Circuit breaker whose state is shared through the cache.
+
+    The breaker is closed while calls succeed, open while it fails fast after too
+    many failures, and half-open once the open period is over: a single trial call
+    is let through, and its outcome closes or opens the breaker again.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(self, key: str, threshold: int, window: float, reset_timeout: float):
+        """
+        Initializes the breaker.
+
+        Args:
+            key (str): The cache key prefix of the breaker state.
+            threshold (int): The number of failures that opens the breaker.
+            window (float): The seconds over which failures are counted.
+            reset_timeout (float): The seconds the breaker stays open.
+        """
+        self.failures_key = f"{key}:failures"
+        self.open_key = f"{key}:open"
+        self.tripped_key = f"{key}:tripped"
+        self.trial_key = f"{key}:trial"
+        self.threshold = threshold
+        self.window = window
+        self.reset_timeout = reset_timeout
+
+    def state(self) -> str:
+        """
+        Returns the state of the breaker.
+        """
+        state = cache.get_many([self.open_key, self.tripped_key])
+        if self.open_key in state:
+            return self.OPEN
+        if self.tripped_key in state:
+            return self.HALF_OPEN
+        return self.CLOSED
+
+    def failures(self) -> int:
+        """
+        Returns the number of failures counted in the current window.
+        """
+        return cache.get(self.failures_key, 0)
+
+    def allow(self) -> bool:
+        """
+        Returns whether a call may go through.
+        """
+        state = self.state()
+        if state == self.HALF_OPEN:
+            # Only the first caller gets the trial call
+            return cache.add(self.trial_key, True, timeout=settings.POLYGON_TIMEOUT)  # noqa: FBT003
+        return state == self.CLOSED
+
+    def record_success(self) -> None:
+        """
+        Records a successful call, closing the breaker after a trial call.
+        """
+        if self.state() == self.HALF_OPEN:
+            cache.delete_many([self.tripped_key, self.trial_key, self.failures_key])
+
+    def record_failure(self) -> None:
+        """
+        Records a failed call, opening the breaker past the threshold.
+        """
+        if self.state() == self.CLOSED:
+            cache.add(self.failures_key, 0, timeout=self.window)
+            try:
+                failures = cache.incr(self.failures_key)
+            except ValueError:
+                # The window expired in between
+                failures = 1
+                cache.set(self.failures_key, failures, timeout=self.window)
+            if failures < self.threshold:
+                return
+
+        cache.set(self.open_key, True, timeout=self.reset_timeout)  # noqa: FBT003
+        cache.set(self.tripped_key, True, timeout=None)  # noqa: FBT003
+        cache.delete_many([self.trial_key, self.failures_key])
+
+
+def get_bucket() -> TokenBucket:
+    """
+    Returns the token bucket of the Polygon calls.
+    """
+    return TokenBucket(
+        BUCKET_KEY,
+        rate=settings.POLYGON_RATE_LIMIT / 60,
+        capacity=settings.POLYGON_RATE_BURST,
+    )
+
+
+def get_breaker() -> CircuitBreaker:
+    """
+    Returns the circuit breaker of the Polygon calls.
+    """
+    return CircuitBreaker(
+        BREAKER_KEY,
+        threshold=settings.POLYGON_BREAKER_THRESHOLD,
+        window=settings.POLYGON_BREAKER_WINDOW,
+        reset_timeout=settings.POLYGON_BREAKER_RESET,
+    )
+
+
+# Errors raised by the Polygon clients when a call fails upstream
+UPSTREAM_ERRORS = (httpx.HTTPError, BadResponse, HTTPError)
+
+
+def is_upstream_failure(exc: Exception) -> bool:
+    """
+    Returns whether an error means Polygon is degraded, rather than the request
+    being invalid.
+
+    Args:
+        exc (Exception): One of `UPSTREAM_ERRORS`.
+
+    Returns:
+        bool: False for 4xx responses other than 429.
+    """
+    if isinstance(exc, httpx.HTTPStatusError):
+        code = exc.response.status_code
+        return (
+            code == status.HTTP_429_TOO_MANY_REQUESTS
+            or code >= status.HTTP_500_INTERNAL_SERVER_ERROR
+        )
+    return True
+
+
+def admit(bucket: TokenBucket, breaker: CircuitBreaker, waited: float) -> float:
+    """
+    Checks whether a call may go through now.
+
+    Args:
+        bucket (TokenBucket): The token bucket.
+        breaker (CircuitBreaker): The circuit breaker.
+        waited (float): The seconds the call already waited for a token.
+
+    Returns:
+        float: 0 if the call may go through, otherwise the seconds to wait.
+
+    Raises:
+        PolygonUnavailable: If the breaker is open or the token would come too late.
+    """
+    if not breaker.allow():
+        raise PolygonUnavailable(wait=breaker.reset_timeout)
+
+    allowed, _, wait = bucket.take()
+    if allowed:
+        return 0
+    if waited + wait > settings.POLYGON_RATE_LIMIT_WAIT:
+        raise PolygonUnavailable(wait=wait)
+    return wait
+
+
+def failed(breaker: CircuitBreaker, exc: Exception) -> PolygonUnavailable:
+    """
+    Records a failed call.
+
+    Args:
+        breaker (CircuitBreaker): The circuit breaker.
+        exc (Exception): One of `UPSTREAM_ERRORS`.
+
+    Returns:
+        PolygonUnavailable: The error to raise instead.
+    """
+    if is_upstream_failure(exc):
+        breaker.record_failure()
+    return PolygonUnavailable()
+
+
+def guard(call: Callable[[], Any]) -> Any:
+    """
+    Runs a Polygon call under the rate limit and the circuit breaker.
+
+    Args:
+        call (Callable[[], Any]): Makes the call.
+
+    Returns:
+        Any: The result of the call.
+
+    Raises:
+        PolygonUnavailable: If the call is refused or fails upstream.
+    """
+    bucket, breaker = get_bucket(), get_breaker()
+    waited = 0.0
+    while wait := admit(bucket, breaker, waited):
+        time.sleep(wait)
+        waited += wait
+
+    try:
+        result = call()
+    except UPSTREAM_ERRORS as exc:
+        raise failed(breaker, exc) from exc
+    breaker.record_success()
+    return result
+
+
+async def aguard(call: Callable[[], Awaitable]) -> Any:
+    """
+    Runs a Polygon call from async code under the rate limit and the circuit
+    breaker.
+
+    Args:
+        call (Callable[[], Awaitable]): Starts the call.
+
+    Returns:
+        Any: The result of the call.
+
+    Raises:
+        PolygonUnavailable: If the call is refused or fails upstream.
+    """
+    bucket, breaker = get_bucket(), get_breaker()
+    # The bucket and the breaker only talk to the cache, so they can run in any
+    # thread instead of queuing behind the ORM work of the shared one
+    admit_async = sync_to_async(admit, thread_sensitive=False)
+    waited = 0.0
+    while wait := await admit_async(bucket, breaker, waited):
+        await asyncio.sleep(wait)
+        waited += wait
+
+    try:
+        result = await call()
+    except UPSTREAM_ERRORS as exc:
+        raise await sync_to_async(failed, thread_sensitive=False)(breaker, exc) from exc
+    await sync_to_async(breaker.record_success, thread_sensitive=False)()
+    return result
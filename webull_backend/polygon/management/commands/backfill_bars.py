@@ -0,0 +1,143 @@
+"""
+This management command is used to backfill the bar store with the daily bars of
+every ticker, one grouped daily call per market date.
+
+Dates already backfilled for every exchange of the run are skipped, so an
+interrupted run is resumed by running the command again. Tickers listed since a
+date was backfilled only get its bar with `--force`. Run `build_indicator_states`
+afterwards to store the indicator states of the new bars.
+
+Usage:
+    python manage.py backfill_bars --start DATE [--end DATE] [--exchange MIC ...]
+        [--concurrency N] [--batch-size N] [--force]
+
+Where `DATE` is an ISO date; `--end` defaults to the last closed session.
+
+Example:
+    python manage.py backfill_bars --start 2024-01-01 --exchange NYSE NASDAQ
+"""
+
+from datetime import UTC
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+
+from asgiref.sync import async_to_sync
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from webull_backend.exchanges.models import Exchange
+from webull_backend.polygon.backfill import DEFAULT_BATCH_SIZE
+from webull_backend.polygon.backfill import DEFAULT_CONCURRENCY
+from webull_backend.polygon.backfill import backfill
+from webull_backend.polygon.backfill import pending_days
+from webull_backend.polygon.backfill import symbol_index
+from webull_backend.polygon.client import get_client
+from webull_backend.polygon.history import session_date
+from webull_backend.polygon.planner import trading_days
+
+
+class Command(BaseCommand):
+    """
+    A management command to backfill the daily bars of every ticker.
+    """
+
+    help = "Loads the daily bars of every ticker from Polygon's grouped aggregates"
+
+    def add_arguments(self, parser):
+        """
+        Adds arguments to the command.
+        """
+        parser.add_argument(
+            "--start",
+            type=date.fromisoformat,
+            required=True,
+            help="First date to backfill",
+        )
+        parser.add_argument(
+            "--end",
+            type=date.fromisoformat,
+            help="Last date to backfill, by default the last closed session",
+        )
+        parser.add_argument(
+            "--exchange",
+            nargs="+",
+            help="MICs of the exchanges whose tickers are loaded, all by default",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=DEFAULT_CONCURRENCY,
+            help="Number of dates fetched at the same time",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of bars written per statement",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Load the dates that were already backfilled again",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Handles the command by backfilling the pending dates.
+
+        Args:
+            options (dict): The parsed command arguments
+
+        Returns:
+            None
+        """
+        yesterday = session_date(datetime.now(UTC)) - timedelta(days=1)
+        start, end = options["start"], options["end"] or yesterday
+        if start > end:
+            msg = f"--start {start} is after --end {end}"
+            raise CommandError(msg)
+
+        mics = options["exchange"]
+        exchanges = list(
+            Exchange.objects.filter(mic__in=mics) if mics else Exchange.objects.all(),
+        )
+        unknown = set(mics or ()) - {exchange.mic for exchange in exchanges}
+        if unknown:
+            msg = f'Exchange "{", ".join(sorted(unknown))}" does not exist'
+            raise CommandError(msg)
+
+        days = trading_days(start, end)
+        if not options["force"]:
+            days = pending_days(days, exchanges)
+        if not days:
+            self.stdout.write("Nothing to backfill.")
+            return
+
+        index = symbol_index(exchanges)
+        self.stdout.write(f"Backfilling {len(days)} dates for {len(index)} tickers.")
+        result = async_to_sync(self.backfill)(
+            days,
+            index,
+            exchanges,
+            options["concurrency"],
+            options["batch_size"],
+        )
+
+        self.stdout.write(
+            f"{len(result.loaded)} dates loaded, {sum(result.loaded.values())} bars "
+            "stored.",
+        )
+        if result.failed:
+            failed = ", ".join(str(day) for day in result.failed)
+            msg = f"Could not backfill {failed}; run the command again to resume"
+            raise CommandError(msg)
+
+    async def backfill(self, *args):
+        """
+        Runs the backfill and closes the client connections.
+        """
+        try:
+            return await backfill(*args)
+        finally:
+            await get_client().aclose()
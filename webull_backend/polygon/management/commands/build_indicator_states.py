@@ -0,0 +1,77 @@
+"""
+This management command is used to build the stored states of indicators over the
+daily bars of the bar store, so that requests read them instead of warming the
+indicators up.
+
+Each ticker resumes from its last stored state, so running the command again, e.g.
+after `backfill_bars`, only folds the bars stored since.
+
+Usage:
+    python manage.py build_indicator_states INDICATOR [INDICATOR ...]
+        [--exchange MIC ...]
+
+Where `INDICATOR` is an indicator as in the history requests, e.g. sma20 or macd.
+
+Example:
+    python manage.py build_indicator_states sma20 rsi14 --exchange NYSE
+"""
+
+from datetime import UTC
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from webull_backend.polygon.indicator_states import build_states
+from webull_backend.polygon.indicators import parse_indicators
+from webull_backend.tickers.models import Ticker
+
+
+class Command(BaseCommand):
+    """
+    A management command to build the stored states of indicators.
+    """
+
+    help = "Builds the stored indicator states over the daily bars of every ticker"
+
+    def add_arguments(self, parser):
+        """
+        Adds arguments to the command.
+        """
+        parser.add_argument(
+            "indicators",
+            nargs="+",
+            help="Indicators to build, e.g. sma20 or macd",
+        )
+        parser.add_argument(
+            "--exchange",
+            nargs="+",
+            help="MICs of the exchanges whose tickers are built, all by default",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Handles the command by folding the bars of every active ticker.
+
+        Args:
+            options (dict): The parsed command arguments
+
+        Returns:
+            None
+        """
+        try:
+            indicators = parse_indicators(options["indicators"])
+        except ValueError as exc:
+            raise CommandError(exc) from exc
+
+        tickers = Ticker.objects.filter(status=Ticker.STATUS.active).order_by("pk")
+        if options["exchange"]:
+            tickers = tickers.filter(exchange__mic__in=options["exchange"])
+
+        now = datetime.now(UTC)
+        built = 0
+        for ticker in tickers.iterator():
+            for indicator in indicators:
+                built += build_states(ticker, indicator, now)
+
+        self.stdout.write(f"{built} indicator states stored.")
@@ -0,0 +1,96 @@
+"""
+This management command is used to load the US equity market holidays and early
+closes into the session calendar of an exchange.
+
+The holidays are computed from the market rules in `polygon.planner`; existing
+holidays of the same dates are updated, other holidays are left alone.
+
+Usage:
+    python manage.py load_market_holidays <exchange> [--years YEAR [YEAR ...]]
+
+Where `<exchange>` is an exchange MIC and `YEAR` a year to load, by default the
+current and next years.
+
+Example:
+    python manage.py load_market_holidays NYSE --years 2025 2026
+"""
+
+from datetime import datetime
+
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from webull_backend.exchanges.models import Exchange
+from webull_backend.exchanges.models import ExchangeHoliday
+from webull_backend.polygon.planner import EARLY_CLOSE
+from webull_backend.polygon.planner import MARKET_TIMEZONE
+from webull_backend.polygon.planner import market_early_closes
+from webull_backend.polygon.planner import named_market_holidays
+
+
+class Command(BaseCommand):
+    """
+    A management command to load the US equity market holidays of an exchange.
+    """
+
+    help = "Loads the US equity market holidays and early closes of an exchange"
+
+    def add_arguments(self, parser):
+        """
+        Adds arguments to the command.
+
+        Args:
+            exchange (str): An exchange MIC
+        """
+        parser.add_argument(
+            "exchange",
+            type=str,
+            help="The exchange MIC",
+        )
+        parser.add_argument(
+            "--years",
+            type=int,
+            nargs="+",
+            help="Years to load, by default the current and next years",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Handles the command by upserting the holidays of the years.
+
+        Args:
+            options (dict): The parsed command arguments
+
+        Returns:
+            None
+        """
+        mic = options["exchange"]
+        exchange = Exchange.objects.filter(mic=mic).first()
+        if exchange is None:
+            msg = f'Exchange "{mic}" does not exist'
+            raise CommandError(msg)
+
+        current = datetime.now(MARKET_TIMEZONE).year
+        holidays = []
+        for year in options["years"] or [current, current + 1]:
+            holidays += [
+                ExchangeHoliday(exchange=exchange, date=day, name=name)
+                for day, name in named_market_holidays(year).items()
+            ]
+            holidays += [
+                ExchangeHoliday(
+                    exchange=exchange,
+                    date=day,
+                    name=name,
+                    early_close=EARLY_CLOSE,
+                )
+                for day, name in market_early_closes(year).items()
+            ]
+
+        ExchangeHoliday.objects.bulk_create(
+            holidays,
+            update_conflicts=True,
+            unique_fields=["exchange", "date"],
+            update_fields=["name", "early_close"],
+        )
+        self.stdout.write(f"{mic}: {len(holidays)} holidays loaded.")
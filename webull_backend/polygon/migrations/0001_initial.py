@@ -0,0 +1,37 @@
+# Generated by Django 5.0.8 on 2026-10-18 14:03
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+        ('tickers', '0007_ingestioncheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Bar',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timespan', models.CharField(choices=[('minute', 'minute'), ('hour', 'hour'), ('day', 'day'), ('week', 'week'), ('month', 'month'), ('quarter', 'quarter'), ('year', 'year')], default='day', help_text='Timespan', max_length=10)),
+                ('timestamp', models.DateTimeField(help_text='Start of the window')),
+                ('open', models.FloatField()),
+                ('high', models.FloatField()),
+                ('low', models.FloatField()),
+                ('close', models.FloatField()),
+                ('volume', models.FloatField()),
+                ('vwap', models.FloatField(blank=True, null=True)),
+                ('transactions', models.PositiveIntegerField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('ticker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bars', to='tickers.ticker')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='bar',
+            constraint=models.UniqueConstraint(fields=('ticker', 'timespan', 'timestamp'), name='unique_bar_ticker_timespan_timestamp'),
+        ),
+    ]
@@ -0,0 +1,31 @@
+# Generated by Django 5.0.8 on 2026-10-18 14:25
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('polygon', '0002_backfilledday'),
+        ('tickers', '0007_ingestioncheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IndicatorState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('timespan', models.CharField(choices=[('minute', 'minute'), ('hour', 'hour'), ('day', 'day'), ('week', 'week'), ('month', 'month'), ('quarter', 'quarter'), ('year', 'year')], default='day', max_length=10)),
+                ('indicator', models.CharField(max_length=20)),
+                ('timestamp', models.DateTimeField()),
+                ('state', models.JSONField()),
+                ('values', models.JSONField()),
+                ('ticker', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='indicator_states', to='tickers.ticker')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='indicatorstate',
+            constraint=models.UniqueConstraint(fields=('ticker', 'timespan', 'indicator', 'timestamp'), name='unique_indicator_state'),
+        ),
+    ]
@@ -0,0 +1,39 @@
+# Generated by Django 5.0.8 on 2026-10-18 16:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def delete_checkpoints(apps, schema_editor):
+    """
+    Deletes the checkpoints, which do not say which exchanges their dates were
+    loaded for; the next backfill loads those dates again.
+    """
+    apps.get_model("polygon", "BackfilledDay").objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exchanges', '0004_exchange_extended_close_exchange_extended_open_and_more'),
+        ('polygon', '0003_indicatorstate_indicatorstate_unique_indicator_state'),
+    ]
+
+    operations = [
+        migrations.RunPython(delete_checkpoints, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='backfilledday',
+            name='date',
+            field=models.DateField(),
+        ),
+        migrations.AddField(
+            model_name='backfilledday',
+            name='exchange',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='backfilled_days', to='exchanges.exchange'),
+            preserve_default=False,
+        ),
+        migrations.AddConstraint(
+            model_name='backfilledday',
+            constraint=models.UniqueConstraint(fields=('exchange', 'date'), name='unique_backfilled_day'),
+        ),
+    ]
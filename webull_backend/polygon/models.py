@@ -0,0 +1,162 @@
+"""
+Module for defining Bar, IndicatorState and BackfilledDay models.
+
+This module imports necessary libraries and defines the Bar model, the local store of
+Polygon's aggregates, the IndicatorState model, the indicator values and states
+after each bar, and the BackfilledDay model, the checkpoints of the grouped daily
+backfill, using Django's ORM.
+"""
+
+from django.db import models
+from django.utils.translation import gettext as _
+from model_utils import Choices
+
+from webull_backend.exchanges.models import Exchange
+
+# Import Ticker model from tickers app
+from webull_backend.tickers.models import Ticker
+
+
+class Bar(models.Model):
+    """
+    Represents an OHLCV aggregate bar of a ticker, as returned by Polygon.
+    """
+
+    # Define possible aggregate window sizes
+    TIMESPAN = Choices("minute", "hour", "day", "week", "month", "quarter", "year")
+
+    # Foreign key referencing the Ticker instance
+    ticker = models.ForeignKey(
+        Ticker,
+        on_delete=models.CASCADE,  # Cascade delete related Ticker instances
+        related_name="bars",
+    )
+
+    # Size of the aggregate window
+    timespan = models.CharField(
+        max_length=10,  # Maximum length of 10 characters
+        choices=TIMESPAN,
+        default=TIMESPAN.day,
+        help_text=_("Timespan"),  # Help text for users
+    )
+
+    # Start of the aggregate window
+    timestamp = models.DateTimeField(help_text=_("Start of the window"))
+
+    # Prices and volume of the window
+    open = models.FloatField()
+    high = models.FloatField()
+    low = models.FloatField()
+    close = models.FloatField()
+    volume = models.FloatField()
+
+    # Volume weighted average price and number of trades; not always reported
+    vwap = models.FloatField(null=True, blank=True)
+    transactions = models.PositiveIntegerField(null=True, blank=True)
+
+    # Timestamp of the last time the bar was fetched
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            # Also serves as the index of the history range scans
+            models.UniqueConstraint(
+                fields=["ticker", "timespan", "timestamp"],
+                name="unique_bar_ticker_timespan_timestamp",
+            ),
+        ]
+
+    def __str__(self):
+        """
+        Returns a string representation of this Bar instance.
+
+        :return: String representation of the bar.
+        """
+        return f"{self.ticker_id} - {self.timespan} - {self.timestamp}"
+
+
+class IndicatorState(models.Model):
+    """
+    Represents the state and values of an indicator after a bar of a ticker.
+    """
+
+    # Foreign key referencing the Ticker instance
+    ticker = models.ForeignKey(
+        Ticker,
+        on_delete=models.CASCADE,  # Cascade delete related Ticker instances
+        related_name="indicator_states",
+    )
+
+    # Size of the aggregate window of the bar
+    timespan = models.CharField(
+        max_length=10,  # Maximum length of 10 characters
+        choices=Bar.TIMESPAN,
+        default=Bar.TIMESPAN.day,
+    )
+
+    # Indicator, e.g. "sma20"
+    indicator = models.CharField(max_length=20)
+
+    # Start of the aggregate window of the bar
+    timestamp = models.DateTimeField()
+
+    # State to fold the next bar into, and outputs at the bar
+    state = models.JSONField()
+    values = models.JSONField()
+
+    class Meta:
+        constraints = [
+            # Also serves as the index of the state lookups
+            models.UniqueConstraint(
+                fields=["ticker", "timespan", "indicator", "timestamp"],
+                name="unique_indicator_state",
+            ),
+        ]
+
+    def __str__(self):
+        """
+        Returns a string representation of this IndicatorState instance.
+
+        :return: String representation of the indicator state.
+        """
+        return f"{self.ticker_id} - {self.indicator} - {self.timestamp}"
+
+
+class BackfilledDay(models.Model):
+    """
+    Represents a market date whose grouped daily bars were loaded in the bar store
+    for the tickers of an exchange.
+    """
+
+    # Exchange whose tickers the bars were loaded for
+    exchange = models.ForeignKey(
+        Exchange,
+        on_delete=models.CASCADE,
+        related_name="backfilled_days",
+    )
+
+    # Market date of the grouped daily bars
+    date = models.DateField()
+
+    # Number of bars stored for the tickers of the exchange
+    bars = models.PositiveIntegerField(default=0)
+
+    # Timestamp of the last time the date was loaded
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ["date"]
+        constraints = [
+            models.UniqueConstraint(
+                fields=["exchange", "date"],
+                name="unique_backfilled_day",
+            ),
+        ]
+
+    def __str__(self):
+        """
+        Returns a string representation of this BackfilledDay instance.
+
+        :return: String representation of the backfilled day.
+        """
+        return f"{self.exchange_id} - {self.date} - {self.bars} bars"
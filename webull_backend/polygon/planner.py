@@ -0,0 +1,392 @@
+"""
+Module for planning which date ranges of a history request to fetch from Polygon.
+
+A request only needs the trading days that are not in the local bar store yet, or
+whose stored bars were fetched before their session settled. Weekends and market
+holidays never have bars, so they are not counted as missing.
+Missing days that are only separated by non-trading days are merged, so each gap
+costs a single upstream call.
+
+The session hours also decide how long history stays fresh: bars of closed sessions
+never change, while the bar of an open session does until the close. Both questions
+are answered by the session calendar of the ticker's exchange (see
+`exchanges.calendar`), built from its `ExchangeHoliday` rows. The years whose
+holidays have not been loaded (see `load_market_holidays`) use the holidays of the
+US equity markets, built from the rules below.
+"""
+
+from collections.abc import Iterable
+from collections.abc import Mapping
+from datetime import date
+from datetime import datetime
+from datetime import time
+from datetime import timedelta
+from functools import cache
+from zoneinfo import ZoneInfo
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+
+from webull_backend.exchanges.calendar import FIRST_YEAR
+from webull_backend.exchanges.calendar import SATURDAY
+from webull_backend.exchanges.calendar import SessionCalendar
+from webull_backend.exchanges.calendar import SessionHours
+from webull_backend.exchanges.calendar import cached_calendar
+from webull_backend.exchanges.calendar import get_calendar
+from webull_backend.tickers.models import Ticker
+
+# Timezone of the US equity markets, which Polygon aligns daily windows to
+MARKET_TIMEZONE = ZoneInfo("America/New_York")
+
+# Regular and extended session hours, in the market timezone
+REGULAR_OPEN = time(9, 30)
+REGULAR_CLOSE = time(16)
+EXTENDED_OPEN = time(4)
+EXTENDED_CLOSE = time(20)
+
+# Close of the shortened sessions before some holidays
+EARLY_CLOSE = time(13)
+
+# Time after the close until which the daily bar may still be corrected
+SETTLEMENT_DELAY = timedelta(minutes=15)
+
+# Year Juneteenth became a market holiday
+JUNETEENTH_SINCE = 2022
+
+
+def easter(year: int) -> date:
+    """
+    Returns the date of Easter Sunday (anonymous Gregorian algorithm).
+
+    Args:
+        year (int): The year.
+
+    Returns:
+        date: Easter Sunday of that year.
+    """
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    ell = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * ell) // 451
+    month, day = divmod(h + ell - 7 * m + 114, 31)
+    return date(year, month, day + 1)
+
+
+def nth_weekday(year: int, month: int, weekday: int, n: int) -> date:
+    """
+    Returns the n-th given weekday of a month; a negative n counts from the end.
+
+    Args:
+        year (int): The year.
+        month (int): The month.
+        weekday (int): The weekday, Monday being 0.
+        n (int): The occurrence, 1 for the first and -1 for the last.
+
+    Returns:
+        date: The date of that weekday.
+    """
+    if n > 0:
+        first = date(year, month, 1)
+        return first + timedelta(days=(weekday - first.weekday()) % 7 + 7 * (n - 1))
+    last = date(year + month // 12, month % 12 + 1, 1) - timedelta(days=1)
+    return last - timedelta(days=(last.weekday() - weekday) % 7 + 7 * (-n - 1))
+
+
+def observed(day: date) -> date | None:
+    """
+    Returns the day a fixed-date holiday is observed on.
+
+    A holiday falling on a Sunday is observed on the Monday and one falling on a
+    Saturday on the Friday, except when that Friday is in the previous year.
+
+    Args:
+        day (date): The holiday.
+
+    Returns:
+        date | None: The observed day, or None if it is not observed.
+    """
+    if day.weekday() == SATURDAY:
+        friday = day - timedelta(days=1)
+        return friday if friday.year == day.year else None
+    if day.weekday() == SATURDAY + 1:
+        return day + timedelta(days=1)
+    return day
+
+
+@cache
+def named_market_holidays(year: int) -> dict[date, str]:
+    """
+    Returns the full-day holidays of the US equity markets in a year, with their
+    names.
+
+    Args:
+        year (int): The year.
+
+    Returns:
+        dict[date, str]: The name of each day the market is closed on, besides
+            weekends.
+    """
+    holidays = [
+        (observed(date(year, 1, 1)), "New Year's Day"),
+        (nth_weekday(year, 1, 0, 3), "Martin Luther King Jr. Day"),
+        (nth_weekday(year, 2, 0, 3), "Washington's Birthday"),
+        (easter(year) - timedelta(days=2), "Good Friday"),
+        (nth_weekday(year, 5, 0, -1), "Memorial Day"),
+        (observed(date(year, 7, 4)), "Independence Day"),
+        (nth_weekday(year, 9, 0, 1), "Labor Day"),
+        (nth_weekday(year, 11, 3, 4), "Thanksgiving Day"),
+        (observed(date(year, 12, 25)), "Christmas Day"),
+    ]
+    if year >= JUNETEENTH_SINCE:
+        holidays.append((observed(date(year, 6, 19)), "Juneteenth"))
+    # New Year's Day is not observed when it falls on a Saturday
+    return {day: name for day, name in holidays if day is not None}
+
+
+def market_holidays(year: int) -> frozenset[date]:
+    """
+    Returns the full-day holidays of the US equity markets in a year.
+
+    Args:
+        year (int): The year.
+
+    Returns:
+        frozenset[date]: The days the market is closed on, besides weekends.
+    """
+    return frozenset(named_market_holidays(year))
+
+
+def market_early_closes(year: int) -> dict[date, str]:
+    """
+    Returns the days the US equity markets close at `EARLY_CLOSE` in a year.
+
+    Args:
+        year (int): The year.
+
+    Returns:
+        dict[date, str]: The name of each shortened session.
+    """
+    candidates = {
+        date(year, 7, 3): "Independence Day Eve",
+        nth_weekday(year, 11, 3, 4) + timedelta(days=1): "Day after Thanksgiving",
+        date(year, 12, 24): "Christmas Eve",
+    }
+    holidays = market_holidays(year)
+    return {
+        day: name
+        for day, name in candidates.items()
+        if day.weekday() < SATURDAY and day not in holidays
+    }
+
+
+@cache
+def market_holiday_closes() -> Mapping[date, time | None]:
+    """
+    Returns the holidays of the US equity markets from `FIRST_YEAR` to the end of
+    next year.
+
+    Returns:
+        Mapping[date, time | None]: `EARLY_CLOSE` for the shortened sessions, None
+            for the days the market is closed.
+    """
+    holidays: dict[date, time | None] = {}
+    for year in range(FIRST_YEAR, datetime.now(MARKET_TIMEZONE).year + 2):
+        holidays |= dict.fromkeys(market_holidays(year))
+        holidays |= dict.fromkeys(market_early_closes(year), EARLY_CLOSE)
+    return holidays
+
+
+@cache
+def market_calendar() -> SessionCalendar:
+    """
+    Returns the session calendar of the US equity markets, from `FIRST_YEAR` to the
+    end of next year.
+
+    Returns:
+        SessionCalendar: The calendar.
+    """
+    return SessionCalendar(
+        MARKET_TIMEZONE,
+        SessionHours(REGULAR_OPEN, REGULAR_CLOSE, EXTENDED_OPEN, EXTENDED_CLOSE),
+        market_holiday_closes(),
+        date(FIRST_YEAR, 1, 1),
+        date(datetime.now(MARKET_TIMEZONE).year + 1, 12, 31),
+    )
+
+
+def ticker_calendar(ticker: Ticker) -> SessionCalendar:
+    """
+    Returns the session calendar of the exchange a ticker is listed on.
+
+    Args:
+        ticker (Ticker): The ticker.
+
+    Returns:
+        SessionCalendar: The calendar of the exchange, with the holidays of the US
+            equity markets in the years it has none loaded, or the calendar of the
+            US equity markets if the ticker has no exchange.
+    """
+    if ticker.exchange_id is None:
+        return market_calendar()
+    return get_calendar(ticker.exchange, market_holiday_closes())
+
+
+async def aticker_calendar(ticker: Ticker) -> SessionCalendar:
+    """
+    Returns the session calendar of a ticker's exchange from async code.
+
+    Args:
+        ticker (Ticker): The ticker.
+
+    Returns:
+        SessionCalendar: The calendar, built in a thread on first use.
+    """
+    calendar = cached_calendar(ticker.exchange_id)
+    if calendar is None:
+        return await sync_to_async(ticker_calendar)(ticker)
+    return calendar
+
+
+def is_trading_day(day: date) -> bool:
+    """
+    Returns whether the market has a session on a date.
+
+    Args:
+        day (date): The date.
+
+    Returns:
+        bool: False on weekends and market holidays.
+    """
+    return market_calendar().is_trading_day(day)
+
+
+def trading_days(start: date, end: date) -> list[date]:
+    """
+    Returns the trading days between two dates, both included.
+
+    Args:
+        start (date): The first date.
+        end (date): The last date.
+
+    Returns:
+        list[date]: The trading days, in order.
+    """
+    return market_calendar().trading_days(start, end)
+
+
+def unsettled_days(
+    fetched: Mapping[date, datetime],
+    calendar: SessionCalendar | None = None,
+) -> set[date]:
+    """
+    Returns the market dates whose stored bars were fetched before they settled.
+
+    A session's bars keep changing until `SETTLEMENT_DELAY` after its close, so bars
+    fetched earlier are partial, even once the date is in the past.
+
+    Args:
+        fetched (Mapping[date, datetime]): The earliest time the stored bars of each
+            date were fetched at.
+        calendar (SessionCalendar | None): The calendar of the exchange, the US
+            equity markets by default.
+
+    Returns:
+        set[date]: The dates to fetch again.
+    """
+    calendar = calendar or market_calendar()
+    unsettled = set()
+    for day, fetched_at in fetched.items():
+        session = calendar.session(day)
+        if session is not None and fetched_at < session.closes + SETTLEMENT_DELAY:
+            unsettled.add(day)
+    return unsettled
+
+
+def plan_ranges(  # noqa: PLR0913
+    stored: Iterable[date],
+    start: date,
+    end: date,
+    today: date,
+    unsettled: Iterable[date] = (),
+    calendar: SessionCalendar | None = None,
+) -> list[tuple[date, date]]:
+    """
+    Returns the ranges of a history request to fetch from Polygon.
+
+    Only trading days up to today are expected to have a bar. The current session's
+    bar keeps changing until the close, so today is always fetched again, as are the
+    past days whose stored bars were fetched before they settled. Runs of missing
+    trading days with no stored trading day between them become one range.
+
+    Args:
+        stored (Iterable[date]): The dates of the bars already in the store.
+        start (date): The first date of the request.
+        end (date): The last date of the request.
+        today (date): The current market date.
+        unsettled (Iterable[date]): The stored dates to fetch again, see
+            `unsettled_days`.
+        calendar (SessionCalendar | None): The calendar of the exchange, the US
+            equity markets by default.
+
+    Returns:
+        list[tuple[date, date]]: The inclusive ranges to fetch, in order.
+    """
+    calendar = calendar or market_calendar()
+    settled = set(stored) - set(unsettled)
+    settled.discard(today)
+
+    ranges: list[tuple[date, date]] = []
+    run: list[date] = []
+    for day in calendar.trading_days(start, min(end, today)):
+        if day not in settled:
+            run.append(day)
+        elif run:
+            ranges.append((run[0], run[-1]))
+            run = []
+
+    if run:
+        ranges.append((run[0], run[-1]))
+    return ranges
+
+
+def history_ttl(
+    end: date,
+    now: datetime,
+    calendar: SessionCalendar | None = None,
+) -> int:
+    """
+    Returns how long history ending on a date stays fresh.
+
+    History made of closed sessions only is final and kept for
+    `POLYGON_HISTORY_FINAL_TTL` seconds. History including a trading day that has
+    not opened yet stays fresh until the open, and history including an open
+    session, until it settles after the close, for `POLYGON_HISTORY_INTRADAY_TTL`
+    seconds.
+
+    Args:
+        end (date): The last date of the history.
+        now (datetime): The current time.
+        calendar (SessionCalendar | None): The calendar of the exchange, the US
+            equity markets by default.
+
+    Returns:
+        int: The number of seconds.
+    """
+    calendar = calendar or market_calendar()
+    now = now.astimezone(calendar.timezone)
+    today = now.date()
+    final_ttl = settings.POLYGON_HISTORY_FINAL_TTL
+    session = calendar.session(today)
+    if end < today or session is None:
+        return final_ttl
+
+    if now < session.opens:
+        return min(final_ttl, int((session.opens - now).total_seconds()) + 1)
+    if now < session.closes + SETTLEMENT_DELAY:
+        return settings.POLYGON_HISTORY_INTRADAY_TTL
+    return final_ttl
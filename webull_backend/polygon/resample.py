@@ -0,0 +1,194 @@
+"""
+Module for deriving coarser bar intervals from finer bars.
+
+Weekly, monthly or 4-hour history is built from the daily or minute bars already in
+the cache and the bar store, instead of being requested from Polygon and cached
+once per interval. Bars are grouped by session with the exchange's session calendar:
+intraday buckets start at the regular open, day buckets count trading days, and
+week, month, quarter and year buckets follow the dates of the sessions.
+
+Each bucket takes the first open, the highest high, the lowest low and the last
+close of its bars, the sum of their volumes and transactions, and their
+volume-weighted VWAP. The grouping and the aggregations run on whole NumPy columns.
+"""
+
+import re
+from typing import NamedTuple
+
+import numpy as np
+
+from webull_backend.exchanges.calendar import SessionCalendar
+from webull_backend.polygon.models import Bar
+from webull_backend.polygon.planner import market_calendar
+from webull_backend.polygon.series import BarSeries
+
+# Interval of the history when none is requested
+DEFAULT_INTERVAL = "1day"
+
+# Interval format, e.g. "4hour" or "1week"
+INTERVAL_PATTERN = re.compile(
+    r"^(?P<multiplier>[1-9]\d{0,3})"
+    r"(?P<timespan>minute|hour|day|week|month|quarter|year)$",
+)
+
+# Length of the intraday timespans, in milliseconds
+INTRADAY_MS = {Bar.TIMESPAN.minute: 60_000, Bar.TIMESPAN.hour: 3_600_000}
+
+# Upper bound of the intraday buckets of a session, to number them across sessions
+SESSION_BUCKETS = 10_000
+
+# Number of months of the month-based timespans
+MONTHS = {Bar.TIMESPAN.month: 1, Bar.TIMESPAN.quarter: 3, Bar.TIMESPAN.year: 12}
+
+
+class Interval(NamedTuple):
+    """
+    Size of the bars of a history, e.g. 4 hours.
+    """
+
+    multiplier: int
+    timespan: str
+
+    @classmethod
+    def parse(cls, text: str) -> "Interval":
+        """
+        Parses an interval such as "4hour" or "1week".
+
+        Args:
+            text (str): The interval.
+
+        Returns:
+            Interval: The parsed interval.
+
+        Raises:
+            ValueError: If the interval is not valid.
+        """
+        match = INTERVAL_PATTERN.match(text)
+        if match is None:
+            msg = (
+                f'Invalid interval "{text}"; use a multiplier followed by minute, '
+                "hour, day, week, month, quarter or year, e.g. 4hour"
+            )
+            raise ValueError(msg)
+        return cls(int(match["multiplier"]), match["timespan"])
+
+    @property
+    def base(self) -> str:
+        """
+        Returns the timespan of the bars the interval is built from.
+        """
+        if self.timespan in INTRADAY_MS:
+            return Bar.TIMESPAN.minute
+        return Bar.TIMESPAN.day
+
+    def is_base(self) -> bool:
+        """
+        Returns whether the interval is the one of its base bars.
+        """
+        return self.multiplier == 1 and self.timespan == self.base
+
+    def __str__(self) -> str:
+        """
+        Returns the interval in the format read by `parse`.
+        """
+        return f"{self.multiplier}{self.timespan}"
+
+
+def bucket_keys(
+    series: BarSeries,
+    interval: Interval,
+    calendar: SessionCalendar,
+) -> np.ndarray:
+    """
+    Returns the bucket of each bar of a series.
+
+    Args:
+        series (BarSeries): The base bars, within the calendar.
+        interval (Interval): The interval of the buckets.
+        calendar (SessionCalendar): The calendar of the exchange.
+
+    Returns:
+        np.ndarray: A non-decreasing key per bar; bars of a bucket share their key.
+    """
+    sessions = calendar.sessions_of(series.timestamp)
+    multiplier, timespan = interval
+
+    if timespan in INTRADAY_MS:
+        offsets = series.timestamp - calendar.opens_ms[sessions]
+        # Pre-market bars get negative buckets
+        buckets = offsets // (multiplier * INTRADAY_MS[timespan])
+        return sessions * SESSION_BUCKETS + buckets
+    if timespan == Bar.TIMESPAN.day:
+        return sessions // multiplier
+    if timespan == Bar.TIMESPAN.week:
+        # Ordinal 1 is a Monday, so weeks start on Mondays
+        return (calendar.ordinals[sessions] - 1) // 7 // multiplier
+    return calendar.months[sessions] // (MONTHS[timespan] * multiplier)
+
+
+def resample(
+    series: BarSeries,
+    interval: Interval,
+    calendar: SessionCalendar | None = None,
+) -> BarSeries:
+    """
+    Aggregates bars into coarser bars.
+
+    Args:
+        series (BarSeries): The bars of the interval's base timespan.
+        interval (Interval): The interval of the resampled bars.
+        calendar (SessionCalendar | None): The calendar of the exchange, the US
+            equity markets by default.
+
+    Returns:
+        BarSeries: The resampled bars, stamped with the start of their first bar.
+    """
+    if interval.is_base() or not len(series):
+        return series
+
+    calendar = calendar or market_calendar()
+    # Bars past the end of the calendar cannot be placed in a session
+    series = series[series.timestamp < calendar.extended_closes_ms[-1]]
+    keys = bucket_keys(series, interval, calendar)
+
+    starts = np.flatnonzero(np.diff(keys, prepend=keys[:1] - 1))
+    ends = np.append(starts[1:], len(series)) - 1
+    volume = np.add.reduceat(series.volume, starts)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        vwap = np.add.reduceat(series.vwap * series.volume, starts) / volume
+
+    return BarSeries(
+        {
+            "timestamp": series.timestamp[starts],
+            "open": series.open[starts],
+            "high": np.maximum.reduceat(series.high, starts),
+            "low": np.minimum.reduceat(series.low, starts),
+            "close": series.close[ends],
+            "volume": volume,
+            "vwap": vwap,
+            "transactions": np.add.reduceat(series.transactions, starts),
+        },
+    )
+
+
+def resample_history(
+    history: dict,
+    interval: Interval,
+    calendar: SessionCalendar | None = None,
+) -> dict:
+    """
+    Aggregates a history response into coarser bars.
+
+    Args:
+        history (dict): The history of the interval's base timespan.
+        interval (Interval): The interval of the resampled bars.
+        calendar (SessionCalendar | None): The calendar of the exchange, the US
+            equity markets by default.
+
+    Returns:
+        dict: The resampled history, in the same layout.
+    """
+    if interval.is_base():
+        return history
+    series = resample(BarSeries.from_history(history), interval, calendar)
+    return series.to_history(history["ticker"])
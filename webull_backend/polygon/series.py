@@ -0,0 +1,270 @@
+"""
+Module for the columnar representation of bar history.
+
+A `BarSeries` keeps a ticker's bars as parallel NumPy arrays, one per `BAR_FIELDS`
+column, sorted by timestamp. Computations over the history (resampling,
+indicators) run on whole columns instead of looping over per-bar dicts, and
+slicing by position or by time returns views of the same arrays without copying
+them.
+
+Series convert to and from the formats the bars travel in: Polygon's list of
+aggregates (`from_results`/`to_results`), rows of the bar store (`from_rows`) and
+unsaved `Bar` instances (`to_bars`).
+"""
+
+from collections.abc import Iterable
+from collections.abc import Mapping
+from datetime import UTC
+from datetime import datetime
+from typing import Any
+
+import numpy as np
+from numpy.typing import ArrayLike
+
+from webull_backend.polygon.models import Bar
+from webull_backend.tickers.models import Ticker
+
+# Bar columns, as named in the store
+BAR_FIELDS = (
+    "timestamp",
+    "open",
+    "high",
+    "low",
+    "close",
+    "volume",
+    "vwap",
+    "transactions",
+)
+
+# Polygon's aggregate keys, matching `BAR_FIELDS`
+BAR_KEYS = ("t", "o", "h", "l", "c", "v", "vw", "n")
+
+# Columns Polygon does not always report; they are NaN when missing
+OPTIONAL_FIELDS = ("vwap", "transactions")
+
+
+class BarSeries:
+    """
+    Bars of a ticker as parallel NumPy arrays, oldest first.
+
+    Timestamps are epoch milliseconds in an int64 array, every other column is a
+    float64 array.
+    """
+
+    timestamp: np.ndarray
+    open: np.ndarray
+    high: np.ndarray
+    low: np.ndarray
+    close: np.ndarray
+    volume: np.ndarray
+    vwap: np.ndarray
+    transactions: np.ndarray
+
+    def __init__(self, columns: Mapping[str, ArrayLike]):
+        """
+        Initializes the series from its columns.
+
+        Args:
+            columns (Mapping[str, ArrayLike]): The values of each of `BAR_FIELDS`,
+                all of the same length; missing optional columns are filled with
+                NaN.
+        """
+        self.timestamp = np.asarray(columns["timestamp"], dtype=np.int64)
+        size = len(self.timestamp)
+        for field in BAR_FIELDS[1:]:
+            if field in OPTIONAL_FIELDS and columns.get(field) is None:
+                column = np.full(size, np.nan)
+            else:
+                column = np.asarray(columns[field], dtype=np.float64)
+            if len(column) != size:
+                msg = f"Column {field} has {len(column)} values instead of {size}"
+                raise ValueError(msg)
+            setattr(self, field, column)
+
+    @classmethod
+    def empty(cls) -> "BarSeries":
+        """
+        Returns a series without bars.
+        """
+        return cls({field: [] for field in BAR_FIELDS})
+
+    @classmethod
+    def from_results(cls, results: list[dict]) -> "BarSeries":
+        """
+        Builds a series from Polygon's aggregates.
+
+        Args:
+            results (list[dict]): The aggregates, keyed as in `BAR_KEYS` and sorted
+                by timestamp.
+
+        Returns:
+            BarSeries: The series.
+        """
+        size = len(results)
+        columns = {}
+        for field, key in zip(BAR_FIELDS, BAR_KEYS, strict=True):
+            dtype = np.int64 if field == "timestamp" else np.float64
+            if field in OPTIONAL_FIELDS:
+                values = (result.get(key, np.nan) for result in results)
+                # JSON null reads as None
+                values = (np.nan if value is None else value for value in values)
+            else:
+                values = (result[key] for result in results)
+            columns[field] = np.fromiter(values, dtype=dtype, count=size)
+        return cls(columns)
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple]) -> "BarSeries":
+        """
+        Builds a series from rows of the bar store.
+
+        Args:
+            rows (Iterable[tuple]): The bars as `BAR_FIELDS` tuples with aware
+                datetimes, sorted by timestamp.
+
+        Returns:
+            BarSeries: The series.
+        """
+        rows = list(rows)
+        if not rows:
+            return cls.empty()
+        values = dict(zip(BAR_FIELDS, zip(*rows, strict=True), strict=True))
+        columns: dict[str, ArrayLike] = dict(values)
+        columns["timestamp"] = np.fromiter(
+            (int(timestamp.timestamp() * 1000) for timestamp in values["timestamp"]),
+            dtype=np.int64,
+            count=len(rows),
+        )
+        for field in OPTIONAL_FIELDS:
+            columns[field] = np.fromiter(
+                (np.nan if value is None else value for value in values[field]),
+                dtype=np.float64,
+                count=len(rows),
+            )
+        return cls(columns)
+
+    @classmethod
+    def from_history(cls, history: dict) -> "BarSeries":
+        """
+        Builds a series from a history response.
+
+        Args:
+            history (dict): The history in the layout of Polygon's aggregates
+                response.
+
+        Returns:
+            BarSeries: The series.
+        """
+        return cls.from_results(history.get("results", []))
+
+    def __len__(self) -> int:
+        """
+        Returns the number of bars.
+        """
+        return len(self.timestamp)
+
+    def __getitem__(self, index: Any) -> "BarSeries":
+        """
+        Returns some of the bars.
+
+        Args:
+            index (Any): A slice, which returns views of the columns, or an index
+                array or boolean mask, which returns copies.
+
+        Returns:
+            BarSeries: The selected bars.
+        """
+        return BarSeries({field: getattr(self, field)[index] for field in BAR_FIELDS})
+
+    def __eq__(self, other: object) -> bool:
+        """
+        Returns whether two series hold the same bars.
+        """
+        if not isinstance(other, BarSeries):
+            return NotImplemented
+        return all(
+            np.array_equal(getattr(self, field), getattr(other, field), equal_nan=True)
+            for field in BAR_FIELDS
+        )
+
+    def between(self, start: datetime, end: datetime) -> "BarSeries":
+        """
+        Returns the bars starting in a time range, as views of the columns.
+
+        Args:
+            start (datetime): The start of the range, included.
+            end (datetime): The end of the range, excluded.
+
+        Returns:
+            BarSeries: The bars of the range.
+        """
+        first, last = np.searchsorted(
+            self.timestamp,
+            [int(start.timestamp() * 1000), int(end.timestamp() * 1000)],
+        )
+        return self[first:last]
+
+    def to_results(self) -> list[dict]:
+        """
+        Converts the series to Polygon's aggregates.
+
+        Returns:
+            list[dict]: The aggregates, keyed as in `BAR_KEYS`; missing optional
+                values are left out, as Polygon does.
+        """
+        # Lists of Python numbers are much faster to read than NumPy scalars
+        columns = [getattr(self, field).tolist() for field in BAR_FIELDS]
+        results = []
+        for t, o, h, low, c, v, vw, n in zip(*columns, strict=True):
+            result = {"t": t, "o": o, "h": h, "l": low, "c": c, "v": v}
+            # NaN is the only value that differs from itself
+            if vw == vw:  # noqa: PLR0124
+                result["vw"] = vw
+            if n == n:  # noqa: PLR0124
+                result["n"] = int(n)
+            results.append(result)
+        return results
+
+    def to_history(self, symbol: str) -> dict:
+        """
+        Converts the series to a history response.
+
+        Args:
+            symbol (str): The ticker symbol.
+
+        Returns:
+            dict: The history in the layout of Polygon's aggregates response.
+        """
+        results = self.to_results()
+        return {
+            "ticker": symbol,
+            "resultsCount": len(results),
+            "results": results,
+        }
+
+    def to_bars(self, ticker: Ticker, timespan: str) -> list[Bar]:
+        """
+        Converts the series to unsaved bars.
+
+        Args:
+            ticker (Ticker): The ticker the bars belong to.
+            timespan (str): The size of the aggregate window.
+
+        Returns:
+            list[Bar]: The bars.
+        """
+        return [
+            Bar(
+                ticker=ticker,
+                timespan=timespan,
+                timestamp=datetime.fromtimestamp(result["t"] / 1000, UTC),
+                open=result["o"],
+                high=result["h"],
+                low=result["l"],
+                close=result["c"],
+                volume=result["v"],
+                vwap=result.get("vw"),
+                transactions=result.get("n"),
+            )
+            for result in self.to_results()
+        ]
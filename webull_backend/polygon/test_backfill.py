@@ -0,0 +1,155 @@
+from datetime import date
+from functools import partial
+from io import StringIO
+
+import httpx
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from webull_backend.exchanges.models import Exchange
+from webull_backend.polygon import client
+from webull_backend.polygon.backfill import build_grouped_bars
+from webull_backend.polygon.history import session_start
+from webull_backend.polygon.models import BackfilledDay
+from webull_backend.polygon.models import Bar
+from webull_backend.tickers.models import Ticker
+
+# Sessions between the start and the end of the backfills; Independence Day has none
+SESSIONS = ["2024-07-01", "2024-07-02", "2024-07-03", "2024-07-05"]
+
+
+class GroupedDaily:
+    def __init__(self):
+        self.days = []
+        self.failing = set()
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        day = request.url.path.rsplit("/", 1)[1]
+        self.days.append(day)
+        if day in self.failing:
+            return httpx.Response(502)
+        result = {"o": 1, "h": 2, "l": 0.5, "c": 1.5, "v": 100, "t": 1720209600000}
+        return httpx.Response(
+            200,
+            json={
+                "results": [
+                    {**result, "T": "AA"},
+                    {**result, "T": "BB"},
+                    {**result, "T": "CC"},
+                    {**result, "T": "UNKNOWN"},
+                ],
+            },
+        )
+
+
+@pytest.fixture
+def upstream(monkeypatch, settings) -> GroupedDaily:
+    settings.POLYGON_API_URL = "https://polygon.test"
+    upstream = GroupedDaily()
+    monkeypatch.setattr(
+        client,
+        "AsyncPolygonClient",
+        partial(client.AsyncPolygonClient, transport=httpx.MockTransport(upstream)),
+    )
+    return upstream
+
+
+@pytest.fixture
+def tickers(db) -> list[Ticker]:
+    exchange = Exchange.objects.create(mic="NYSE")
+    return [
+        Ticker.objects.create(exchange=exchange, symbol=symbol)
+        for symbol in ("AA", "BB")
+    ]
+
+
+def backfill(*args):
+    call_command(
+        "backfill_bars",
+        "--start",
+        "2024-07-01",
+        "--end",
+        "2024-07-05",
+        *args,
+        stdout=StringIO(),
+    )
+
+
+def test_build_grouped_bars_skips_unknown_symbols(tickers: list[Ticker]):
+    index = {ticker.symbol: ticker.uuid for ticker in tickers[:1]}
+    results = [
+        {"T": "AA", "o": 1, "h": 2, "l": 0.5, "c": 1.5, "v": 100, "t": 1720209600000},
+        {"T": "BB", "o": 1, "h": 2, "l": 0.5, "c": 1.5, "v": 100, "t": 1720209600000},
+    ]
+
+    bars = build_grouped_bars(date(2024, 7, 5), results, index)
+
+    assert [bar.ticker_id for bar in bars] == [tickers[0].uuid]
+    # Stored at the start of the session, like the range aggregates
+    assert bars[0].timestamp == session_start(date(2024, 7, 5))
+
+
+def test_backfill_bars(tickers: list[Ticker], upstream: GroupedDaily):
+    backfill()
+
+    assert sorted(upstream.days) == SESSIONS
+    assert Bar.objects.count() == len(SESSIONS) * len(tickers)
+    assert list(BackfilledDay.objects.values_list("bars", flat=True)) == [
+        len(tickers),
+    ] * len(SESSIONS)
+
+
+def test_backfill_bars_resumes(tickers: list[Ticker], upstream: GroupedDaily):
+    upstream.failing = {"2024-07-02"}
+    with pytest.raises(CommandError, match="2024-07-02"):
+        backfill()
+
+    upstream.days, upstream.failing = [], set()
+    backfill()
+
+    assert upstream.days == ["2024-07-02"]
+    assert BackfilledDay.objects.count() == len(SESSIONS)
+
+
+def test_backfill_bars_force(tickers: list[Ticker], upstream: GroupedDaily):
+    backfill()
+    backfill("--force", "--exchange", "NYSE")
+
+    # Forced days are fetched again and their bars overwritten
+    assert upstream.days == SESSIONS * 2
+    assert Bar.objects.count() == len(SESSIONS) * len(tickers)
+
+
+def test_backfill_bars_per_exchange(tickers: list[Ticker], upstream: GroupedDaily):
+    nasdaq = Exchange.objects.create(mic="NASDAQ")
+    listed = Ticker.objects.create(exchange=nasdaq, symbol="CC")
+    backfill("--exchange", "NYSE")
+    backfill("--exchange", "NYSE")
+    backfill("--exchange", "NASDAQ")
+
+    # The dates backfilled for NYSE are loaded again for the NASDAQ tickers
+    assert upstream.days == SESSIONS * 2
+    assert listed.bars.count() == len(SESSIONS)
+    assert BackfilledDay.objects.filter(exchange=nasdaq).count() == len(SESSIONS)
+
+
+def test_backfill_bars_skips_ambiguous_symbols(
+    tickers: list[Ticker],
+    upstream: GroupedDaily,
+    caplog,
+):
+    nasdaq = Exchange.objects.create(mic="NASDAQ")
+    Ticker.objects.create(exchange=nasdaq, symbol="AA")
+    backfill()
+
+    # The grouped bar of AA cannot tell which listing it belongs to
+    assert list(Bar.objects.values_list("ticker", flat=True).distinct()) == [
+        tickers[1].uuid,
+    ]
+    assert "Skipping AA, listed on several exchanges" in caplog.text
+
+
+def test_backfill_bars_unknown_exchange(tickers: list[Ticker]):
+    with pytest.raises(CommandError, match="XXXX"):
+        backfill("--exchange", "NYSE", "XXXX")
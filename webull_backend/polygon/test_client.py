@@ -0,0 +1,122 @@
+import asyncio
+from datetime import date
+
+import httpx
+from asgiref.sync import async_to_sync
+
+from config.asgi import application
+from webull_backend.polygon.client import AsyncPolygonClient
+from webull_backend.polygon.client import close_clients
+from webull_backend.polygon.client import get_client
+
+
+def test_get_aggs_follows_pagination(settings):
+    settings.POLYGON_API_URL = "https://polygon.test"
+    requests = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        requests.append(request)
+        if request.url.params.get("cursor"):
+            return httpx.Response(200, json={"results": [{"t": 2}]})
+        return httpx.Response(
+            200,
+            json={
+                "results": [{"t": 1}],
+                "next_url": "https://polygon.test/v2/aggs/next?cursor=abc",
+            },
+        )
+
+    async def fetch():
+        client = AsyncPolygonClient(
+            api_key="secret",
+            transport=httpx.MockTransport(handler),
+        )
+        try:
+            return await client.get_aggs(
+                "AA",
+                1,
+                "day",
+                date(2024, 6, 3),
+                date(2024, 6, 7),
+            )
+        finally:
+            await client.aclose()
+
+    assert async_to_sync(fetch)() == [{"t": 1}, {"t": 2}]
+    assert (
+        requests[0].url.path == "/v2/aggs/ticker/AA/range/1/day/2024-06-03/2024-06-07"
+    )
+    assert requests[0].url.params["adjusted"] == "true"
+    assert requests[0].headers["Authorization"] == "Bearer secret"
+    assert requests[1].url.params["cursor"] == "abc"
+
+
+def test_get_limits_requests_in_flight():
+    limit = 2
+    in_flight = peak = 0
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        nonlocal in_flight, peak
+        in_flight += 1
+        peak = max(peak, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return httpx.Response(200, json={})
+
+    async def fetch():
+        client = AsyncPolygonClient(
+            max_concurrency=limit,
+            transport=httpx.MockTransport(handler),
+        )
+        try:
+            await asyncio.gather(*(client.get("/v1/test") for _ in range(6)))
+        finally:
+            await client.aclose()
+
+    async_to_sync(fetch)()
+
+    assert peak == limit
+
+
+def test_get_client_is_shared_within_a_loop():
+    async def clients():
+        return get_client(), get_client()
+
+    first, second = async_to_sync(clients)()
+
+    assert first is second
+
+
+def test_close_clients():
+    async def reopen():
+        client = get_client()
+        await close_clients()
+        reopened = get_client()
+        await close_clients()
+        return client, reopened
+
+    client, reopened = async_to_sync(reopen)()
+
+    assert client.http.is_closed
+    assert reopened is not client
+
+
+def test_asgi_lifespan_closes_clients():
+    messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message["type"])
+
+    async def serve():
+        client = get_client()
+        await application({"type": "lifespan"}, receive, send)
+        return client
+
+    client = async_to_sync(serve)()
+
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+    assert client.http.is_closed
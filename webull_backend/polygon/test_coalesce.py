@@ -0,0 +1,111 @@
+import asyncio
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+
+from webull_backend.polygon.coalesce import CACHE_KEY_PREFIX
+from webull_backend.polygon.coalesce import acquire_lock
+from webull_backend.polygon.coalesce import coalesce
+from webull_backend.polygon.coalesce import release_lock
+
+
+class Upstream:
+    def __init__(self):
+        self.calls = 0
+
+    async def fetch(self):
+        self.calls += 1
+        await asyncio.sleep(0.01)
+        return [{"t": self.calls}]
+
+
+def test_coalesce_shares_in_flight_calls():
+    upstream = Upstream()
+
+    async def run():
+        return await asyncio.gather(
+            *(coalesce("aggs:AA", upstream.fetch) for _ in range(callers)),
+        )
+
+    callers = 5
+    results = async_to_sync(run)()
+
+    assert upstream.calls == 1
+    assert results == [[{"t": 1}]] * callers
+
+
+def test_coalesce_keys_are_independent():
+    upstream = Upstream()
+
+    async def run():
+        return await asyncio.gather(
+            coalesce("aggs:AA", upstream.fetch),
+            coalesce("aggs:MO", upstream.fetch),
+        )
+
+    async_to_sync(run)()
+
+    assert upstream.calls == len(["aggs:AA", "aggs:MO"])
+
+
+def test_coalesce_waits_for_another_worker():
+    upstream = Upstream()
+    cache.add(f"{CACHE_KEY_PREFIX}:lock:aggs:AA", "other")
+
+    async def other_worker():
+        await asyncio.sleep(0.1)
+        await cache.aset(f"{CACHE_KEY_PREFIX}:result:aggs:AA", [{"t": 0}])
+
+    async def run():
+        results = await asyncio.gather(
+            coalesce("aggs:AA", upstream.fetch),
+            other_worker(),
+        )
+        return results[0]
+
+    assert async_to_sync(run)() == [{"t": 0}]
+    assert upstream.calls == 0
+
+
+def test_coalesce_takes_over_an_expired_lock(settings):
+    settings.POLYGON_TIMEOUT = 0.2
+    upstream = Upstream()
+    cache.add(f"{CACHE_KEY_PREFIX}:lock:aggs:AA", "other")
+
+    assert async_to_sync(coalesce)("aggs:AA", upstream.fetch) == [{"t": 1}]
+    assert upstream.calls == 1
+
+
+def test_coalesce_releases_the_lock_on_errors():
+    async def fail():
+        raise RuntimeError
+
+    with pytest.raises(RuntimeError):
+        async_to_sync(coalesce)("aggs:AA", fail)
+
+    assert cache.get(f"{CACHE_KEY_PREFIX}:lock:aggs:AA") is None
+
+
+def test_coalesce_keeps_a_lock_taken_over_by_another_worker():
+    lock_key = f"{CACHE_KEY_PREFIX}:lock:aggs:AA"
+
+    async def slow_fetch():
+        # The lock expires during the fetch and another worker takes it
+        await cache.adelete(lock_key)
+        await cache.aadd(lock_key, "other")
+        return [{"t": 1}]
+
+    async_to_sync(coalesce)("aggs:AA", slow_fetch)
+
+    assert cache.get(lock_key) == "other"
+
+
+def test_release_lock_requires_the_token():
+    token = async_to_sync(acquire_lock)("lock", 10)
+
+    assert token is not None
+    assert async_to_sync(acquire_lock)("lock", 10) is None
+    assert not release_lock("lock", "other")
+    assert release_lock("lock", token)
+    assert cache.get("lock") is None
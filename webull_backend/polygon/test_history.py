@@ -0,0 +1,168 @@
+import json
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from types import SimpleNamespace
+
+import pytest
+from asgiref.sync import async_to_sync
+
+from webull_backend.exchanges.models import Exchange
+from webull_backend.exchanges.models import ExchangeHoliday
+from webull_backend.polygon import history
+from webull_backend.polygon.history import aget_history
+from webull_backend.polygon.history import get_history
+from webull_backend.polygon.history import session_start
+from webull_backend.polygon.models import Bar
+from webull_backend.polygon.planner import MARKET_TIMEZONE
+from webull_backend.tickers.models import Ticker
+
+MONDAY = date(2024, 6, 3)
+WEEK = [MONDAY + timedelta(days=i) for i in range(5)]
+
+
+def aggregate(day: date, close: float = 10.0) -> dict:
+    return {
+        "t": int(session_start(day).timestamp() * 1000),
+        "o": 9.5,
+        "h": 10.5,
+        "l": 9.0,
+        "c": close,
+        "v": 1000.0,
+        "vw": 9.8,
+        "n": 12,
+    }
+
+
+class FakeClient:
+    def __init__(self):
+        self.calls = []
+
+    def get_aggs(self, symbol, multiplier, timespan, start, end, **options):
+        self.calls.append((symbol, start, end))
+        days = (end - start).days + 1
+        results = [aggregate(start + timedelta(days=i)) for i in range(days)]
+        return SimpleNamespace(data=json.dumps({"results": results}).encode())
+
+
+class FakeAsyncClient:
+    def __init__(self):
+        self.calls = []
+
+    async def get_aggs(self, symbol, multiplier, timespan, start, end):
+        self.calls.append((symbol, start, end))
+        days = (end - start).days + 1
+        return [aggregate(start + timedelta(days=i)) for i in range(days)]
+
+
+@pytest.fixture
+def client(monkeypatch) -> FakeClient:
+    client = FakeClient()
+    monkeypatch.setattr(history, "client", client)
+    return client
+
+
+@pytest.fixture
+def async_client(monkeypatch) -> FakeAsyncClient:
+    client = FakeAsyncClient()
+    monkeypatch.setattr(history, "get_client", lambda: client)
+    return client
+
+
+@pytest.fixture
+def ticker(db) -> Ticker:
+    exchange = Exchange.objects.create(mic="NYSE")
+    return Ticker.objects.create(exchange=exchange, symbol="AA", company_name="Alcoa")
+
+
+def test_get_history_fetches_and_stores_bars(ticker: Ticker, client: FakeClient):
+    result = get_history(ticker, MONDAY, MONDAY + timedelta(days=4))
+
+    assert client.calls == [("AA", MONDAY, MONDAY + timedelta(days=4))]
+    assert result["ticker"] == "AA"
+    assert result["resultsCount"] == len(WEEK)
+    assert result["results"][0] == aggregate(MONDAY)
+    assert Bar.objects.filter(ticker=ticker).count() == len(WEEK)
+
+
+def test_get_history_reads_stored_bars(
+    ticker: Ticker,
+    client: FakeClient,
+    django_assert_num_queries,
+):
+    get_history(ticker, MONDAY, MONDAY + timedelta(days=4))
+    client.calls.clear()
+
+    with django_assert_num_queries(1):
+        result = get_history(
+            ticker,
+            MONDAY + timedelta(days=1),
+            MONDAY + timedelta(days=3),
+        )
+
+    assert client.calls == []
+    assert [bar["t"] for bar in result["results"]] == [
+        aggregate(MONDAY + timedelta(days=i))["t"] for i in range(1, 4)
+    ]
+
+
+def test_get_history_fetches_only_missing_days(ticker: Ticker, client: FakeClient):
+    get_history(ticker, MONDAY, MONDAY + timedelta(days=2))
+    client.calls.clear()
+
+    result = get_history(ticker, MONDAY, MONDAY + timedelta(days=4))
+
+    assert client.calls == [
+        ("AA", MONDAY + timedelta(days=3), MONDAY + timedelta(days=4)),
+    ]
+    assert result["resultsCount"] == len(WEEK)
+
+
+def test_aget_history_fetches_gaps_concurrently(
+    ticker: Ticker,
+    client: FakeClient,
+    async_client: FakeAsyncClient,
+):
+    # Tuesday and Thursday are stored, the three other days are two gaps
+    get_history(ticker, MONDAY + timedelta(days=1), MONDAY + timedelta(days=1))
+    get_history(ticker, MONDAY + timedelta(days=3), MONDAY + timedelta(days=3))
+
+    result = async_to_sync(aget_history)(ticker, MONDAY, MONDAY + timedelta(days=4))
+
+    assert async_client.calls == [
+        ("AA", MONDAY, MONDAY),
+        ("AA", MONDAY + timedelta(days=2), MONDAY + timedelta(days=2)),
+        ("AA", MONDAY + timedelta(days=4), MONDAY + timedelta(days=4)),
+    ]
+    assert result == get_history(ticker, MONDAY, MONDAY + timedelta(days=4))
+    assert Bar.objects.filter(ticker=ticker).count() == len(WEEK)
+
+
+def test_get_history_refetches_bars_stored_mid_session(
+    ticker: Ticker,
+    client: FakeClient,
+):
+    get_history(ticker, MONDAY, MONDAY + timedelta(days=4))
+    tuesday = MONDAY + timedelta(days=1)
+    # Tuesday's bar was stored at 11:00, before the close
+    Bar.objects.filter(timestamp=session_start(tuesday)).update(
+        updated_at=datetime(2024, 6, 4, 11, tzinfo=MARKET_TIMEZONE),
+    )
+    client.calls.clear()
+
+    get_history(ticker, MONDAY, MONDAY + timedelta(days=4))
+    get_history(ticker, MONDAY, MONDAY + timedelta(days=4))
+
+    # Only once: the refetched bar is settled
+    assert client.calls == [("AA", tuesday, tuesday)]
+
+
+def test_get_history_follows_the_exchange_holidays(ticker: Ticker, client: FakeClient):
+    wednesday = MONDAY + timedelta(days=2)
+    ExchangeHoliday.objects.create(exchange=ticker.exchange, date=wednesday)
+
+    result = get_history(ticker, wednesday, wednesday)
+
+    # The exchange is closed, there is nothing to fetch
+    assert client.calls == []
+    assert result["resultsCount"] == 0
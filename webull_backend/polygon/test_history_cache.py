@@ -0,0 +1,169 @@
+import asyncio
+import time
+from datetime import date
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.cache import cache
+
+from webull_backend.polygon import history_cache
+from webull_backend.polygon.history_cache import aget_cached_history
+from webull_backend.polygon.history_cache import history_key
+from webull_backend.polygon.limits import PolygonUnavailable
+from webull_backend.tickers.models import Ticker
+
+START = date(2024, 6, 3)
+END = date(2024, 6, 7)
+
+
+class FakeHistory:
+    def __init__(self):
+        self.calls = 0
+        self.error = None
+
+    async def __call__(self, ticker, start, end, timespan):
+        self.calls += 1
+        if self.error:
+            raise self.error
+        return {"ticker": ticker.symbol, "resultsCount": self.calls, "results": []}
+
+
+@pytest.fixture
+def upstream(monkeypatch) -> FakeHistory:
+    upstream = FakeHistory()
+    monkeypatch.setattr(history_cache, "aget_history", upstream)
+    return upstream
+
+
+@pytest.fixture
+def ticker() -> Ticker:
+    return Ticker(symbol="AA")
+
+
+def make_stale(ticker: Ticker):
+    key = history_key(ticker, START, END, "day")
+    entry = cache.get(key)
+    entry["fresh_until"] = time.time() - 1
+    cache.set(key, entry)
+
+
+async def get_and_refresh(ticker: Ticker):
+    cached = await aget_cached_history(ticker, START, END)
+    # Wait for the background refresh
+    await asyncio.gather(*asyncio.all_tasks() - {asyncio.current_task()})
+    return cached
+
+
+def test_aget_cached_history_caches_entries(ticker: Ticker, upstream: FakeHistory):
+    first = async_to_sync(aget_cached_history)(ticker, START, END)
+    second = async_to_sync(aget_cached_history)(ticker, START, END)
+
+    assert upstream.calls == 1
+    assert second.history == first.history
+    # The history is made of closed sessions
+    assert 0 < second.max_age <= first.max_age
+
+
+def test_aget_cached_history_coalesces_misses(ticker: Ticker, upstream: FakeHistory):
+    async def run():
+        return await asyncio.gather(
+            *(aget_cached_history(ticker, START, END) for _ in range(3)),
+        )
+
+    async_to_sync(run)()
+
+    assert upstream.calls == 1
+
+
+def test_aget_cached_history_serves_stale_entries(
+    ticker: Ticker,
+    upstream: FakeHistory,
+):
+    async_to_sync(aget_cached_history)(ticker, START, END)
+    make_stale(ticker)
+
+    stale = async_to_sync(get_and_refresh)(ticker)
+    fresh = async_to_sync(aget_cached_history)(ticker, START, END)
+
+    assert stale.history["resultsCount"] == 1
+    assert stale.max_age == 0
+    assert fresh.history["resultsCount"] == upstream.calls
+    assert fresh.max_age > 0
+
+
+def test_aget_cached_history_versions(ticker: Ticker, upstream: FakeHistory):
+    first = async_to_sync(aget_cached_history)(ticker, START, END)
+    hit = async_to_sync(aget_cached_history)(ticker, START, END)
+    make_stale(ticker)
+
+    async_to_sync(get_and_refresh)(ticker)
+    refreshed = async_to_sync(aget_cached_history)(ticker, START, END)
+
+    assert hit.version == first.version
+    # The refreshed history has a different count
+    assert refreshed.version != first.version
+
+
+def test_aget_cached_history_refreshes_once(ticker: Ticker, upstream: FakeHistory):
+    async_to_sync(aget_cached_history)(ticker, START, END)
+    make_stale(ticker)
+    # Another worker is refreshing the entry
+    cache.add(f"{history_key(ticker, START, END, 'day')}:refresh", "other")
+
+    async_to_sync(get_and_refresh)(ticker)
+
+    assert upstream.calls == 1
+
+
+def test_aget_cached_history_keeps_stale_entry_on_errors(
+    ticker: Ticker,
+    upstream: FakeHistory,
+):
+    async_to_sync(aget_cached_history)(ticker, START, END)
+    make_stale(ticker)
+    upstream.error = PolygonUnavailable()
+
+    async_to_sync(get_and_refresh)(ticker)
+    stale = async_to_sync(aget_cached_history)(ticker, START, END)
+
+    assert stale.history["resultsCount"] == 1
+    assert stale.max_age == 0
+
+
+def test_aget_cached_history_logs_refresh_failures(
+    ticker: Ticker,
+    upstream: FakeHistory,
+    caplog,
+):
+    async_to_sync(aget_cached_history)(ticker, START, END)
+    make_stale(ticker)
+    upstream.error = ValueError("Unexpected payload")
+
+    stale = async_to_sync(get_and_refresh)(ticker)
+
+    assert stale.history["resultsCount"] == 1
+    assert "Failed to refresh the history of AA" in caplog.text
+    assert "Unexpected payload" in caplog.text
+    # The lock is released for the next attempt
+    assert cache.get(f"{history_key(ticker, START, END, 'day')}:refresh") is None
+
+
+def test_refresh_keeps_a_lock_taken_over_by_another_worker(
+    ticker: Ticker,
+    upstream: FakeHistory,
+    monkeypatch,
+):
+    lock_key = f"{history_key(ticker, START, END, 'day')}:refresh"
+    refresh_history = history_cache.refresh_history
+
+    async def slow_refresh(*args):
+        # The lock expires during the refresh and another worker takes it
+        await cache.adelete(lock_key)
+        await cache.aadd(lock_key, "other")
+        return await refresh_history(*args)
+
+    monkeypatch.setattr(history_cache, "refresh_history", slow_refresh)
+
+    async_to_sync(history_cache.refresh_in_background)(ticker, START, END, "day")
+
+    assert cache.get(lock_key) == "other"
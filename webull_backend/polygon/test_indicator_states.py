@@ -0,0 +1,162 @@
+from datetime import date
+from datetime import datetime
+from datetime import timedelta
+from io import StringIO
+
+import numpy as np
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from webull_backend.exchanges.models import Exchange
+from webull_backend.polygon.history import session_start
+from webull_backend.polygon.history import store_bars
+from webull_backend.polygon.indicator_states import WARMUP_FACTOR
+from webull_backend.polygon.indicator_states import indicator_values
+from webull_backend.polygon.indicators import EMA
+from webull_backend.polygon.indicators import SMA
+from webull_backend.polygon.indicators import to_json
+from webull_backend.polygon.models import IndicatorState
+from webull_backend.polygon.planner import MARKET_TIMEZONE
+from webull_backend.polygon.planner import trading_days
+from webull_backend.polygon.resample import Interval
+from webull_backend.polygon.series import BarSeries
+from webull_backend.tickers.models import Ticker
+
+DAILY = Interval.parse("1day")
+
+DAYS = trading_days(date(2024, 6, 3), date(2024, 6, 28))
+
+# During the last session, so its bar is still open
+NOW = datetime(2024, 6, 28, 12, tzinfo=MARKET_TIMEZONE)
+
+
+def aggregate(day: date, close: float) -> dict:
+    timestamp = int(session_start(day).timestamp() * 1000)
+    return {"t": timestamp, "o": close, "h": close, "l": close, "c": close, "v": 1.0}
+
+
+@pytest.fixture
+def ticker(db) -> Ticker:
+    exchange = Exchange.objects.create(mic="NYSE")
+    return Ticker.objects.create(exchange=exchange, symbol="AA")
+
+
+@pytest.fixture
+def series(ticker: Ticker) -> BarSeries:
+    results = [aggregate(day, 10.0 + i) for i, day in enumerate(DAYS)]
+    store_bars(ticker, "day", results)
+    return BarSeries.from_results(results)
+
+
+def states(ticker: Ticker) -> int:
+    return IndicatorState.objects.filter(ticker=ticker).count()
+
+
+def test_indicator_values_are_persisted(ticker: Ticker, series: BarSeries):
+    values = indicator_values(ticker, series, [SMA(5)], DAILY, NOW)
+
+    assert values["sma5"]["sma"] == to_json(SMA(5).compute(series.close)["sma"])
+    # The open session is not persisted
+    assert states(ticker) == len(DAYS) - 1
+
+
+def test_indicator_values_read_stored_outputs(
+    ticker: Ticker,
+    series: BarSeries,
+    django_assert_num_queries,
+):
+    indicator_values(ticker, series, [SMA(5)], DAILY, NOW)
+    closed = series[:-1]
+
+    # A single range scan of the stored outputs
+    with django_assert_num_queries(1):
+        values = indicator_values(ticker, closed, [SMA(5)], DAILY, NOW)
+
+    assert values["sma5"]["sma"][-1] == np.mean(closed.close[-5:])
+
+
+def test_indicator_values_fold_new_bars(ticker: Ticker, series: BarSeries):
+    indicator_values(ticker, series, [SMA(5)], DAILY, NOW)
+    store_bars(ticker, "day", [aggregate(date(2024, 7, 1), 40.0)])
+    window = BarSeries.from_results(
+        [aggregate(DAYS[-1], 10.0 + len(DAYS) - 1), aggregate(date(2024, 7, 1), 40.0)],
+    )
+
+    values = indicator_values(
+        ticker,
+        window,
+        [SMA(5)],
+        DAILY,
+        NOW + timedelta(days=4),
+    )
+
+    assert states(ticker) == len(DAYS) + 1
+    assert values["sma5"]["sma"][-1] == np.mean([*series.close[-4:], 40.0])
+
+
+def test_storing_older_bars_invalidates_states(ticker: Ticker, series: BarSeries):
+    indicator_values(ticker, series, [SMA(5)], DAILY, NOW)
+
+    changed = 10
+    store_bars(ticker, "day", [aggregate(DAYS[changed], 99.0)])
+
+    # Only the states before the changed day are kept
+    assert states(ticker) == changed
+
+
+def test_resampled_indicators_are_not_persisted(ticker: Ticker, series: BarSeries):
+    values = indicator_values(ticker, series, [SMA(2)], Interval.parse("1week"), NOW)
+
+    assert len(values["sma2"]["sma"]) == len(series)
+    assert states(ticker) == 0
+
+
+def test_indicator_values_warm_up_over_a_bounded_history(
+    ticker: Ticker,
+    monkeypatch,
+):
+    days = trading_days(date(2023, 6, 1), DAYS[-1])
+    results = [aggregate(day, 10.0 + i % 7) for i, day in enumerate(days)]
+    store_bars(ticker, "day", results)
+    window = BarSeries.from_results(results)[-5:]
+    pushed = []
+    push = EMA.push
+
+    def counted_push(*args):
+        pushed.append(args)
+        return push(*args)
+
+    monkeypatch.setattr(EMA, "push", counted_push)
+
+    values = indicator_values(ticker, window, [EMA(5)], DAILY, NOW)
+
+    # Only the last warm-up bars are folded, and the window's closed bars stored
+    assert len(pushed) == EMA(5).lookback * WARMUP_FACTOR + len(window)
+    assert states(ticker) == len(window) - 1
+    full = EMA(5).compute(BarSeries.from_results(results).close)["ema"][-5:]
+    np.testing.assert_allclose(
+        np.array(values["ema5"]["ema"], dtype=np.float64),
+        full,
+        rtol=1e-6,
+    )
+
+
+def test_build_indicator_states(
+    ticker: Ticker,
+    series: BarSeries,
+    django_assert_num_queries,
+):
+    call_command("build_indicator_states", "sma5", stdout=StringIO())
+    call_command("build_indicator_states", "sma5", stdout=StringIO())
+
+    assert states(ticker) == len(DAYS)
+    # The requests read the built states
+    with django_assert_num_queries(1):
+        values = indicator_values(ticker, series, [SMA(5)], DAILY, NOW)
+    assert values["sma5"]["sma"] == to_json(SMA(5).compute(series.close)["sma"])
+
+
+def test_build_indicator_states_invalid_indicator(db):
+    with pytest.raises(CommandError, match="Invalid indicator"):
+        call_command("build_indicator_states", "sma", "foo", stdout=StringIO())
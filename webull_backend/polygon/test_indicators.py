@@ -0,0 +1,96 @@
+import numpy as np
+import pytest
+
+from webull_backend.polygon.indicators import EMA
+from webull_backend.polygon.indicators import MACD
+from webull_backend.polygon.indicators import RSI
+from webull_backend.polygon.indicators import SMA
+from webull_backend.polygon.indicators import BollingerBands
+from webull_backend.polygon.indicators import ewm
+from webull_backend.polygon.indicators import parse_indicators
+from webull_backend.polygon.indicators import to_json
+
+
+@pytest.fixture
+def closes() -> np.ndarray:
+    rng = np.random.default_rng(42)
+    return 100 + np.cumsum(rng.normal(0, 1, 300))
+
+
+def pushed(indicator, closes: np.ndarray) -> dict[str, np.ndarray]:
+    state = indicator.initial_state()
+    bars = [indicator.push(state, close) for close in closes.tolist()]
+    return {
+        name: np.array([bar[name] for bar in bars], dtype=np.float64)
+        for name in indicator.outputs
+    }
+
+
+@pytest.mark.parametrize(
+    "indicator",
+    [SMA(20), EMA(12), RSI(14), MACD(), BollingerBands(20)],
+    ids=str,
+)
+def test_push_matches_compute(indicator, closes: np.ndarray):
+    computed = indicator.compute(closes)
+    streamed = pushed(indicator, closes)
+
+    for name in indicator.outputs:
+        np.testing.assert_allclose(
+            streamed[name],
+            computed[name],
+            rtol=1e-9,
+            atol=1e-9,
+        )
+
+
+@pytest.mark.parametrize(
+    "indicator",
+    [SMA(20), EMA(12), RSI(14), MACD(), BollingerBands(20)],
+    ids=str,
+)
+def test_lookback(indicator, closes: np.ndarray):
+    computed = indicator.compute(closes)
+    first = [np.flatnonzero(~np.isnan(column))[0] for column in computed.values()]
+
+    # Every output is available from the last bar of the lookback on
+    assert max(first) == indicator.lookback - 1
+
+
+def test_ewm_matches_the_recurrence(closes: np.ndarray):
+    # A fast decay splits the column in many chunks
+    expected, value = [], 50.0
+    for close in closes.tolist():
+        value = 0.1 * value + 0.9 * close
+        expected.append(value)
+
+    np.testing.assert_allclose(ewm(closes, 0.9, 50.0), expected, rtol=1e-12)
+
+
+def test_sma_values():
+    sma = SMA(3).compute(np.array([1.0, 2.0, 3.0, 4.0, 5.0]))["sma"]
+
+    assert to_json(sma) == [None, None, 2.0, 3.0, 4.0]
+
+
+def test_rsi_of_rising_closes():
+    rsi = RSI(3).compute(np.arange(1.0, 7.0))["rsi"]
+
+    assert to_json(rsi) == [None, None, None, 100.0, 100.0, 100.0]
+
+
+def test_parse_indicators():
+    assert [str(i) for i in parse_indicators(["sma", "ema50", "macd", "sma20"])] == [
+        "sma20",
+        "ema50",
+        "macd",
+    ]
+
+
+@pytest.mark.parametrize(
+    "texts",
+    [["foo20"], ["sma0"], ["macd12"], ["SMA20"], [f"sma{i}" for i in range(1, 12)]],
+)
+def test_parse_invalid_indicators(texts: list[str]):
+    with pytest.raises(ValueError):  # noqa: PT011
+        parse_indicators(texts)
@@ -0,0 +1,174 @@
+from http import HTTPStatus
+
+import httpx
+import pytest
+from django.core.cache import cache
+from django.urls import reverse
+from polygon.exceptions import BadResponse
+
+from webull_backend.polygon.limits import CircuitBreaker
+from webull_backend.polygon.limits import PolygonUnavailable
+from webull_backend.polygon.limits import TokenBucket
+from webull_backend.polygon.limits import get_breaker
+from webull_backend.polygon.limits import guard
+from webull_backend.users.tests.factories import UserFactory
+
+
+def status_error(code: int) -> httpx.HTTPStatusError:
+    request = httpx.Request("GET", "https://polygon.test")
+    response = httpx.Response(code, request=request)
+    return httpx.HTTPStatusError("error", request=request, response=response)
+
+
+def fail_with(exc: Exception):
+    def call():
+        raise exc
+
+    return call
+
+
+@pytest.fixture
+def breaker() -> CircuitBreaker:
+    return CircuitBreaker("test-breaker", threshold=2, window=60, reset_timeout=30)
+
+
+def test_token_bucket():
+    bucket = TokenBucket("test-bucket", rate=1, capacity=2)
+
+    assert bucket.take()[0]
+    assert bucket.take()[0]
+    allowed, level, wait = bucket.take()
+
+    assert not allowed
+    assert level < 1
+    assert 0 < wait <= 1
+
+
+def test_token_bucket_level_does_not_take_tokens():
+    capacity = 2
+    bucket = TokenBucket("test-bucket", rate=1, capacity=capacity)
+
+    assert bucket.level() == capacity
+    assert bucket.level() == capacity
+
+
+def test_circuit_breaker_opens_after_threshold(breaker: CircuitBreaker):
+    breaker.record_failure()
+
+    assert breaker.state() == CircuitBreaker.CLOSED
+    assert breaker.failures() == 1
+    assert breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state() == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_circuit_breaker_half_open_trial(breaker: CircuitBreaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    # End the open period
+    cache.delete(breaker.open_key)
+
+    assert breaker.state() == CircuitBreaker.HALF_OPEN
+    assert breaker.allow()
+    assert not breaker.allow()
+
+    breaker.record_success()
+
+    assert breaker.state() == CircuitBreaker.CLOSED
+    assert breaker.allow()
+
+
+def test_circuit_breaker_failed_trial_reopens(breaker: CircuitBreaker):
+    breaker.record_failure()
+    breaker.record_failure()
+    cache.delete(breaker.open_key)
+    breaker.allow()
+
+    breaker.record_failure()
+
+    assert breaker.state() == CircuitBreaker.OPEN
+
+
+def test_guard_returns_the_result():
+    result = object()
+
+    assert guard(lambda: result) is result
+
+
+@pytest.mark.parametrize(
+    "exc",
+    [
+        status_error(429),
+        status_error(502),
+        httpx.ConnectTimeout("timeout"),
+        BadResponse(),
+    ],
+)
+def test_guard_counts_upstream_failures(exc: Exception):
+    with pytest.raises(PolygonUnavailable):
+        guard(fail_with(exc))
+
+    assert get_breaker().failures() == 1
+
+
+def test_guard_does_not_count_client_errors():
+    with pytest.raises(PolygonUnavailable):
+        guard(fail_with(status_error(404)))
+
+    assert get_breaker().failures() == 0
+
+
+def test_guard_fails_fast_when_open(settings):
+    settings.POLYGON_BREAKER_THRESHOLD = 1
+    calls = []
+    with pytest.raises(PolygonUnavailable):
+        guard(fail_with(status_error(503)))
+
+    with pytest.raises(PolygonUnavailable) as error:
+        guard(lambda: calls.append(1))
+
+    assert calls == []
+    assert error.value.wait == settings.POLYGON_BREAKER_RESET
+
+
+def test_guard_rate_limit(settings):
+    settings.POLYGON_RATE_LIMIT = 60
+    settings.POLYGON_RATE_BURST = 1
+    settings.POLYGON_RATE_LIMIT_WAIT = 0.1
+
+    guard(lambda: None)
+    with pytest.raises(PolygonUnavailable) as error:
+        guard(lambda: None)
+
+    assert error.value.wait is not None
+    assert 0 < error.value.wait <= 1
+
+
+def test_guard_waits_for_a_token(settings):
+    settings.POLYGON_RATE_LIMIT = 600
+    settings.POLYGON_RATE_BURST = 1
+
+    guard(lambda: None)
+    # A token comes back after 0.1s, within POLYGON_RATE_LIMIT_WAIT
+    assert guard(lambda: True)
+
+
+def test_polygon_metrics(client, db, settings):
+    client.force_login(UserFactory(is_staff=True))
+
+    response = client.get(reverse("api:polygon-metrics"))
+
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()["rate_limit"]["capacity"] == settings.POLYGON_RATE_BURST
+    assert response.json()["circuit_breaker"] == {"state": "closed", "failures": 0}
+
+
+def test_polygon_metrics_requires_admin(client, user):
+    client.force_login(user)
+
+    response = client.get(reverse("api:polygon-metrics"))
+
+    assert response.status_code == HTTPStatus.FORBIDDEN
@@ -0,0 +1,226 @@
+from datetime import UTC
+from datetime import date
+from datetime import datetime
+from io import StringIO
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from webull_backend.exchanges.models import Exchange
+from webull_backend.exchanges.models import ExchangeHoliday
+from webull_backend.polygon.planner import EARLY_CLOSE
+from webull_backend.polygon.planner import MARKET_TIMEZONE
+from webull_backend.polygon.planner import easter
+from webull_backend.polygon.planner import history_ttl
+from webull_backend.polygon.planner import market_calendar
+from webull_backend.polygon.planner import market_early_closes
+from webull_backend.polygon.planner import market_holidays
+from webull_backend.polygon.planner import plan_ranges
+from webull_backend.polygon.planner import ticker_calendar
+from webull_backend.polygon.planner import trading_days
+from webull_backend.polygon.planner import unsettled_days
+from webull_backend.tickers.models import Ticker
+
+
+@pytest.mark.parametrize(
+    ("year", "sunday"),
+    [(2019, date(2019, 4, 21)), (2024, date(2024, 3, 31)), (2025, date(2025, 4, 20))],
+)
+def test_easter(year: int, sunday: date):
+    assert easter(year) == sunday
+
+
+def test_market_holidays():
+    assert sorted(market_holidays(2024)) == [
+        date(2024, 1, 1),
+        date(2024, 1, 15),
+        date(2024, 2, 19),
+        date(2024, 3, 29),
+        date(2024, 5, 27),
+        date(2024, 6, 19),
+        date(2024, 7, 4),
+        date(2024, 9, 2),
+        date(2024, 11, 28),
+        date(2024, 12, 25),
+    ]
+
+
+def test_market_holidays_observed_days():
+    # Saturday Independence Day and Sunday Christmas, no Saturday New Year's Day
+    assert date(2020, 7, 3) in market_holidays(2020)
+    assert date(2022, 12, 26) in market_holidays(2022)
+    assert date(2021, 12, 31) not in market_holidays(2021)
+    assert date(2021, 6, 18) not in market_holidays(2021)
+
+
+def test_market_early_closes():
+    assert sorted(market_early_closes(2024)) == [
+        date(2024, 7, 3),
+        date(2024, 11, 29),
+        date(2024, 12, 24),
+    ]
+    # Independence Day is observed on July 3 in 2020
+    assert date(2020, 7, 3) not in market_early_closes(2020)
+
+
+def test_trading_days_skip_weekends_and_holidays():
+    assert trading_days(date(2024, 7, 3), date(2024, 7, 9)) == [
+        date(2024, 7, 3),
+        date(2024, 7, 5),
+        date(2024, 7, 8),
+        date(2024, 7, 9),
+    ]
+
+
+def test_plan_ranges_nothing_stored():
+    assert plan_ranges([], date(2024, 7, 1), date(2024, 7, 9), date(2024, 8, 1)) == [
+        (date(2024, 7, 1), date(2024, 7, 9)),
+    ]
+
+
+def test_plan_ranges_nothing_missing():
+    stored = trading_days(date(2024, 7, 1), date(2024, 7, 12))
+
+    # Weekends and the holiday are not gaps
+    assert (
+        plan_ranges(stored, date(2024, 6, 29), date(2024, 7, 14), date(2024, 8, 1))
+        == []
+    )
+
+
+def test_plan_ranges_merges_gaps_across_non_trading_days():
+    stored = [date(2024, 7, 1), date(2024, 7, 2), date(2024, 7, 10)]
+
+    assert plan_ranges(
+        stored,
+        date(2024, 7, 1),
+        date(2024, 7, 12),
+        date(2024, 8, 1),
+    ) == [
+        (date(2024, 7, 3), date(2024, 7, 9)),
+        (date(2024, 7, 11), date(2024, 7, 12)),
+    ]
+
+
+def test_plan_ranges_refetches_today_only():
+    today = date(2024, 7, 10)
+    stored = trading_days(date(2024, 7, 1), today)
+
+    assert plan_ranges(stored, date(2024, 7, 1), date(2024, 7, 31), today) == [
+        (today, today),
+    ]
+
+
+def test_plan_ranges_refetches_unsettled_days():
+    today = date(2024, 7, 10)
+    stored = trading_days(date(2024, 7, 1), today)
+    fetched = {
+        # Yesterday's bar was stored mid-session, the day before's after the close
+        date(2024, 7, 9): datetime(2024, 7, 9, 11, tzinfo=MARKET_TIMEZONE),
+        date(2024, 7, 8): datetime(2024, 7, 8, 16, 15, tzinfo=MARKET_TIMEZONE),
+    }
+
+    unsettled = unsettled_days(fetched)
+
+    assert unsettled == {date(2024, 7, 9)}
+    assert plan_ranges(stored, date(2024, 7, 1), today, today, unsettled) == [
+        (date(2024, 7, 9), today),
+    ]
+
+
+def test_unsettled_days_early_close():
+    # July 3 closes at 13:00
+    fetched = {date(2024, 7, 3): datetime(2024, 7, 3, 13, 15, tzinfo=MARKET_TIMEZONE)}
+
+    assert unsettled_days(fetched) == set()
+
+
+def test_plan_ranges_weekend_request():
+    assert plan_ranges([], date(2024, 7, 6), date(2024, 7, 7), date(2024, 8, 1)) == []
+
+
+@pytest.mark.parametrize(
+    ("end", "now", "ttl"),
+    [
+        # Closed sessions only
+        (date(2024, 7, 9), datetime(2024, 7, 10, 12, tzinfo=MARKET_TIMEZONE), 86400),
+        # Weekend and holiday
+        (date(2024, 7, 6), datetime(2024, 7, 6, 12, tzinfo=MARKET_TIMEZONE), 86400),
+        (date(2024, 7, 4), datetime(2024, 7, 4, 12, tzinfo=MARKET_TIMEZONE), 86400),
+        # Before the open, open session, settlement and settled
+        (date(2024, 7, 10), datetime(2024, 7, 10, 9, 29, tzinfo=MARKET_TIMEZONE), 61),
+        (date(2024, 7, 10), datetime(2024, 7, 10, 12, tzinfo=MARKET_TIMEZONE), 60),
+        (date(2024, 7, 10), datetime(2024, 7, 10, 16, 10, tzinfo=MARKET_TIMEZONE), 60),
+        (
+            date(2024, 7, 10),
+            datetime(2024, 7, 10, 16, 15, tzinfo=MARKET_TIMEZONE),
+            86400,
+        ),
+    ],
+)
+def test_history_ttl(end: date, now: datetime, ttl: int, settings):
+    settings.POLYGON_HISTORY_INTRADAY_TTL = 60
+    settings.POLYGON_HISTORY_FINAL_TTL = 86400
+
+    assert history_ttl(end, now) == ttl
+
+
+def test_history_ttl_converts_to_market_time(settings):
+    settings.POLYGON_HISTORY_INTRADAY_TTL = 60
+    now = datetime(2024, 7, 10, 15, tzinfo=UTC)
+
+    # 15:00 UTC is 11:00 in New York
+    assert history_ttl(date(2024, 7, 10), now) == settings.POLYGON_HISTORY_INTRADAY_TTL
+
+
+@pytest.mark.django_db
+def test_load_market_holidays():
+    exchange = Exchange.objects.create(mic="XNYS")
+
+    call_command("load_market_holidays", "XNYS", "--years", "2024", stdout=StringIO())
+    call_command("load_market_holidays", "XNYS", "--years", "2024", stdout=StringIO())
+
+    holidays = dict(exchange.holidays.values_list("date", "early_close"))
+    assert len(holidays) == len(market_holidays(2024)) + 3
+    assert holidays[date(2024, 7, 4)] is None
+    assert holidays[date(2024, 7, 3)] == EARLY_CLOSE
+
+
+def test_load_market_holidays_unknown_exchange(db):
+    with pytest.raises(CommandError, match="does not exist"):
+        call_command("load_market_holidays", "XXXX")
+
+
+@pytest.mark.django_db
+def test_ticker_calendar():
+    exchange = Exchange.objects.create(mic="XNYS")
+    ticker = Ticker.objects.create(exchange=exchange, symbol="AA")
+    day = date(2024, 7, 5)
+
+    # Without holidays loaded, the rules of the US equity markets apply
+    assert ticker_calendar(ticker).days == market_calendar().days
+    assert ticker_calendar(Ticker(symbol="AA")) is market_calendar()
+
+    ExchangeHoliday.objects.create(exchange=exchange, date=day)
+
+    assert not ticker_calendar(ticker).is_trading_day(day)
+
+
+@pytest.mark.django_db
+def test_ticker_calendar_past_holidays():
+    exchange = Exchange.objects.create(mic="XNYS")
+    ticker = Ticker.objects.create(exchange=exchange, symbol="AA")
+    christmas = date(2025, 12, 25)
+    # Only the holidays of the coming years are loaded
+    call_command("load_market_holidays", "XNYS", "--years", "2026", stdout=StringIO())
+
+    calendar = ticker_calendar(ticker)
+    eve = calendar.session(date(2025, 12, 24))
+
+    assert not calendar.is_trading_day(christmas)
+    assert eve is not None
+    assert eve.closes.time() == EARLY_CLOSE
+    assert not calendar.is_trading_day(date(2026, 12, 25))
+    today = date(2026, 1, 5)
+    assert plan_ranges([], christmas, christmas, today, calendar=calendar) == []
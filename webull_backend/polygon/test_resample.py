@@ -0,0 +1,125 @@
+from datetime import date
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from webull_backend.polygon.history import session_start
+from webull_backend.polygon.planner import MARKET_TIMEZONE
+from webull_backend.polygon.resample import Interval
+from webull_backend.polygon.resample import resample
+from webull_backend.polygon.resample import resample_history
+from webull_backend.polygon.series import BarSeries
+
+# Volume of each bar of the test series
+VOLUME = 10.0
+
+
+def make_series(timestamps: list[datetime], *, vwap: bool = True) -> BarSeries:
+    size = len(timestamps)
+    prices = np.arange(1, size + 1, dtype=np.float64)
+    columns = {
+        "timestamp": np.array([int(t.timestamp() * 1000) for t in timestamps]),
+        "open": prices,
+        "high": prices + 1,
+        "low": prices - 0.5,
+        "close": prices + 0.5,
+        "volume": np.full(size, VOLUME),
+        "transactions": np.full(size, 2.0),
+    }
+    if vwap:
+        columns["vwap"] = prices
+    return BarSeries(columns)
+
+
+def daily(*days: int, month: int = 7) -> list[datetime]:
+    return [session_start(date(2024, month, day)) for day in days]
+
+
+def minutes(*times: tuple[int, int]) -> list[datetime]:
+    return [datetime(2024, 7, 2, h, m, tzinfo=MARKET_TIMEZONE) for h, m in times]
+
+
+@pytest.mark.parametrize(
+    ("text", "interval", "base"),
+    [
+        ("1day", Interval(1, "day"), "day"),
+        ("4hour", Interval(4, "hour"), "minute"),
+        ("2week", Interval(2, "week"), "day"),
+        ("15minute", Interval(15, "minute"), "minute"),
+    ],
+)
+def test_parse_interval(text: str, interval: Interval, base: str):
+    assert Interval.parse(text) == interval
+    assert interval.base == base
+    assert str(interval) == text
+
+
+@pytest.mark.parametrize("text", ["", "0day", "1days", "week", "1 week", "12345day"])
+def test_parse_invalid_interval(text: str):
+    with pytest.raises(ValueError, match="Invalid interval"):
+        Interval.parse(text)
+
+
+def test_resample_weeks():
+    # Two weeks, Independence Day has no bar
+    series = make_series(daily(1, 2, 3, 5, 8, 9, 10, 11, 12))
+
+    weeks = resample(series, Interval.parse("1week"))
+
+    assert weeks.timestamp.tolist() == [series.timestamp[0], series.timestamp[4]]
+    assert weeks.open.tolist() == [1.0, 5.0]
+    assert weeks.high.tolist() == [5.0, 10.0]
+    assert weeks.low.tolist() == [0.5, 4.5]
+    assert weeks.close.tolist() == [4.5, 9.5]
+    assert weeks.volume.tolist() == [40.0, 50.0]
+    assert weeks.vwap.tolist() == [2.5, 7.0]
+    assert weeks.transactions.tolist() == [8.0, 10.0]
+
+
+def test_resample_months():
+    series = make_series(daily(27, 28, month=6) + daily(1, 2))
+
+    months = resample(series, Interval.parse("1month"))
+
+    assert months.open.tolist() == [1.0, 3.0]
+    assert months.close.tolist() == [2.5, 4.5]
+
+
+def test_resample_trading_days():
+    series = make_series(daily(2, 3, 5, 8))
+
+    days = resample(series, Interval.parse("2day"))
+
+    # Buckets hold two sessions; the holiday is not one of them
+    assert days.volume.sum() == len(series) * VOLUME
+    assert days.volume.max() == 2 * VOLUME
+    assert days.close[-1] == series.close[-1]
+
+
+def test_resample_hours_align_to_the_open():
+    series = make_series(minutes((8, 0), (9, 30), (13, 29), (13, 30), (15, 59)))
+
+    hours = resample(series, Interval.parse("4hour"))
+
+    # Pre-market, then 9:30 to 13:30 and 13:30 to the close
+    assert hours.open.tolist() == [1.0, 2.0, 4.0]
+    assert hours.close.tolist() == [1.5, 3.5, 5.5]
+
+
+def test_resample_without_vwap():
+    series = make_series(daily(1, 2), vwap=False)
+
+    weeks = resample(series, Interval.parse("1week"))
+
+    assert np.isnan(weeks.vwap).all()
+    assert "vw" not in weeks.to_results()[0]
+
+
+def test_resample_base_interval_is_unchanged():
+    series = make_series(daily(1, 2))
+    history = series.to_history("AA")
+
+    assert resample(series, Interval.parse("1day")) is series
+    assert resample_history(history, Interval.parse("1day")) is history
+    assert len(resample(BarSeries.empty(), Interval.parse("1week"))) == 0
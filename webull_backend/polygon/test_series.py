@@ -0,0 +1,115 @@
+from datetime import UTC
+from datetime import datetime
+
+import numpy as np
+import pytest
+
+from webull_backend.polygon.models import Bar
+from webull_backend.polygon.series import BarSeries
+from webull_backend.tickers.models import Ticker
+
+RESULTS = [
+    {"t": 1717387200000, "o": 1.0, "h": 2.0, "l": 0.5, "c": 1.5, "v": 100.0},
+    {
+        "t": 1717473600000,
+        "o": 1.5,
+        "h": 2.5,
+        "l": 1.0,
+        "c": 2.0,
+        "v": 200.0,
+        "vw": 1.8,
+        "n": 12,
+    },
+    {"t": 1717560000000, "o": 2.0, "h": 3.0, "l": 1.5, "c": 2.5, "v": 300.0},
+]
+
+
+@pytest.fixture
+def series() -> BarSeries:
+    return BarSeries.from_results(RESULTS)
+
+
+def test_from_results(series: BarSeries):
+    assert len(series) == len(RESULTS)
+    assert series.timestamp.dtype == np.int64
+    assert series.close.tolist() == [1.5, 2.0, 2.5]
+    assert np.isnan(series.vwap[0])
+    assert series.transactions[1] == RESULTS[1]["n"]
+
+
+def test_to_results_round_trip(series: BarSeries):
+    assert series.to_results() == RESULTS
+    assert series.to_history("AA") == {
+        "ticker": "AA",
+        "resultsCount": 3,
+        "results": RESULTS,
+    }
+
+
+def test_from_rows(series: BarSeries):
+    rows = [
+        (
+            datetime.fromtimestamp(result["t"] / 1000, UTC),
+            result["o"],
+            result["h"],
+            result["l"],
+            result["c"],
+            result["v"],
+            result.get("vw"),
+            result.get("n"),
+        )
+        for result in RESULTS
+    ]
+
+    assert BarSeries.from_rows(rows) == series
+    assert BarSeries.from_rows(rows).timestamp.dtype == np.int64
+    assert len(BarSeries.from_rows([])) == 0
+
+
+def test_slices_are_views(series: BarSeries):
+    window = series[1:]
+
+    assert np.shares_memory(window.close, series.close)
+    assert window.close.tolist() == [2.0, 2.5]
+
+
+def test_masks_are_copies(series: BarSeries):
+    rising = series[series.close > series.open]
+
+    assert not np.shares_memory(rising.close, series.close)
+    assert len(rising) == len(series)
+
+
+def test_between(series: BarSeries):
+    window = series.between(
+        datetime(2024, 6, 4, tzinfo=UTC),
+        datetime(2024, 6, 5, 4, tzinfo=UTC),
+    )
+
+    assert window.timestamp.tolist() == [1717473600000]
+    assert np.shares_memory(window.timestamp, series.timestamp)
+
+
+def test_columns_must_have_the_same_length():
+    with pytest.raises(ValueError, match="close"):
+        BarSeries(
+            {
+                "timestamp": [1, 2],
+                "open": [1, 2],
+                "high": [1, 2],
+                "low": [1, 2],
+                "close": [1],
+                "volume": [1, 2],
+            },
+        )
+
+
+def test_to_bars(series: BarSeries):
+    ticker = Ticker(symbol="AA")
+
+    bars = series.to_bars(ticker, Bar.TIMESPAN.day)
+
+    assert [bar.close for bar in bars] == [1.5, 2.0, 2.5]
+    assert bars[0].vwap is None
+    assert bars[1].transactions == RESULTS[1]["n"]
+    assert bars[0].timestamp == datetime(2024, 6, 3, 4, tzinfo=UTC)
@@ -1,5 +1,7 @@
 from django.contrib import admin
 
+from .models import IngestionCheckpoint
 from .models import Ticker
 
 admin.site.register(Ticker)
+admin.site.register(IngestionCheckpoint)
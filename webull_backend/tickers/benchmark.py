@@ -0,0 +1,277 @@
+"""
+Module for benchmarking the ticker ingestion paths.
+
+Each benchmark case loads a synthetic listing through `ingest_file` in a forked
+process, so its peak RSS is measured in isolation, and records the throughput, the
+peak RSS and the number of SQL statements issued. Results are compared with a JSON
+baseline to catch regressions in the ingestion hot path.
+
+Every case commits like a real load: the per-batch transactions of `ingest_file`
+commit, and the cache invalidations they schedule with `transaction.on_commit` run
+after each of them instead of piling up until the end of the case. The synthetic
+exchange and its tickers are deleted once the case is measured, and any left over
+by an interrupted run are deleted before the next one.
+"""
+
+import json
+import multiprocessing
+import resource
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict
+from dataclasses import dataclass
+from pathlib import Path
+
+from django.db import connection
+from django.db import connections
+from django.db import transaction
+from django.test.utils import override_settings
+
+from webull_backend.exchanges.models import Exchange
+from webull_backend.tickers.ingest import DEFAULT_BATCH_SIZE
+from webull_backend.tickers.ingest import ingest_file
+
+# MIC of the exchange the benchmark loads into; it is deleted after each case
+BENCHMARK_MIC = "XBENCH"
+
+# Load modes: an "insert" load starts from an empty exchange, a "resync" load
+# re-reads a file whose rows are all already stored
+LOADS = ("insert", "resync")
+
+# Version of the baseline file layout
+BASELINE_VERSION = 1
+
+# Deletes the tickers of the benchmark exchange without loading them into memory;
+# nothing else references synthetic tickers
+DELETE_TICKERS_SQL = "DELETE FROM tickers_ticker WHERE exchange_id = %s"
+
+
+@dataclass
+class BenchmarkResult:
+    """
+    The measurements of a single benchmark case.
+    """
+
+    case: str
+    rows: int
+    seconds: float
+    rows_per_second: float
+    peak_rss_mb: float
+    queries: int
+
+
+class QueryCounter:
+    """
+    Database execute wrapper counting the statements sent to the database.
+    """
+
+    def __init__(self):
+        """
+        Initializes the counter.
+        """
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        """
+        Counts a statement and executes it.
+        """
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def parse_scale(value: str) -> int:
+    """
+    Parses a row count such as `10000`, `10k`, `1m` or `10M`.
+
+    Args:
+        value (str): The row count, with an optional `k` or `m` suffix.
+
+    Returns:
+        int: The number of rows.
+
+    Raises:
+        ValueError: If the value is not a positive row count.
+    """
+    multipliers = {"k": 1_000, "m": 1_000_000}
+    value = value.strip().lower()
+    multiplier = multipliers.get(value[-1:], 1)
+    rows = int(value.rstrip("km")) * multiplier
+    if rows < 1:
+        msg = f"Invalid scale {value!r}"
+        raise ValueError(msg)
+    return rows
+
+
+def peak_rss_mb() -> float:
+    """
+    Returns the peak resident set size of the current process in megabytes.
+    """
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    divisor = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return peak / divisor
+
+
+def drop_benchmark_exchange() -> None:
+    """
+    Deletes the benchmark exchange and its tickers, if they exist.
+    """
+    for exchange in Exchange.objects.filter(mic=BENCHMARK_MIC):
+        with transaction.atomic(), connection.cursor() as cursor:
+            cursor.execute(DELETE_TICKERS_SQL, [exchange.pk])
+            exchange.delete()
+
+
+def run_case(
+    case: str,
+    path: Path,
+    load: str,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    *,
+    use_copy: bool = False,
+) -> BenchmarkResult:
+    """
+    Loads a listing into the benchmark exchange and measures the load.
+
+    An "insert" case starts from an empty exchange; a "resync" case loads the file
+    once unmeasured and then measures a second load of the same rows. Everything
+    the case writes is deleted once it is measured.
+
+    Args:
+        case (str): The name of the case.
+        path (Path): The listing file to load.
+        load (str): One of `LOADS`.
+        batch_size (int): The number of rows written per batch.
+        use_copy (bool): Whether to load through `copy_tickers`.
+
+    Returns:
+        BenchmarkResult: The measurements.
+    """
+    # With DEBUG on, Django keeps the text of every statement in memory, which
+    # would dominate the peak RSS and slow the load down
+    with override_settings(DEBUG=False):
+        drop_benchmark_exchange()
+        exchange = Exchange.objects.create(mic=BENCHMARK_MIC)
+        try:
+            if load == "resync":
+                ingest_file(exchange, path, batch_size, use_copy=use_copy)
+
+            counter = QueryCounter()
+            started = time.perf_counter()
+            with connection.execute_wrapper(counter):
+                stats = ingest_file(
+                    exchange,
+                    path,
+                    batch_size,
+                    use_copy=use_copy,
+                    restart=True,
+                )
+            seconds = time.perf_counter() - started
+            # Measured before the cleanup, which is not part of the load
+            peak = peak_rss_mb()
+        finally:
+            drop_benchmark_exchange()
+
+    return BenchmarkResult(
+        case=case,
+        rows=stats.rows,
+        seconds=round(seconds, 3),
+        rows_per_second=round(stats.rows / seconds if seconds else 0.0, 1),
+        peak_rss_mb=round(peak, 1),
+        queries=counter.count,
+    )
+
+
+def run_isolated(*args, **kwargs) -> BenchmarkResult:
+    """
+    Runs `run_case` in a forked process with its own database connection.
+
+    Args:
+        args: The positional arguments of `run_case`.
+        kwargs: The keyword arguments of `run_case`.
+
+    Returns:
+        BenchmarkResult: The measurements taken in the child process.
+    """
+    connections.close_all()
+    with ProcessPoolExecutor(
+        max_workers=1,
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=connections.close_all,
+    ) as executor:
+        return executor.submit(run_case, *args, **kwargs).result()
+
+
+def load_baseline(path: Path) -> dict[str, dict]:
+    """
+    Reads the results stored in a baseline file, keyed by case.
+
+    Args:
+        path (Path): The baseline file.
+
+    Returns:
+        dict[str, dict]: The stored results, or an empty dict if the file does not
+            exist.
+    """
+    if not path.exists():
+        return {}
+    return json.loads(path.read_text())["results"]
+
+
+def save_baseline(path: Path, results: list[BenchmarkResult]) -> None:
+    """
+    Writes benchmark results to a baseline file.
+
+    Args:
+        path (Path): The baseline file.
+        results (list[BenchmarkResult]): The results to store.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    baseline = {
+        "version": BASELINE_VERSION,
+        "results": {result.case: asdict(result) for result in results},
+    }
+    path.write_text(json.dumps(baseline, indent=2, sort_keys=True) + "\n")
+
+
+def compare(
+    result: BenchmarkResult,
+    baseline: dict | None,
+    tolerance: float,
+) -> list[str]:
+    """
+    Compares a result with its baseline.
+
+    Throughput may drop and peak RSS may grow by up to `tolerance` (a fraction);
+    the number of queries must not grow at all, since it does not depend on the
+    machine.
+
+    Args:
+        result (BenchmarkResult): The new measurements.
+        baseline (dict | None): The stored measurements of the same case.
+        tolerance (float): The allowed relative regression.
+
+    Returns:
+        list[str]: A description of each regression, empty if there is none.
+    """
+    if baseline is None:
+        return []
+
+    regressions = []
+    if result.rows_per_second < baseline["rows_per_second"] * (1 - tolerance):
+        regressions.append(
+            f"{result.case}: {result.rows_per_second:.0f} rows/s, baseline "
+            f"{baseline['rows_per_second']:.0f} rows/s",
+        )
+    if result.peak_rss_mb > baseline["peak_rss_mb"] * (1 + tolerance):
+        regressions.append(
+            f"{result.case}: peak RSS {result.peak_rss_mb:.1f} MB, baseline "
+            f"{baseline['peak_rss_mb']:.1f} MB",
+        )
+    if result.queries > baseline["queries"]:
+        regressions.append(
+            f"{result.case}: {result.queries} queries, baseline "
+            f"{baseline['queries']}",
+        )
+    return regressions
@@ -0,0 +1,811 @@
+"""
+Module for streaming ticker rows from CSV sources into the database.
+
+The helpers in this module read a source file lazily, group the parsed rows into
+fixed-size batches and upsert every batch with a single statement inside its own
+transaction, so loading a listing file costs one round trip per batch instead of
+two per row, and re-running a load leaves the table the same size.
+
+For very large files `copy_tickers` streams the rows through PostgreSQL's
+`COPY FROM STDIN` into a temporary staging table and merges it into
+`tickers_ticker` with one set-based statement.
+
+Source files may be plain, gzip, bzip2, xz or zstd compressed CSV, or `-` for
+standard input; they are decompressed as a stream, so memory use does not depend on
+the file size.
+
+`run_ingestion` loads several exchanges at once, one worker process (and so one
+database connection) per exchange. Every committed batch also records an
+`IngestionCheckpoint`, so a load that dies halfway resumes where it stopped.
+"""
+
+import bz2
+import csv
+import glob
+import gzip
+import hashlib
+import io
+import logging
+import lzma
+import multiprocessing
+import os
+import sys
+import time
+import uuid
+from collections.abc import Iterable
+from collections.abc import Iterator
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures import as_completed
+from contextlib import contextmanager
+from dataclasses import dataclass
+from dataclasses import field
+from datetime import timedelta
+from itertools import batched
+from itertools import islice
+from pathlib import Path
+from typing import BinaryIO
+from typing import TextIO
+from typing import cast
+
+import zstandard
+from django.db import connection
+from django.db import connections
+from django.db import transaction
+from django.utils import timezone
+
+from webull_backend.exchanges.models import Exchange
+from webull_backend.tickers.models import IngestionCheckpoint
+from webull_backend.tickers.models import Ticker
+from webull_backend.tickers.signals import tickers_written
+
+logger = logging.getLogger(__name__)
+
+# Number of rows written per bulk statement (and per transaction)
+DEFAULT_BATCH_SIZE = 1000
+
+# Most symbols a COPY load sends with `tickers_written`; larger loads report that
+# any ticker of the exchange may have changed, instead of holding every symbol and
+# matching them all against the companies
+MAX_WRITTEN_SYMBOLS = 10_000
+
+# Minimum number of seconds between two progress log lines
+PROGRESS_INTERVAL = 5.0
+
+# Size of the blocks read when hashing or decompressing a source file
+HASH_CHUNK_SIZE = 1024 * 1024
+
+# Source path that reads the listing from standard input
+STDIN = "-"
+
+# Leading bytes identifying compressed source files
+GZIP_MAGIC = b"\x1f\x8b"
+BZIP2_MAGIC = (b"BZh", b"1AY&SY")  # Around the block size digit
+XZ_MAGIC = b"\xfd7zXZ\x00"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+
+# Inserts new (exchange, symbol) pairs and only rewrites existing rows whose
+# company name or status actually changed, reporting the symbols of the rows
+# written and whether they were inserted
+UPSERT_SQL = """
+INSERT INTO tickers_ticker
+    (uuid, exchange_id, company_name, symbol, status, created_at, updated_at)
+VALUES {values}
+ON CONFLICT (exchange_id, symbol) DO UPDATE SET
+    company_name = EXCLUDED.company_name,
+    status = EXCLUDED.status,
+    updated_at = EXCLUDED.updated_at
+WHERE (tickers_ticker.company_name, tickers_ticker.status)
+    IS DISTINCT FROM (EXCLUDED.company_name, EXCLUDED.status)
+RETURNING symbol, (xmax = 0) AS inserted
+"""
+
+# Staging table filled by COPY; dropped after the merge, or when the load commits
+# or rolls back at the latest
+STAGING_TABLE_SQL = """
+CREATE TEMPORARY TABLE tickers_ticker_staging (
+    position bigint NOT NULL,
+    uuid uuid NOT NULL,
+    company_name varchar(50) NOT NULL,
+    symbol varchar(50) NOT NULL
+) ON COMMIT DROP
+"""
+
+DROP_STAGING_TABLE_SQL = "DROP TABLE tickers_ticker_staging"
+
+COPY_SQL = """
+COPY tickers_ticker_staging (position, uuid, company_name, symbol) FROM STDIN
+"""
+
+# Same conflict handling as UPSERT_SQL, reading from the staging table; the last
+# row of the file wins when a symbol is repeated. Reports the number of inserted
+# and updated rows, and the symbols of both, or NULL past `max_symbols`
+MERGE_SQL = """
+WITH merged AS (
+    INSERT INTO tickers_ticker
+        (uuid, exchange_id, company_name, symbol, status, created_at, updated_at)
+    SELECT DISTINCT ON (symbol)
+        uuid, %(exchange)s, company_name, symbol, %(status)s, %(now)s, %(now)s
+    FROM tickers_ticker_staging
+    ORDER BY symbol, position DESC
+    ON CONFLICT (exchange_id, symbol) DO UPDATE SET
+        company_name = EXCLUDED.company_name,
+        status = EXCLUDED.status,
+        updated_at = EXCLUDED.updated_at
+    WHERE (tickers_ticker.company_name, tickers_ticker.status)
+        IS DISTINCT FROM (EXCLUDED.company_name, EXCLUDED.status)
+    RETURNING symbol, (xmax = 0) AS inserted
+)
+SELECT
+    count(*) FILTER (WHERE inserted),
+    count(*) FILTER (WHERE NOT inserted),
+    CASE WHEN count(*) <= %(max_symbols)s THEN coalesce(array_agg(symbol), '{}') END
+FROM merged
+"""
+
+
+@dataclass
+class IngestStats:
+    """
+    Counters collected while loading a single source into the database.
+    """
+
+    exchange: str
+    rows: int = 0
+    batches: int = 0
+    inserted: int = 0
+    updated: int = 0
+    skipped: int = 0
+    elapsed: float = 0.0
+    sources: list[str] = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        """
+        Returns the ingestion throughput in rows per second.
+        """
+        if not self.elapsed:
+            return 0.0
+        return self.rows / self.elapsed
+
+    @property
+    def unchanged(self) -> int:
+        """
+        Returns the number of rows that already matched the database.
+        """
+        return self.rows - self.inserted - self.updated
+
+    def add(self, other: "IngestStats") -> None:
+        """
+        Accumulates the counters of another load into this one.
+
+        Args:
+            other (IngestStats): The stats of a load for the same exchange.
+        """
+        self.rows += other.rows
+        self.batches += other.batches
+        self.inserted += other.inserted
+        self.updated += other.updated
+        self.skipped += other.skipped
+        self.elapsed += other.elapsed
+        self.sources += other.sources
+
+
+class Progress:
+    """
+    Logs the rows done, throughput and ETA of a load at most once every
+    `interval` seconds.
+
+    The ETA is derived from how far the load got through the underlying byte
+    stream, so it needs the stream and its total size.
+    """
+
+    def __init__(
+        self,
+        label: str,
+        stream: BinaryIO | None = None,
+        total_bytes: int | None = None,
+        interval: float = PROGRESS_INTERVAL,
+    ):
+        """
+        Initializes the progress of a load.
+
+        Args:
+            label (str): The prefix of every log line.
+            stream (BinaryIO | None): The byte stream the rows are read from.
+            total_bytes (int | None): The total size of `stream`, when known.
+            interval (float): The minimum number of seconds between two lines.
+        """
+        self.label = label
+        self.stream = stream
+        self.total_bytes = total_bytes
+        self.interval = interval
+        self.started = time.perf_counter()
+        self.reported = self.started
+        self.start_position = self.position()
+
+    def position(self) -> int:
+        """
+        Returns how many bytes of the stream have been consumed.
+        """
+        if self.stream is None:
+            return 0
+        return self.stream.tell()
+
+    def update(self, rows: int, *, force: bool = False) -> None:
+        """
+        Logs a progress line unless one was logged less than `interval` ago.
+
+        Args:
+            rows (int): The number of rows done so far.
+            force (bool): Whether to log regardless of the interval.
+        """
+        now = time.perf_counter()
+        if not force and now - self.reported < self.interval:
+            return
+        self.reported = now
+
+        elapsed = now - self.started
+        rate = rows / elapsed if elapsed else 0.0
+        message = f"{self.label}: {rows} rows done, {rate:.0f} rows/s"
+
+        if self.total_bytes:
+            position = self.position()
+            consumed = position - self.start_position
+            message += f", {position / self.total_bytes:.0%}"
+            if consumed > 0:
+                remaining = (self.total_bytes - position) * elapsed / consumed
+                message += f", ETA {timedelta(seconds=round(remaining))}"
+
+        logger.info(message)
+
+
+def read_rows(csv_file: TextIO) -> Iterator[tuple[str, str]]:
+    """
+    Lazily parses `(company_name, symbol)` pairs from a listing CSV file.
+
+    Rows without a symbol are skipped; both values are truncated to the length of
+    the corresponding `Ticker` fields.
+
+    Args:
+        csv_file (TextIO): An open text stream positioned at the first row.
+
+    Yields:
+        tuple[str, str]: The company name and symbol of each row.
+    """
+    for row in csv.reader(csv_file, delimiter=","):
+        # Skip blank lines and rows without a symbol column
+        if len(row) < 2:  # noqa: PLR2004
+            continue
+
+        symbol = row[1].strip()[:50]
+        if not symbol:
+            continue
+
+        yield row[0][:50], symbol
+
+
+@dataclass
+class Source:
+    """
+    An open listing file.
+
+    Attributes:
+        text: The decompressed and decoded contents.
+        raw: The compressed byte stream, or None when reading standard input.
+        size: The size of `raw` in bytes, or None when reading standard input.
+    """
+
+    text: TextIO
+    raw: io.BufferedReader | None
+    size: int | None
+
+
+def is_stdin(path: Path) -> bool:
+    """
+    Returns whether a source path designates standard input.
+    """
+    return str(path) == STDIN
+
+
+def decompress(raw: io.BufferedReader) -> BinaryIO:
+    """
+    Wraps a byte stream in the decompressor matching its leading bytes.
+
+    Args:
+        raw (io.BufferedReader): The byte stream, positioned at its start.
+
+    Returns:
+        BinaryIO: A stream of decompressed bytes, or `raw` itself when the data is
+            not compressed.
+    """
+    magic = raw.peek(10)[:10]
+    stream: io.BufferedIOBase | zstandard.ZstdDecompressionReader
+    if magic.startswith(GZIP_MAGIC):
+        stream = gzip.GzipFile(fileobj=raw, mode="rb")
+    elif magic.startswith(BZIP2_MAGIC[0]) and magic[4:10] == BZIP2_MAGIC[1]:
+        stream = bz2.BZ2File(raw)
+    elif magic.startswith(XZ_MAGIC):
+        stream = lzma.LZMAFile(raw)
+    elif magic.startswith(ZSTD_MAGIC):
+        stream = zstandard.ZstdDecompressor().stream_reader(
+            raw,
+            read_size=HASH_CHUNK_SIZE,
+            closefd=False,
+        )
+    else:
+        return raw
+    # The decompressors are binary file objects, but the stubs do not declare
+    # them as BinaryIO
+    return cast("BinaryIO", stream)
+
+
+@contextmanager
+def open_source(path: Path) -> Iterator[Source]:
+    """
+    Opens a listing file for streaming, decompressing it if needed.
+
+    Args:
+        path (Path): The file to open, or `-` for standard input.
+
+    Yields:
+        Source: The open file.
+    """
+    if is_stdin(path):
+        # Binary standard input is a BufferedReader, which `decompress` peeks into
+        raw, size = cast("io.BufferedReader", sys.stdin.buffer), None
+    else:
+        raw = path.open("rb")
+        size = os.fstat(raw.fileno()).st_size
+
+    stream = decompress(raw)
+    text = io.TextIOWrapper(stream, encoding="utf-8", newline="")
+    try:
+        yield Source(text=text, raw=None if size is None else raw, size=size)
+    finally:
+        # Standard input is left open for the rest of the process
+        text.detach()
+        if stream is not raw:
+            stream.close()
+        if size is not None:
+            raw.close()
+
+
+def generate_uuids(count: int) -> list[uuid.UUID]:
+    """
+    Generates `count` random version 4 UUIDs from a single read of the OS entropy
+    pool.
+
+    Args:
+        count (int): The number of UUIDs to generate.
+
+    Returns:
+        list[uuid.UUID]: The generated UUIDs.
+    """
+    data = os.urandom(16 * count)
+    return [
+        uuid.UUID(bytes=data[offset : offset + 16], version=4)
+        for offset in range(0, len(data), 16)
+    ]
+
+
+def upsert_tickers(
+    exchange: Exchange,
+    rows: Iterable[tuple[str, str]],
+) -> tuple[int, int]:
+    """
+    Inserts or updates the given rows with a single `INSERT ... ON CONFLICT`.
+
+    Rows are keyed on `(exchange, symbol)`; when a symbol appears several times the
+    last row wins. Existing rows are only rewritten when their company name or
+    status differs, so unchanged tickers keep their `updated_at`, and only the
+    written symbols are sent with `tickers_written`.
+
+    Args:
+        exchange (Exchange): The exchange every ticker belongs to.
+        rows (Iterable[tuple[str, str]]): The `(company_name, symbol)` pairs.
+
+    Returns:
+        tuple[int, int]: The number of inserted and updated rows.
+    """
+    # Postgres refuses to update the same row twice in one statement
+    company_names = {symbol: company_name for company_name, symbol in rows}
+    if not company_names:
+        return 0, 0
+
+    now = timezone.now()
+    uuids = generate_uuids(len(company_names))
+    params: list = []
+    for ticker_uuid, (symbol, company_name) in zip(
+        uuids,
+        company_names.items(),
+        strict=True,
+    ):
+        params += [
+            ticker_uuid,
+            exchange.pk,
+            company_name,
+            symbol,
+            Ticker.STATUS.active,
+            now,
+            now,
+        ]
+
+    values = ", ".join(["(%s, %s, %s, %s, %s, %s, %s)"] * len(company_names))
+    with connection.cursor() as cursor:
+        cursor.execute(UPSERT_SQL.format(values=values), params)
+        results = cursor.fetchall()
+
+    if results:
+        tickers_written.send(
+            sender=Ticker,
+            exchange=exchange,
+            symbols=[symbol for symbol, _ in results],
+        )
+    inserted = sum(inserted for _, inserted in results)
+    return inserted, len(results) - inserted
+
+
+def load_tickers(
+    exchange: Exchange,
+    rows: Iterable[tuple[str, str]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    *,
+    checkpoint: IngestionCheckpoint | None = None,
+    progress: Progress | None = None,
+) -> IngestStats:
+    """
+    Upserts ticker rows for an exchange in batches of `batch_size`.
+
+    Each batch is written with one `INSERT ... ON CONFLICT` statement inside its own
+    transaction, so a failure only rolls back the batch that was being written.
+    The checkpoint, if any, is advanced in the same transaction as each batch.
+
+    Args:
+        exchange (Exchange): The exchange every ticker belongs to.
+        rows (Iterable[tuple[str, str]]): The `(company_name, symbol)` pairs.
+        batch_size (int): The number of rows written per batch.
+        checkpoint (IngestionCheckpoint | None): The checkpoint to advance.
+        progress (Progress | None): The progress to update after each batch.
+
+    Returns:
+        IngestStats: The number of rows read, inserted and updated, the number of
+            batches and the elapsed time.
+    """
+    stats = IngestStats(exchange=exchange.mic)
+    started = time.perf_counter()
+
+    for batch in batched(rows, batch_size):
+        with transaction.atomic():
+            inserted, updated = upsert_tickers(exchange, batch)
+
+            if checkpoint is not None:
+                checkpoint.rows += len(batch)
+                checkpoint.save(update_fields=["rows", "updated_at"])
+
+        stats.inserted += inserted
+        stats.updated += updated
+
+        stats.rows += len(batch)
+        stats.batches += 1
+
+        if progress is not None:
+            progress.update(stats.rows)
+
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+def copy_tickers(
+    exchange: Exchange,
+    rows: Iterable[tuple[str, str]],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    *,
+    checkpoint: IngestionCheckpoint | None = None,
+    progress: Progress | None = None,
+) -> IngestStats:
+    """
+    Loads ticker rows for an exchange through `COPY FROM STDIN`.
+
+    The rows are streamed into a temporary staging table, `batch_size` rows per
+    chunk, and merged into `tickers_ticker` with a single `INSERT ... SELECT ...
+    ON CONFLICT` statement. The whole load runs in one transaction, so the
+    checkpoint, if any, only advances once the merge is committed. Requires
+    PostgreSQL and psycopg 3.
+
+    Args:
+        exchange (Exchange): The exchange every ticker belongs to.
+        rows (Iterable[tuple[str, str]]): The `(company_name, symbol)` pairs.
+        batch_size (int): The number of rows generated and copied per chunk.
+        checkpoint (IngestionCheckpoint | None): The checkpoint to advance.
+        progress (Progress | None): The progress to update after each chunk.
+
+    Returns:
+        IngestStats: The number of rows read, inserted and updated, the number of
+            chunks copied and the elapsed time.
+    """
+    stats = IngestStats(exchange=exchange.mic)
+    started = time.perf_counter()
+
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(STAGING_TABLE_SQL)
+
+        with cursor.copy(COPY_SQL) as copy:
+            for batch in batched(rows, batch_size):
+                uuids = generate_uuids(len(batch))
+                for position, (ticker_uuid, (company_name, symbol)) in enumerate(
+                    zip(uuids, batch, strict=True),
+                    start=stats.rows,
+                ):
+                    copy.write_row((position, ticker_uuid, company_name, symbol))
+
+                stats.rows += len(batch)
+                stats.batches += 1
+
+                if progress is not None:
+                    progress.update(stats.rows)
+
+        cursor.execute(
+            MERGE_SQL,
+            {
+                "exchange": exchange.pk,
+                "status": Ticker.STATUS.active,
+                "now": timezone.now(),
+                "max_symbols": MAX_WRITTEN_SYMBOLS,
+            },
+        )
+        stats.inserted, stats.updated, symbols = cursor.fetchone()
+        cursor.execute(DROP_STAGING_TABLE_SQL)
+        if stats.inserted or stats.updated:
+            tickers_written.send(sender=Ticker, exchange=exchange, symbols=symbols)
+
+        if checkpoint is not None:
+            checkpoint.rows += stats.rows
+            checkpoint.save(update_fields=["rows", "updated_at"])
+
+    stats.elapsed = time.perf_counter() - started
+    return stats
+
+
+def resolve_sources(pattern: str) -> list[Path]:
+    """
+    Expands a source path or glob pattern into the listing files it matches.
+
+    Args:
+        pattern (str): A file path or a glob pattern such as `/data/nyse-*.csv`.
+
+    Returns:
+        list[Path]: The matching files, sorted by name.
+
+    Raises:
+        FileNotFoundError: If the pattern does not match any file.
+    """
+    if pattern == STDIN:
+        return [Path(STDIN)]
+
+    paths = sorted(Path(path) for path in glob.glob(pattern))  # noqa: PTH207
+    if not paths:
+        msg = f"No source file matches {pattern!r}"
+        raise FileNotFoundError(msg)
+    return paths
+
+
+def hash_file(path: Path) -> str:
+    """
+    Returns the hex-encoded SHA-256 digest of a file's contents.
+
+    Args:
+        path (Path): The file to hash.
+
+    Returns:
+        str: The digest, 64 hexadecimal characters.
+    """
+    digest = hashlib.sha256()
+    with path.open("rb") as source:
+        while chunk := source.read(HASH_CHUNK_SIZE):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def get_checkpoint(
+    exchange: Exchange,
+    path: Path,
+    *,
+    restart: bool = False,
+) -> IngestionCheckpoint:
+    """
+    Returns the checkpoint of a source file, creating it on the first load.
+
+    Checkpoints are keyed on the file contents, so a file that changed since the
+    last load starts from the first row again.
+
+    Args:
+        exchange (Exchange): The exchange the file is loaded into.
+        path (Path): The source file.
+        restart (bool): Whether to reset the checkpoint to the first row.
+
+    Returns:
+        IngestionCheckpoint: The checkpoint to resume from.
+    """
+    checkpoint, _ = IngestionCheckpoint.objects.get_or_create(
+        exchange=exchange,
+        source_hash=hash_file(path),
+        defaults={"source": str(path)},
+    )
+    if restart or checkpoint.source != str(path):
+        checkpoint.source = str(path)
+        if restart:
+            checkpoint.rows = 0
+            checkpoint.completed = False
+        checkpoint.save()
+    return checkpoint
+
+
+def ingest_file(
+    exchange: Exchange,
+    path: Path,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    *,
+    use_copy: bool = False,
+    restart: bool = False,
+) -> IngestStats:
+    """
+    Loads a single source file, resuming after its last committed batch.
+
+    Args:
+        exchange (Exchange): The exchange the file is loaded into.
+        path (Path): The source file, or `-` for standard input.
+        batch_size (int): The number of rows written per batch.
+        use_copy (bool): Whether to load through `copy_tickers`.
+        restart (bool): Whether to ignore the checkpoint and start from scratch.
+
+    Returns:
+        IngestStats: The stats of the rows loaded by this run; rows committed by
+            earlier runs are counted as skipped.
+    """
+    label = f"{exchange.mic} {'stdin' if is_stdin(path) else path.name}"
+
+    # Standard input cannot be hashed up front, so it is never checkpointed
+    checkpoint = None
+    skipped = 0
+    if not is_stdin(path):
+        checkpoint = get_checkpoint(exchange, path, restart=restart)
+
+        if checkpoint.completed:
+            logger.info("%s: already loaded, skipping", label)
+            return IngestStats(
+                exchange=exchange.mic,
+                skipped=checkpoint.rows,
+                sources=[str(path)],
+            )
+
+        skipped = checkpoint.rows
+        if skipped:
+            logger.info("%s: resuming after %s committed rows", label, skipped)
+
+    load = copy_tickers if use_copy else load_tickers
+    with open_source(path) as source:
+        progress = Progress(label, source.raw, source.size)
+        rows = islice(read_rows(source.text), skipped, None)
+        stats = load(
+            exchange,
+            rows,
+            batch_size=batch_size,
+            checkpoint=checkpoint,
+            progress=progress,
+        )
+        progress.update(stats.rows, force=True)
+
+    if checkpoint is not None:
+        checkpoint.completed = True
+        checkpoint.save(update_fields=["completed", "updated_at"])
+
+    stats.skipped = skipped
+    stats.sources = [str(path)]
+    return stats
+
+
+def ingest_exchange(
+    exchange_pk: str,
+    paths: list[Path],
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    *,
+    use_copy: bool = False,
+    restart: bool = False,
+) -> IngestStats:
+    """
+    Loads every source file of an exchange and returns the combined stats.
+
+    This is the unit of work run by `run_ingestion`, so it only takes picklable
+    arguments.
+
+    Args:
+        exchange_pk (str): The primary key of the exchange the files belong to.
+        paths (list[Path]): The listing files to load, in order.
+        batch_size (int): The number of rows written per batch.
+        use_copy (bool): Whether to load through `copy_tickers`.
+        restart (bool): Whether to ignore the checkpoints and start from scratch.
+
+    Returns:
+        IngestStats: The stats summed over all the files.
+    """
+    exchange = Exchange.objects.get(pk=exchange_pk)
+    stats = IngestStats(exchange=exchange.mic)
+
+    for path in paths:
+        stats.add(
+            ingest_file(
+                exchange,
+                path,
+                batch_size,
+                use_copy=use_copy,
+                restart=restart,
+            ),
+        )
+
+    return stats
+
+
+def _close_connections() -> None:
+    """
+    Drops the database connections inherited from the parent process, so each
+    worker opens its own.
+    """
+    connections.close_all()
+
+
+def run_ingestion(
+    jobs: dict[str, list[Path]],
+    workers: int = 1,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    *,
+    use_copy: bool = False,
+    restart: bool = False,
+) -> Iterator[IngestStats]:
+    """
+    Loads several exchanges, in parallel when `workers` is greater than one.
+
+    Each exchange is handled by a single worker process with its own database
+    connection; results are yielded as soon as an exchange finishes.
+
+    Args:
+        jobs (dict[str, list[Path]]): The source files keyed by exchange primary key.
+        workers (int): The maximum number of worker processes.
+        batch_size (int): The number of rows written per batch.
+        use_copy (bool): Whether to load through `copy_tickers`.
+        restart (bool): Whether to ignore the checkpoints and start from scratch.
+
+    Yields:
+        IngestStats: The stats of each exchange, in completion order.
+    """
+    if workers <= 1 or len(jobs) <= 1:
+        for exchange_pk, paths in jobs.items():
+            yield ingest_exchange(
+                exchange_pk,
+                paths,
+                batch_size,
+                use_copy=use_copy,
+                restart=restart,
+            )
+        return
+
+    # Workers are forked so they inherit the configured Django setup; the parent
+    # connection is closed first so no socket is shared with the children
+    _close_connections()
+    with ProcessPoolExecutor(
+        max_workers=min(workers, len(jobs)),
+        mp_context=multiprocessing.get_context("fork"),
+        initializer=_close_connections,
+    ) as executor:
+        futures = [
+            executor.submit(
+                ingest_exchange,
+                exchange_pk,
+                paths,
+                batch_size,
+                use_copy=use_copy,
+                restart=restart,
+            )
+            for exchange_pk, paths in jobs.items()
+        ]
+        for future in as_completed(futures):
+            yield future.result()
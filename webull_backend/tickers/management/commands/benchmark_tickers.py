@@ -0,0 +1,179 @@
+"""
+This management command is used to benchmark the ticker ingestion paths.
+
+It generates synthetic listing files at the requested scales, loads each of them
+into a scratch exchange through the same code paths as `extract_tickers` (batched
+upserts and `COPY`, into an empty exchange and as a re-sync of unchanged rows) and
+records rows/second, peak RSS and the number of queries issued. Each load commits
+like a real one, and the scratch exchange is deleted afterwards, so nothing is left
+in the database.
+
+The baseline committed in `benchmarks/ingestion.json` was measured against a local
+PostgreSQL; re-measure it with `--update-baseline` on the machine that runs the
+comparison.
+
+The results are compared with a JSON baseline; a case that regresses by more than
+the tolerance fails the run. `--update-baseline` stores the new results instead.
+
+Usage:
+    python manage.py benchmark_tickers [--scale 10k 1m 10m] [--mode upsert copy]
+        [--baseline PATH] [--update-baseline] [--tolerance 0.2]
+
+Example:
+    python manage.py benchmark_tickers --scale 10k 1m --update-baseline
+"""
+
+import tempfile
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from webull_backend.tickers.benchmark import LOADS
+from webull_backend.tickers.benchmark import compare
+from webull_backend.tickers.benchmark import load_baseline
+from webull_backend.tickers.benchmark import parse_scale
+from webull_backend.tickers.benchmark import run_isolated
+from webull_backend.tickers.benchmark import save_baseline
+from webull_backend.tickers.ingest import DEFAULT_BATCH_SIZE
+from webull_backend.tickers.synthetic import write_listing
+
+# Baseline file compared against when --baseline is not given
+DEFAULT_BASELINE = Path(settings.BASE_DIR) / "benchmarks" / "ingestion.json"
+
+
+class Command(BaseCommand):
+    """
+    A management command to benchmark the ticker ingestion paths.
+    """
+
+    help = "Benchmarks ticker ingestion against a JSON baseline"
+
+    def add_arguments(self, parser):
+        """
+        Adds arguments to the command.
+        """
+        parser.add_argument(
+            "--scale",
+            nargs="+",
+            default=["10k"],
+            help="Listing sizes to benchmark, e.g. 10k 1m 10m",
+        )
+        parser.add_argument(
+            "--mode",
+            nargs="+",
+            choices=["upsert", "copy"],
+            default=["upsert", "copy"],
+            help="Ingestion paths to benchmark",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of rows written per batch",
+        )
+        parser.add_argument(
+            "--data-dir",
+            type=Path,
+            help="Directory where the synthetic listings are generated and reused",
+        )
+        parser.add_argument(
+            "--baseline",
+            type=Path,
+            default=DEFAULT_BASELINE,
+            help="JSON file holding the baseline results",
+        )
+        parser.add_argument(
+            "--update-baseline",
+            action="store_true",
+            help="Store the results as the new baseline instead of comparing",
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.2,
+            help="Allowed relative drop in throughput or growth in peak RSS",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Handles the command by running every case and checking for regressions.
+
+        Args:
+            options (dict): The parsed command arguments
+
+        Returns:
+            None
+        """
+        try:
+            scales = [parse_scale(scale) for scale in options["scale"]]
+        except ValueError as e:
+            raise CommandError(str(e)) from e
+
+        with tempfile.TemporaryDirectory() as temporary_dir:
+            data_dir = options["data_dir"] or Path(temporary_dir)
+            data_dir.mkdir(parents=True, exist_ok=True)
+
+            results = []
+            for rows in scales:
+                path = data_dir / f"listing-{rows}.csv"
+                if not path.exists():
+                    self.stdout.write(f"Generating {rows} rows into {path}...")
+                    write_listing(path, rows)
+
+                for mode in options["mode"]:
+                    for load in LOADS:
+                        result = run_isolated(
+                            f"{rows}/{mode}/{load}",
+                            path,
+                            load,
+                            options["batch_size"],
+                            use_copy=mode == "copy",
+                        )
+                        results.append(result)
+                        self.write_result(result)
+
+        if options["update_baseline"]:
+            save_baseline(options["baseline"], results)
+            self.stdout.write(
+                self.style.SUCCESS(f"Baseline written to {options['baseline']}"),
+            )
+            return
+
+        baseline = load_baseline(options["baseline"])
+        if not baseline:
+            self.stdout.write(
+                self.style.WARNING(
+                    f"No baseline at {options['baseline']}, nothing to compare",
+                ),
+            )
+            return
+
+        regressions = [
+            regression
+            for result in results
+            for regression in compare(
+                result,
+                baseline.get(result.case),
+                options["tolerance"],
+            )
+        ]
+        if regressions:
+            msg = "Ingestion benchmark regressed:\n" + "\n".join(regressions)
+            raise CommandError(msg)
+
+        self.stdout.write(self.style.SUCCESS("No regression against the baseline"))
+
+    def write_result(self, result):
+        """
+        Prints the measurements of a single case.
+
+        Args:
+            result (BenchmarkResult): The measurements
+        """
+        self.stdout.write(
+            f"{result.case:<28} {result.rows:>10} rows {result.seconds:>9.2f}s "
+            f"{result.rows_per_second:>10.0f} rows/s "
+            f"{result.peak_rss_mb:>8.1f} MB {result.queries:>8} queries",
+        )
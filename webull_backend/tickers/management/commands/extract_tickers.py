@@ -1,32 +1,63 @@
 """
-This management command is used to extract tickers from a CSV file.
+This management command is used to extract tickers from CSV files.
 It creates or updates exchanges in the database if they do not exist,
-and then populates the Ticker model with data from the CSV file.
+and then populates the Ticker model with data from each exchange's CSV files.
+
+The source files of each exchange come from the `TICKER_SOURCES` setting and can be
+overridden with `--source MIC=PATH`; a path may be a glob pattern matching several
+files. Files may be gzip, bzip2, xz or zstd compressed and are decompressed as a
+stream. A trailing `-` reads the listing of a single exchange from standard input.
+
+The CSV files are read lazily and the tickers are upserted in batches on
+`(exchange, symbol)`, one statement and one transaction per batch, so re-running the
+command only touches rows that changed.
+
+With `--copy` the rows are streamed through PostgreSQL's `COPY FROM STDIN` into a
+staging table and merged in a single statement, which is the fastest way to load
+multi-million-row reference files.
+
+With `--workers N` up to N exchanges are loaded at the same time, each in its own
+process with its own database connection.
+
+A checkpoint is stored after every committed batch, keyed on the SHA-256 of the
+source file, so re-running the command after a crash skips the rows that were
+already committed and files that were fully loaded. `--restart` ignores the
+checkpoints. Progress (rows done, rows/s and ETA) is logged while loading.
 
 Usage:
-    python manage.py extract_tickers <exchanges>
+    python manage.py extract_tickers <exchanges> [--source MIC=PATH ...]
+        [--workers N] [--batch-size N] [--copy] [--restart]
 
 Where `<exchanges>` is a comma-separated list of exchange MICs
 (e.g. NYSE, NASDAQ, etc.).
 
-Example:
-    python manage.py extract_tickers NYSE,NASDAQ
+Examples:
+    python manage.py extract_tickers NYSE,NASDAQ,ARCA,OTC --workers 4
+    zcat nyse.csv.gz | python manage.py extract_tickers NYSE -
 """
 
-import csv
+import time
 
+from django.conf import settings
 from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+from django.db import connection
+from django.db.backends.postgresql.psycopg_any import is_psycopg3
 
 from webull_backend.exchanges.models import Exchange
-from webull_backend.tickers.models import Ticker
+from webull_backend.tickers.ingest import DEFAULT_BATCH_SIZE
+from webull_backend.tickers.ingest import STDIN
+from webull_backend.tickers.ingest import IngestStats
+from webull_backend.tickers.ingest import resolve_sources
+from webull_backend.tickers.ingest import run_ingestion
 
 
 class Command(BaseCommand):
     """
-    A management command to extract tickers from a CSV file.
+    A management command to extract tickers from CSV files.
     """
 
-    help = "Extracts tickers from a CSV file"
+    help = "Extracts tickers from CSV files"
 
     def add_arguments(self, parser):
         """
@@ -39,12 +70,43 @@ class Command(BaseCommand):
             "exchanges",
             nargs="+",
             type=str,
-            help="A comma-separated list of exchange MICs",
+            help="A comma-separated list of exchange MICs, optionally followed by "
+            "- to read a single exchange from standard input",
+        )
+        parser.add_argument(
+            "--source",
+            action="append",
+            default=[],
+            metavar="MIC=PATH",
+            help="Source file or glob pattern for an exchange (repeatable)",
+        )
+        parser.add_argument(
+            "--workers",
+            type=int,
+            default=1,
+            help="Number of exchanges loaded in parallel",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of rows written per upsert statement and transaction",
+        )
+        parser.add_argument(
+            "--copy",
+            action="store_true",
+            help="Load the rows through COPY FROM STDIN and a staging table",
+        )
+        parser.add_argument(
+            "--restart",
+            action="store_true",
+            help="Ignore stored checkpoints and load every file from the first row",
         )
 
     def handle(self, *args, **options):
         """
-        Handles the command by extracting tickers from a CSV file.
+        Handles the command by extracting tickers from the CSV files of each
+        exchange.
 
         Args:
             options (dict): The parsed command arguments
@@ -53,48 +115,158 @@ class Command(BaseCommand):
             None
         """
 
-        # Iterate over each exchange specified in the argument
-        for exchange in options["exchanges"]:
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            msg = "--batch-size must be a positive integer"
+            raise CommandError(msg)
+
+        if options["copy"] and (connection.vendor != "postgresql" or not is_psycopg3):
+            msg = "--copy requires PostgreSQL with psycopg 3"
+            raise CommandError(msg)
+
+        sources = self.get_sources(options["source"])
+        exchanges = self.get_exchanges(options["exchanges"])
+
+        if STDIN in exchanges:
+            exchanges.remove(STDIN)
+            if len(exchanges) != 1:
+                msg = "Reading from standard input requires exactly one exchange"
+                raise CommandError(msg)
+            sources[exchanges[0].upper()] = STDIN
+
+        # Resolve the exchange and source files of each MIC before loading anything
+        jobs = {}
+        for exchange in exchanges:
+            pattern = sources.get(exchange.upper())
+            if pattern is None:
+                msg = f'No source file configured for exchange "{exchange}"'
+                raise CommandError(msg)
+
             try:
-                # Try to get the Exchange instance with the given MIC
-                exchange_mic = Exchange.objects.get(mic=exchange)
-            except Exchange.DoesNotExist:
-                # If it does not exist, create a new one and save it
-                self.stdout.write(
-                    self.style.WARNING(
-                        'Exchange "%s" does not exist. Creating...' % exchange,
-                    ),
-                )
-                exchange_mic = Exchange.objects.create(
-                    mic=exchange,
-                    status="active",
-                )
-                exchange_mic.save()
-
-            # Open the CSV file and read its contents
-            with open(
-                "/app/webull_backend/tickers/management/commands/nyse.csv",
-            ) as csv_file:
-                csv_reader = csv.reader(csv_file, delimiter=",")
-                line_count = 0
-
-                # Iterate over each row in the CSV file
-                for row in csv_reader:
-                    # Create a new Ticker instance with data from the CSV row
-                    ticker = Ticker.objects.create(
-                        exchange=exchange_mic,
-                        company_name=row[0][:50],
-                        symbol=row[1][:50].strip(),
-                        status="active",
-                    )
-                    ticker.save()
-
-                # Print the number of lines processed
-                print(f"Processed {line_count} lines.")
+                paths = resolve_sources(pattern)
+            except FileNotFoundError as e:
+                raise CommandError(str(e)) from e
+
+            jobs[self.get_exchange(exchange).pk] = paths
+
+        started = time.perf_counter()
+        results = []
+        for stats in run_ingestion(
+            jobs,
+            workers=options["workers"],
+            batch_size=batch_size,
+            use_copy=options["copy"],
+            restart=options["restart"],
+        ):
+            results.append(stats)
 
             # Print a success message for each exchange
             self.stdout.write(
                 self.style.SUCCESS(
-                    "Successfully finished extracting data for %s " % exchange,
+                    f"Successfully finished extracting data for {stats.exchange} "
+                    f"from {len(stats.sources)} file(s)",
+                ),
+            )
+
+        self.write_summary(results, time.perf_counter() - started)
+
+    def get_sources(self, overrides):
+        """
+        Returns the source pattern of each exchange, keyed by upper-case MIC.
+
+        Args:
+            overrides (list): `MIC=PATH` values given with `--source`
+
+        Returns:
+            dict: The `TICKER_SOURCES` setting updated with the overrides
+        """
+        sources = {mic.upper(): path for mic, path in settings.TICKER_SOURCES.items()}
+        for override in overrides:
+            mic, separator, path = override.partition("=")
+            if not separator or not mic or not path:
+                msg = f'Invalid --source "{override}", expected MIC=PATH'
+                raise CommandError(msg)
+            sources[mic.upper()] = path
+        return sources
+
+    def get_exchanges(self, values):
+        """
+        Splits the positional arguments into a list of unique exchange MICs.
+
+        Args:
+            values (list): The positional arguments, each possibly comma-separated
+
+        Returns:
+            list: The exchange MICs in the order they were given
+        """
+        exchanges = []
+        for value in values:
+            for exchange in value.split(","):
+                if exchange.strip() and exchange.strip() not in exchanges:
+                    exchanges.append(exchange.strip())
+        return exchanges
+
+    def get_exchange(self, exchange):
+        """
+        Returns the Exchange with the given MIC, creating it if it does not exist.
+
+        Args:
+            exchange (str): The exchange MIC
+
+        Returns:
+            Exchange: The existing or newly created exchange
+        """
+        try:
+            # Try to get the Exchange instance with the given MIC
+            return Exchange.objects.get(mic=exchange)
+        except Exchange.DoesNotExist:
+            # If it does not exist, create a new one and save it
+            self.stdout.write(
+                self.style.WARNING(
+                    f'Exchange "{exchange}" does not exist. Creating...',
                 ),
             )
+            return Exchange.objects.create(
+                mic=exchange,
+                status="active",
+            )
+
+    def write_summary(self, results: list[IngestStats], elapsed: float):
+        """
+        Prints rows, changes, skipped rows, elapsed time and throughput per
+        exchange and in total.
+
+        Args:
+            results (list): The stats of each loaded exchange
+            elapsed (float): The wall-clock time of the whole run, in seconds
+        """
+        header = (
+            f"{'Exchange':<10} {'Rows':>10} {'Inserted':>10} {'Updated':>10} "
+            f"{'Unchanged':>10} {'Skipped':>10} {'Seconds':>9} {'Rows/s':>10}"
+        )
+        self.stdout.write(header)
+        self.stdout.write("-" * len(header))
+
+        total = IngestStats(exchange="Total")
+        for stats in sorted(results, key=lambda stats: stats.exchange):
+            self.write_summary_row(stats)
+            total.add(stats)
+
+        # The total throughput is measured against wall-clock time, which is what
+        # parallel workers reduce
+        total.elapsed = elapsed
+        self.stdout.write("-" * len(header))
+        self.write_summary_row(total)
+
+    def write_summary_row(self, stats: IngestStats):
+        """
+        Prints a single line of the summary table.
+
+        Args:
+            stats (IngestStats): The stats to print
+        """
+        self.stdout.write(
+            f"{stats.exchange:<10} {stats.rows:>10} {stats.inserted:>10} "
+            f"{stats.updated:>10} {stats.unchanged:>10} {stats.skipped:>10} "
+            f"{stats.elapsed:>9.2f} {stats.rows_per_second:>10.0f}",
+        )
@@ -0,0 +1,175 @@
+"""
+This management command is used to reconcile the tickers of an exchange with its
+listing files.
+
+Unlike `extract_tickers`, which upserts every row, it hashes the incoming rows,
+compares them with a hash index of the stored tickers and only writes the
+differences: new symbols are inserted, changed or reappearing symbols are updated
+and active symbols missing from the files are disabled.
+
+Usage:
+    python manage.py reconcile_tickers <exchange> [--source PATH] [--dry-run]
+        [--show N] [--batch-size N] [--force]
+
+Where `<exchange>` is an exchange MIC and `PATH` a file, a glob pattern or `-` for
+standard input, by default taken from the `TICKER_SOURCES` setting. Compressed files
+are decompressed as a stream.
+
+A listing that would disable every active ticker of the exchange, such as an empty
+or truncated file, is refused unless `--force` is given.
+
+Example:
+    python manage.py reconcile_tickers NYSE --dry-run
+"""
+
+from contextlib import ExitStack
+from itertools import chain
+from itertools import islice
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.core.management.base import CommandError
+
+from webull_backend.exchanges.models import Exchange
+from webull_backend.tickers.ingest import DEFAULT_BATCH_SIZE
+from webull_backend.tickers.ingest import open_source
+from webull_backend.tickers.ingest import read_rows
+from webull_backend.tickers.ingest import resolve_sources
+from webull_backend.tickers.reconcile import apply_diff
+from webull_backend.tickers.reconcile import build_index
+from webull_backend.tickers.reconcile import diff_tickers
+
+
+class Command(BaseCommand):
+    """
+    A management command to reconcile the tickers of an exchange with its listing
+    files.
+    """
+
+    help = "Applies only the differences between listing files and stored tickers"
+
+    def add_arguments(self, parser):
+        """
+        Adds arguments to the command.
+
+        Args:
+            exchange (str): An exchange MIC
+        """
+        parser.add_argument(
+            "exchange",
+            type=str,
+            help="The exchange MIC",
+        )
+        parser.add_argument(
+            "--source",
+            help="Source file, glob pattern or - for standard input, instead of "
+            "TICKER_SOURCES",
+        )
+        parser.add_argument(
+            "--dry-run",
+            action="store_true",
+            help="Report the differences without writing them",
+        )
+        parser.add_argument(
+            "--show",
+            type=int,
+            default=50,
+            help="Number of differences listed per kind in the report",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=DEFAULT_BATCH_SIZE,
+            help="Number of rows written per statement",
+        )
+        parser.add_argument(
+            "--force",
+            action="store_true",
+            help="Apply the differences even if they disable every active ticker",
+        )
+
+    def handle(self, *args, **options):
+        """
+        Handles the command by computing and applying the differences.
+
+        Args:
+            options (dict): The parsed command arguments
+
+        Returns:
+            None
+        """
+        batch_size = options["batch_size"]
+        if batch_size < 1:
+            msg = "--batch-size must be a positive integer"
+            raise CommandError(msg)
+
+        mic = options["exchange"]
+        sources = {key.upper(): path for key, path in settings.TICKER_SOURCES.items()}
+        pattern = options["source"] or sources.get(mic.upper())
+        if pattern is None:
+            msg = f'No source file configured for exchange "{mic}"'
+            raise CommandError(msg)
+
+        try:
+            paths = resolve_sources(pattern)
+        except FileNotFoundError as e:
+            raise CommandError(str(e)) from e
+
+        exchange = Exchange.objects.filter(mic=mic).first()
+        index = build_index(exchange) if exchange is not None else {}
+
+        with ExitStack() as stack:
+            opened = [stack.enter_context(open_source(path)) for path in paths]
+            rows = chain.from_iterable(read_rows(source.text) for source in opened)
+            diff = diff_tickers(mic, index, rows)
+
+        self.stdout.write(
+            f"{mic}: {len(diff.inserts)} to insert, {len(diff.updates)} to update, "
+            f"{len(diff.disables)} to disable, {diff.unchanged} unchanged.",
+        )
+
+        if options["dry_run"]:
+            self.write_report(diff, options["show"])
+            return
+
+        if not diff:
+            self.stdout.write(self.style.SUCCESS(f"{mic} is already up to date"))
+            return
+
+        active = sum(entry.active for entry in index.values())
+        if diff.disables and len(diff.disables) == active and not options["force"]:
+            msg = (
+                f"Refusing to disable all {active} active tickers of {mic}: the "
+                "listing shares no symbol with them. Use --force to apply anyway."
+            )
+            raise CommandError(msg)
+
+        if exchange is None:
+            self.stdout.write(
+                self.style.WARNING(f'Exchange "{mic}" does not exist. Creating...'),
+            )
+            exchange = Exchange.objects.create(mic=mic, status="active")
+
+        apply_diff(exchange, diff, batch_size=batch_size)
+        self.stdout.write(
+            self.style.SUCCESS(f"Successfully finished reconciling data for {mic}"),
+        )
+
+    def write_report(self, diff, show):
+        """
+        Prints up to `show` differences of each kind.
+
+        Args:
+            diff (TickerDiff): The differences to report
+            show (int): The maximum number of lines per kind
+        """
+        for prefix, changes in (
+            ("+", diff.inserts),
+            ("~", diff.updates),
+            ("-", diff.disables),
+        ):
+            for symbol in islice(changes, show):
+                name = "" if prefix == "-" else f" {changes[symbol]}"
+                self.stdout.write(f"{prefix} {symbol}{name}")
+            if len(changes) > show:
+                self.stdout.write(f"{prefix} ... and {len(changes) - show} more")
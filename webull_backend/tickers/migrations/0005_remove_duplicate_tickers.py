@@ -0,0 +1,52 @@
+# Generated by Django 5.0.8 on 2026-10-18 13:52
+
+from django.db import migrations
+from django.db.models import Count
+
+
+def remove_duplicate_tickers(apps, schema_editor):
+    """
+    Keep a single ticker per (exchange, symbol) before adding the constraint.
+
+    The survivor is the ticker of the oldest company of the group, or the oldest
+    ticker when none has a company. A ticker has at most one company, so the
+    companies of the other duplicates, which describe the same listing, are
+    deleted with their tickers. No other model references tickers yet.
+    """
+    Ticker = apps.get_model("tickers", "Ticker")
+    Company = apps.get_model("company", "Company")
+
+    duplicates = (
+        Ticker.objects.values("exchange_id", "symbol")
+        .annotate(rows=Count("uuid"))
+        .filter(rows__gt=1)
+    )
+    for duplicate in duplicates.iterator():
+        tickers = Ticker.objects.filter(
+            exchange_id=duplicate["exchange_id"],
+            symbol=duplicate["symbol"],
+        )
+        survivor = (
+            Company.objects.filter(ticker__in=tickers)
+            .order_by("created_at", "uuid")
+            .values_list("ticker_id", flat=True)
+            .first()
+        )
+        if survivor is None:
+            survivor = tickers.order_by("created_at", "uuid").values_list(
+                "uuid",
+                flat=True,
+            )[0]
+        tickers.exclude(uuid=survivor).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('company', '0003_alter_company_name_alter_company_ticker'),
+        ('tickers', '0004_alter_ticker_company_name_alter_ticker_symbol'),
+    ]
+
+    operations = [
+        migrations.RunPython(remove_duplicate_tickers, migrations.RunPython.noop),
+    ]
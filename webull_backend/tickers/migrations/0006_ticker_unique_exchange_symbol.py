@@ -0,0 +1,18 @@
+# Generated by Django 5.0.8 on 2026-10-18 13:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exchanges', '0003_alter_exchange_description_alter_exchange_mic_and_more'),
+        ('tickers', '0005_remove_duplicate_tickers'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='ticker',
+            constraint=models.UniqueConstraint(fields=('exchange', 'symbol'), name='unique_ticker_exchange_symbol'),
+        ),
+    ]
@@ -0,0 +1,32 @@
+# Generated by Django 5.0.8 on 2026-10-18 13:56
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('exchanges', '0003_alter_exchange_description_alter_exchange_mic_and_more'),
+        ('tickers', '0006_ticker_unique_exchange_symbol'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='IngestionCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source_hash', models.CharField(help_text='SHA-256 of the source file', max_length=64)),
+                ('source', models.CharField(blank=True, help_text='Source file', max_length=255)),
+                ('rows', models.PositiveBigIntegerField(default=0)),
+                ('completed', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('exchange', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='exchanges.exchange')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='ingestioncheckpoint',
+            constraint=models.UniqueConstraint(fields=('exchange', 'source_hash'), name='unique_checkpoint_exchange_source_hash'),
+        ),
+    ]
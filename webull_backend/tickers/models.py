@@ -59,6 +59,16 @@ class Ticker(models.Model):
         choices_name="STATUS",  # Use STATUS Choices
     )
 
+    class Meta:
+        constraints = [
+            # A symbol is listed at most once per exchange, so ingestion can upsert
+            # on this pair
+            models.UniqueConstraint(
+                fields=["exchange", "symbol"],
+                name="unique_ticker_exchange_symbol",
+            ),
+        ]
+
     def __str__(self):
         """
         Returns a string representation of this Ticker instance.
@@ -66,3 +76,55 @@ class Ticker(models.Model):
         :return: String representation of the ticker.
         """
         return f"{self.company_name} - {self.symbol}"
+
+
+class IngestionCheckpoint(models.Model):
+    """
+    Tracks how far the ticker ingestion got through a source file, so an
+    interrupted load can resume after the last committed batch.
+    """
+
+    # Exchange the source file is loaded into
+    exchange = models.ForeignKey(
+        Exchange,
+        on_delete=models.CASCADE,  # Cascade delete related Exchange instances
+    )
+
+    # SHA-256 of the source file contents; a modified file starts from scratch
+    source_hash = models.CharField(
+        max_length=64,  # Length of a hex-encoded SHA-256 digest
+        help_text=_("SHA-256 of the source file"),  # Help text for users
+    )
+
+    # Path of the source file when it was last loaded
+    source = models.CharField(
+        max_length=255,  # Maximum length of 255 characters
+        blank=True,  # Allow blank values
+        help_text=_("Source file"),  # Help text for users
+    )
+
+    # Number of parsed rows already committed
+    rows = models.PositiveBigIntegerField(default=0)
+
+    # Whether the whole file has been loaded
+    completed = models.BooleanField(default=False)
+
+    # Timestamps for creation and update
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["exchange", "source_hash"],
+                name="unique_checkpoint_exchange_source_hash",
+            ),
+        ]
+
+    def __str__(self):
+        """
+        Returns a string representation of this IngestionCheckpoint instance.
+
+        :return: String representation of the checkpoint.
+        """
+        return f"{self.source} - {self.rows} rows"
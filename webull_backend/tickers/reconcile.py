@@ -0,0 +1,183 @@
+"""
+Module for reconciling the tickers of an exchange against a listing file.
+
+Instead of upserting every row of the file, the rows are hashed and compared with a
+hash index of the tickers already stored for the exchange. Only the differences are
+written: new symbols are inserted, symbols whose company name changed (or that were
+disabled and reappear) are updated, and active symbols missing from the file are
+disabled.
+"""
+
+import hashlib
+from collections.abc import Iterable
+from dataclasses import dataclass
+from dataclasses import field
+from itertools import batched
+from typing import NamedTuple
+from uuid import UUID
+
+from django.db import transaction
+from django.utils import timezone
+
+from webull_backend.exchanges.models import Exchange
+from webull_backend.tickers.ingest import DEFAULT_BATCH_SIZE
+from webull_backend.tickers.ingest import upsert_tickers
+from webull_backend.tickers.models import Ticker
+from webull_backend.tickers.signals import tickers_written
+
+
+class IndexEntry(NamedTuple):
+    """
+    A stored ticker as seen by the reconciliation.
+    """
+
+    uuid: UUID
+    digest: bytes
+    active: bool
+
+
+@dataclass
+class TickerDiff:
+    """
+    The changes needed to make the stored tickers match a listing file.
+
+    Attributes:
+        inserts: Company names of the symbols missing from the database.
+        updates: New company names of the symbols that changed or are re-enabled.
+        disables: UUIDs of the active symbols missing from the file.
+        unchanged: The number of symbols that already match.
+    """
+
+    inserts: dict[str, str] = field(default_factory=dict)
+    updates: dict[str, str] = field(default_factory=dict)
+    disables: dict[str, UUID] = field(default_factory=dict)
+    unchanged: int = 0
+
+    def __bool__(self) -> bool:
+        """
+        Returns whether there is anything to write.
+        """
+        return bool(self.inserts or self.updates or self.disables)
+
+
+def row_digest(exchange: str, symbol: str, company_name: str) -> bytes:
+    """
+    Returns a 16-byte digest identifying the contents of a ticker row.
+
+    Args:
+        exchange (str): The exchange MIC.
+        symbol (str): The ticker symbol.
+        company_name (str): The company name.
+
+    Returns:
+        bytes: The BLAKE2b digest of the row.
+    """
+    # Separate the fields so that ("AB", "C") and ("A", "BC") differ
+    value = f"{exchange}\x1f{symbol}\x1f{company_name}"
+    return hashlib.blake2b(value.encode(), digest_size=16).digest()
+
+
+def build_index(exchange: Exchange) -> dict[str, IndexEntry]:
+    """
+    Loads a hash index of the tickers stored for an exchange, keyed by symbol.
+
+    Args:
+        exchange (Exchange): The exchange to index.
+
+    Returns:
+        dict[str, IndexEntry]: The UUID, row digest and status of each symbol.
+    """
+    rows = (
+        Ticker.objects.filter(exchange=exchange)
+        .values_list("uuid", "symbol", "company_name", "status")
+        .iterator(chunk_size=DEFAULT_BATCH_SIZE * 10)
+    )
+    return {
+        symbol: IndexEntry(
+            uuid=ticker_uuid,
+            digest=row_digest(exchange.mic, symbol, company_name),
+            active=status == Ticker.STATUS.active,
+        )
+        for ticker_uuid, symbol, company_name, status in rows
+    }
+
+
+def diff_tickers(
+    exchange: str,
+    index: dict[str, IndexEntry],
+    rows: Iterable[tuple[str, str]],
+) -> TickerDiff:
+    """
+    Compares listing rows with a hash index of the stored tickers.
+
+    When a symbol appears several times in the rows the last one wins, as it does
+    for `extract_tickers`.
+
+    Args:
+        exchange (str): The exchange MIC.
+        index (dict[str, IndexEntry]): The index built by `build_index`.
+        rows (Iterable[tuple[str, str]]): The `(company_name, symbol)` pairs.
+
+    Returns:
+        TickerDiff: The inserts, updates and disables to apply.
+    """
+    incoming = {symbol: company_name for company_name, symbol in rows}
+    diff = TickerDiff()
+
+    for symbol, company_name in incoming.items():
+        entry = index.get(symbol)
+        if entry is None:
+            diff.inserts[symbol] = company_name
+            continue
+
+        digest = row_digest(exchange, symbol, company_name)
+        if not entry.active or entry.digest != digest:
+            diff.updates[symbol] = company_name
+        else:
+            diff.unchanged += 1
+
+    for symbol, entry in index.items():
+        if entry.active and symbol not in incoming:
+            diff.disables[symbol] = entry.uuid
+
+    return diff
+
+
+def apply_diff(
+    exchange: Exchange,
+    diff: TickerDiff,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+) -> None:
+    """
+    Writes a diff to the database in a single transaction.
+
+    Inserts and updates go through the same `INSERT ... ON CONFLICT` statement as
+    `extract_tickers`; disabled tickers only get their status and `updated_at`
+    changed.
+
+    Args:
+        exchange (Exchange): The exchange the diff was computed for.
+        diff (TickerDiff): The changes to apply.
+        batch_size (int): The number of rows written per statement.
+    """
+    changes = [
+        (company_name, symbol)
+        for symbol, company_name in (diff.inserts | diff.updates).items()
+    ]
+
+    with transaction.atomic():
+        for batch in batched(changes, batch_size):
+            upsert_tickers(exchange, batch)
+
+        now = timezone.now()
+        for uuids in batched(diff.disables.values(), batch_size):
+            Ticker.objects.filter(pk__in=uuids).update(
+                status=Ticker.STATUS.disabled,
+                updated_at=now,
+            )
+        if diff.disables:
+            tickers_written.send(
+                sender=Ticker,
+                exchange=exchange,
+                symbols=list(diff.disables),
+            )
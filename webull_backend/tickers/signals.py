@@ -0,0 +1,15 @@
+"""
+Module for the signals sent by the bulk ticker writes.
+
+The ingestion and reconciliation helpers write tickers with `INSERT ... ON
+CONFLICT`, `COPY` and `QuerySet.update`, which send no model signals; they send
+`tickers_written` instead, so the caches that depend on tickers can be
+invalidated.
+"""
+
+from django.dispatch import Signal
+
+# Sent with `sender=Ticker` after tickers are inserted or changed in bulk, with the
+# `exchange` they belong to and their `symbols`; `symbols` is None when any ticker
+# of the exchange may have changed. Rows left unchanged are not reported
+tickers_written = Signal()
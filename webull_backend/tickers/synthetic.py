@@ -0,0 +1,75 @@
+"""
+Module for generating synthetic listing files.
+
+The files use the same layout as the exchange listings read by `extract_tickers`
+(`company name, symbol,,`), with unique symbols and deterministic contents for a
+given seed, so benchmark runs are comparable with each other.
+"""
+
+import csv
+import random
+from pathlib import Path
+from string import ascii_uppercase
+
+# Words the synthetic company names are made of
+NAME_WORDS = (
+    "Acme",
+    "American",
+    "Capital",
+    "Consolidated",
+    "Energy",
+    "Financial",
+    "Global",
+    "Holdings",
+    "Industries",
+    "International",
+    "Materials",
+    "Pacific",
+    "Resources",
+    "Systems",
+    "Technologies",
+    "United",
+)
+
+# Suffixes the synthetic company names end with
+NAME_SUFFIXES = ("Inc", "Corp", "Ltd", "PLC", "SA", "Group", "Co")
+
+
+def symbol_for(index: int) -> str:
+    """
+    Returns a unique upper-case symbol for an integer (A, B, ..., Z, AA, AB, ...).
+
+    Args:
+        index (int): A non-negative integer.
+
+    Returns:
+        str: The symbol.
+    """
+    symbol = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, len(ascii_uppercase))
+        symbol = ascii_uppercase[remainder] + symbol
+    return symbol
+
+
+def write_listing(path: Path, rows: int, seed: int = 0) -> Path:
+    """
+    Writes a synthetic listing file with `rows` unique symbols.
+
+    Args:
+        path (Path): The file to write.
+        rows (int): The number of rows to write.
+        seed (int): The seed of the company name generator.
+
+    Returns:
+        Path: The written file.
+    """
+    generator = random.Random(seed)  # noqa: S311
+    with path.open("w", newline="") as listing:
+        writer = csv.writer(listing)
+        for index in range(rows):
+            words = generator.sample(NAME_WORDS, 2)
+            name = f"{words[0]} {words[1]} {generator.choice(NAME_SUFFIXES)}"
+            writer.writerow([name, f" {symbol_for(index)}", "", ""])
+    return path
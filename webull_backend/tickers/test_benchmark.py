@@ -0,0 +1,130 @@
+import io
+import json
+from pathlib import Path
+
+import pytest
+from django.core.management import call_command
+from django.core.management.base import CommandError
+
+from webull_backend.exchanges.models import Exchange
+from webull_backend.tickers.benchmark import BENCHMARK_MIC
+from webull_backend.tickers.benchmark import BenchmarkResult
+from webull_backend.tickers.benchmark import compare
+from webull_backend.tickers.benchmark import drop_benchmark_exchange
+from webull_backend.tickers.benchmark import parse_scale
+from webull_backend.tickers.ingest import read_rows
+from webull_backend.tickers.models import Ticker
+from webull_backend.tickers.synthetic import symbol_for
+from webull_backend.tickers.synthetic import write_listing
+
+
+@pytest.mark.parametrize(
+    ("value", "rows"),
+    [("500", 500), ("10k", 10_000), ("1M", 1_000_000), ("10m", 10_000_000)],
+)
+def test_parse_scale(value: str, rows: int):
+    assert parse_scale(value) == rows
+
+
+@pytest.mark.parametrize("value", ["", "0", "k", "ten"])
+def test_parse_scale_rejects_invalid_values(value: str):
+    with pytest.raises(ValueError, match="invalid literal|Invalid scale"):
+        parse_scale(value)
+
+
+def test_symbol_for():
+    assert [symbol_for(i) for i in (0, 25, 26, 27, 701, 702)] == [
+        "A",
+        "Z",
+        "AA",
+        "AB",
+        "ZZ",
+        "AAA",
+    ]
+
+
+def test_write_listing(tmp_path: Path):
+    count = 1000
+    path = write_listing(tmp_path / "listing.csv", count)
+
+    with path.open(newline="") as listing:
+        rows = list(read_rows(listing))
+
+    assert len(rows) == count
+    assert len({symbol for _, symbol in rows}) == count
+    again = write_listing(tmp_path / "again.csv", count)
+    assert path.read_bytes() == again.read_bytes()
+
+
+def test_compare():
+    baseline = {"rows_per_second": 1000.0, "peak_rss_mb": 100.0, "queries": 10}
+    result = BenchmarkResult("10k/upsert/insert", 10_000, 12.0, 850.0, 115.0, 10)
+
+    assert compare(result, baseline, 0.2) == []
+    assert compare(result, None, 0.2) == []
+
+    result = BenchmarkResult("10k/upsert/insert", 10_000, 20.0, 500.0, 130.0, 11)
+
+    assert compare(result, baseline, 0.2) == [
+        "10k/upsert/insert: 500 rows/s, baseline 1000 rows/s",
+        "10k/upsert/insert: peak RSS 130.0 MB, baseline 100.0 MB",
+        "10k/upsert/insert: 11 queries, baseline 10",
+    ]
+
+
+@pytest.mark.django_db(transaction=True)
+def test_benchmark_tickers(tmp_path: Path):
+    baseline = tmp_path / "baseline.json"
+    out = io.StringIO()
+
+    call_command(
+        "benchmark_tickers",
+        "--scale",
+        "200",
+        "--data-dir",
+        str(tmp_path),
+        "--baseline",
+        str(baseline),
+        "--update-baseline",
+        stdout=out,
+    )
+
+    results = json.loads(baseline.read_text())["results"]
+    assert sorted(results) == [
+        "200/copy/insert",
+        "200/copy/resync",
+        "200/upsert/insert",
+        "200/upsert/resync",
+    ]
+    assert {result["rows"] for result in results.values()} == {200}
+    assert not Exchange.objects.filter(mic=BENCHMARK_MIC).exists()
+    assert not Ticker.objects.exists()
+
+    for result in results.values():
+        result["queries"] = 0
+    baseline.write_text(json.dumps({"version": 1, "results": results}))
+
+    with pytest.raises(CommandError, match="regressed"):
+        call_command(
+            "benchmark_tickers",
+            "--scale",
+            "200",
+            "--data-dir",
+            str(tmp_path),
+            "--baseline",
+            str(baseline),
+            stdout=out,
+        )
+
+
+def test_drop_benchmark_exchange(db):
+    # Left over by an interrupted run
+    exchange = Exchange.objects.create(mic=BENCHMARK_MIC)
+    Ticker.objects.create(exchange=exchange, symbol="AA")
+    other = Exchange.objects.create(mic="XNYS")
+    Ticker.objects.create(exchange=other, symbol="AA")
+
+    drop_benchmark_exchange()
+
+    assert list(Exchange.objects.all()) == [other]
+    assert list(Ticker.objects.values_list("exchange", flat=True)) == [other.pk]
@@ -0,0 +1,298 @@
+import bz2
+import gzip
+import io
+import lzma
+import sys
+from pathlib import Path
+
+import pytest
+import zstandard
+from django.core.management import CommandError
+from django.core.management import call_command
+
+from webull_backend.exchanges.models import Exchange
+from webull_backend.tickers.ingest import Progress
+from webull_backend.tickers.ingest import copy_tickers
+from webull_backend.tickers.ingest import generate_uuids
+from webull_backend.tickers.ingest import get_checkpoint
+from webull_backend.tickers.ingest import ingest_file
+from webull_backend.tickers.ingest import load_tickers
+from webull_backend.tickers.ingest import open_source
+from webull_backend.tickers.ingest import read_rows
+from webull_backend.tickers.ingest import upsert_tickers
+from webull_backend.tickers.models import IngestionCheckpoint
+from webull_backend.tickers.models import Ticker
+
+CSV = (
+    "A H Belo Corporation, AHC,,\n"
+    "A10 Networks Inc, ATEN,,\n"
+    "\n"
+    "No Symbol Inc,,,\n"
+    "AAR Corp, AIR,,\n"
+)
+SYMBOLS = {"AHC", "ATEN", "AIR"}
+
+
+def summary_row(out: io.StringIO, exchange: str) -> list[str]:
+    """Returns the Rows/Inserted/Updated/Unchanged/Skipped columns of a line."""
+    for line in out.getvalue().splitlines():
+        if line.split()[:1] == [exchange]:
+            return line.split()[1:6]
+    raise AssertionError(exchange)
+
+
+@pytest.fixture
+def exchange(db) -> Exchange:
+    return Exchange.objects.create(mic="NYSE")
+
+
+@pytest.fixture
+def source(tmp_path, settings) -> Path:
+    path = tmp_path / "nyse.csv"
+    path.write_text(CSV)
+    settings.TICKER_SOURCES = {"NYSE": str(path)}
+    return path
+
+
+def test_read_rows_skips_rows_without_symbol():
+    assert list(read_rows(io.StringIO(CSV))) == [
+        ("A H Belo Corporation", "AHC"),
+        ("A10 Networks Inc", "ATEN"),
+        ("AAR Corp", "AIR"),
+    ]
+
+
+def test_load_tickers_writes_one_statement_per_batch(
+    exchange: Exchange,
+    django_assert_num_queries,
+):
+    rows = read_rows(io.StringIO(CSV))
+
+    # Two batches, each wrapped in SAVEPOINT/INSERT/RELEASE inside the test
+    # transaction.
+    with django_assert_num_queries(6):
+        stats = load_tickers(exchange, rows, batch_size=2)
+
+    assert (stats.rows, stats.batches) == (3, 2)
+    assert Ticker.objects.filter(exchange=exchange).count() == stats.rows
+
+
+def test_upsert_tickers_only_touches_changed_rows(exchange: Exchange):
+    assert upsert_tickers(exchange, [("Alcoa", "AA"), ("Altria", "MO")]) == (2, 0)
+    untouched = Ticker.objects.get(symbol="MO").updated_at
+
+    assert upsert_tickers(exchange, [("Alcoa Corp", "AA"), ("Altria", "MO")]) == (
+        0,
+        1,
+    )
+    assert set(Ticker.objects.values_list("symbol", flat=True)) == {"AA", "MO"}
+    assert Ticker.objects.get(symbol="AA").company_name == "Alcoa Corp"
+    assert Ticker.objects.get(symbol="MO").updated_at == untouched
+
+
+def test_upsert_tickers_last_duplicate_wins(exchange: Exchange):
+    assert upsert_tickers(exchange, [("Old", "AA"), ("New", "AA")]) == (1, 0)
+    assert Ticker.objects.get(symbol="AA").company_name == "New"
+
+
+def test_generate_uuids():
+    count = 100
+    uuids = generate_uuids(count)
+
+    assert len(set(uuids)) == count
+    assert {value.version for value in uuids} == {4}
+
+
+def test_copy_tickers_merges_staged_rows(exchange: Exchange):
+    upsert_tickers(exchange, [("Alcoa", "AA"), ("Altria", "MO")])
+    rows = [("Alcoa Corp", "AA"), ("Altria", "MO"), ("AT&T", "T"), ("AT&T Inc", "T")]
+
+    stats = copy_tickers(exchange, rows, batch_size=3)
+
+    assert (stats.rows, stats.batches, stats.inserted, stats.updated) == (4, 2, 1, 1)
+    assert dict(Ticker.objects.values_list("symbol", "company_name")) == {
+        "AA": "Alcoa Corp",
+        "MO": "Altria",
+        "T": "AT&T Inc",
+    }
+
+    # The staging table is dropped, so the same connection can load again
+    assert copy_tickers(exchange, rows).unchanged == len(rows)
+
+
+def test_extract_tickers_command(exchange: Exchange, source: Path):
+    out = io.StringIO()
+
+    call_command("extract_tickers", "NYSE", "--batch-size", "2", stdout=out)
+
+    assert summary_row(out, "NYSE") == ["3", "3", "0", "0", "0"]
+    assert set(Ticker.objects.values_list("symbol", flat=True)) == SYMBOLS
+
+
+def test_extract_tickers_copy(exchange: Exchange, source: Path):
+    out = io.StringIO()
+
+    call_command("extract_tickers", "NYSE", "--copy", stdout=out)
+
+    assert summary_row(out, "NYSE") == ["3", "3", "0", "0", "0"]
+    assert set(Ticker.objects.values_list("symbol", flat=True)) == SYMBOLS
+
+
+def test_extract_tickers_is_idempotent(exchange: Exchange, source: Path):
+    call_command("extract_tickers", "NYSE", stdout=io.StringIO())
+    out = io.StringIO()
+
+    call_command("extract_tickers", "NYSE", "--restart", stdout=out)
+
+    assert summary_row(out, "NYSE") == ["3", "0", "0", "3", "0"]
+    assert set(Ticker.objects.values_list("symbol", flat=True)) == SYMBOLS
+
+
+def test_extract_tickers_skips_loaded_files(exchange: Exchange, source: Path):
+    call_command("extract_tickers", "NYSE", stdout=io.StringIO())
+    out = io.StringIO()
+
+    call_command("extract_tickers", "NYSE", stdout=out)
+
+    assert summary_row(out, "NYSE") == ["0", "0", "0", "0", "3"]
+    checkpoint = IngestionCheckpoint.objects.get(exchange=exchange)
+    assert (checkpoint.rows, checkpoint.completed) == (3, True)
+
+
+def test_ingest_file_resumes_after_last_committed_batch(
+    exchange: Exchange,
+    source: Path,
+):
+    checkpoint = get_checkpoint(exchange, source)
+    checkpoint.rows = 2
+    checkpoint.save()
+
+    stats = ingest_file(exchange, source, batch_size=2)
+
+    assert (stats.rows, stats.skipped) == (1, 2)
+    assert list(Ticker.objects.values_list("symbol", flat=True)) == ["AIR"]
+    checkpoint.refresh_from_db()
+    assert (checkpoint.rows, checkpoint.completed) == (3, True)
+
+
+def test_ingest_file_restarts_modified_files(exchange: Exchange, source: Path):
+    ingest_file(exchange, source)
+    source.write_text(CSV + "Alcoa, AA,,\n")
+
+    stats = ingest_file(exchange, source)
+
+    assert (stats.rows, stats.inserted, stats.skipped) == (4, 1, 0)
+    checkpoints = IngestionCheckpoint.objects.filter(exchange=exchange)
+    assert list(checkpoints.values_list("completed", flat=True)) == [True, True]
+
+
+@pytest.mark.parametrize(
+    ("suffix", "compress"),
+    [
+        ("csv", bytes),
+        ("csv.gz", gzip.compress),
+        ("csv.bz2", bz2.compress),
+        ("csv.xz", lzma.compress),
+        ("csv.zst", zstandard.compress),
+    ],
+)
+def test_open_source_decompresses(tmp_path, suffix, compress):
+    path = tmp_path / f"nyse.{suffix}"
+    path.write_bytes(compress(CSV.encode()))
+
+    with open_source(path) as source:
+        assert list(read_rows(source.text))[-1] == ("AAR Corp", "AIR")
+        assert source.size == path.stat().st_size
+        assert source.raw is not None
+        assert source.raw.tell() == source.size
+
+
+def test_extract_tickers_reads_stdin(exchange: Exchange, source: Path, monkeypatch):
+    piped = source.parent / "stdin.csv.gz"
+    piped.write_bytes(gzip.compress(b"AA, AA,,"))
+    stdin = io.TextIOWrapper(piped.open("rb"))
+    monkeypatch.setattr(sys, "stdin", stdin)
+    out = io.StringIO()
+
+    call_command("extract_tickers", "NYSE", "-", stdout=out)
+
+    assert summary_row(out, "NYSE") == ["1", "1", "0", "0", "0"]
+    assert not stdin.closed
+    assert not IngestionCheckpoint.objects.exists()
+
+
+def test_extract_tickers_stdin_requires_one_exchange(source: Path):
+    with pytest.raises(CommandError, match="exactly one exchange"):
+        call_command("extract_tickers", "NYSE,OTC", "-")
+
+
+def test_progress_logs_eta(caplog):
+    stream = io.BytesIO(b"x" * 100)
+    progress = Progress("NYSE nyse.csv", stream, total_bytes=100)
+    stream.seek(25)
+
+    with caplog.at_level("INFO"):
+        progress.update(10, force=True)
+
+    assert "NYSE nyse.csv: 10 rows done" in caplog.text
+    assert "25%, ETA" in caplog.text
+
+
+def test_extract_tickers_source_globs(exchange: Exchange, source: Path):
+    (source.parent / "otc-1.csv").write_text("Alcoa, AA,,\n")
+    (source.parent / "otc-2.csv").write_text("Altria, MO,,\nAT&T, T,,\n")
+    out = io.StringIO()
+
+    call_command(
+        "extract_tickers",
+        "NYSE,otc",
+        "--source",
+        f"OTC={source.parent / 'otc-*.csv'}",
+        stdout=out,
+    )
+
+    output = out.getvalue()
+    assert 'Exchange "otc" does not exist' in output
+    assert "finished extracting data for otc from 2 file(s)" in output
+    otc = Ticker.objects.filter(exchange__mic="otc")
+    nyse = Ticker.objects.filter(exchange__mic="NYSE")
+    assert set(otc.values_list("symbol", flat=True)) == {"AA", "MO", "T"}
+    assert set(nyse.values_list("symbol", flat=True)) == SYMBOLS
+
+
+def test_extract_tickers_requires_a_source(source: Path):
+    with pytest.raises(CommandError, match="No source file configured"):
+        call_command("extract_tickers", "NASDAQ")
+
+
+def test_extract_tickers_rejects_missing_files(source: Path):
+    with pytest.raises(CommandError, match="No source file matches"):
+        call_command("extract_tickers", "NYSE", "--source", "NYSE=/missing/*.csv")
+
+
+@pytest.mark.django_db(transaction=True)
+def test_extract_tickers_parallel_workers(source: Path):
+    (source.parent / "otc.csv").write_text("Alcoa, AA,,\nAltria, MO,,\n")
+    out = io.StringIO()
+
+    call_command(
+        "extract_tickers",
+        "NYSE",
+        "OTC",
+        "--source",
+        f"OTC={source.parent / 'otc.csv'}",
+        "--workers",
+        "2",
+        stdout=out,
+    )
+
+    assert summary_row(out, "NYSE") == ["3", "3", "0", "0", "0"]
+    assert summary_row(out, "OTC") == ["2", "2", "0", "0", "0"]
+    assert summary_row(out, "Total") == ["5", "5", "0", "0", "0"]
+    symbols = set(Ticker.objects.values_list("symbol", flat=True))
+    assert symbols == SYMBOLS | {"AA", "MO"}
+
+
+def test_extract_tickers_rejects_invalid_batch_size(source: Path):
+    with pytest.raises(CommandError):
+        call_command("extract_tickers", "NYSE", "--batch-size", "0")
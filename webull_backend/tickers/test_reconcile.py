@@ -0,0 +1,110 @@
+import io
+from pathlib import Path
+
+import pytest
+from django.core.management import CommandError
+from django.core.management import call_command
+
+from webull_backend.exchanges.models import Exchange
+from webull_backend.tickers.ingest import upsert_tickers
+from webull_backend.tickers.models import Ticker
+from webull_backend.tickers.reconcile import apply_diff
+from webull_backend.tickers.reconcile import build_index
+from webull_backend.tickers.reconcile import diff_tickers
+
+CSV = "Alcoa Corp, AA,,\nAltria, MO,,\nAT&T, T,,\n"
+
+
+@pytest.fixture
+def exchange(db) -> Exchange:
+    exchange = Exchange.objects.create(mic="NYSE")
+    upsert_tickers(exchange, [("Alcoa", "AA"), ("Altria", "MO"), ("Abbvie", "ABBV")])
+    Ticker.objects.create(
+        exchange=exchange,
+        company_name="AT&T",
+        symbol="T",
+        status=Ticker.STATUS.disabled,
+    )
+    return exchange
+
+
+@pytest.fixture
+def source(tmp_path, settings) -> Path:
+    path = tmp_path / "nyse.csv"
+    path.write_text(CSV)
+    settings.TICKER_SOURCES = {"NYSE": str(path)}
+    return path
+
+
+def test_diff_tickers(exchange: Exchange):
+    rows = [("Alcoa Corp", "AA"), ("Altria", "MO"), ("AT&T", "T"), ("Boeing", "BA")]
+
+    diff = diff_tickers("NYSE", build_index(exchange), rows)
+
+    assert diff.inserts == {"BA": "Boeing"}
+    assert diff.updates == {"AA": "Alcoa Corp", "T": "AT&T"}
+    assert list(diff.disables) == ["ABBV"]
+    assert diff.unchanged == 1
+
+
+def test_apply_diff_only_writes_differences(exchange: Exchange):
+    untouched = Ticker.objects.get(symbol="MO").updated_at
+    rows = [("Alcoa Corp", "AA"), ("Altria", "MO"), ("AT&T", "T"), ("Boeing", "BA")]
+
+    apply_diff(exchange, diff_tickers("NYSE", build_index(exchange), rows))
+
+    assert dict(Ticker.objects.values_list("symbol", "status")) == {
+        "AA": Ticker.STATUS.active,
+        "MO": Ticker.STATUS.active,
+        "T": Ticker.STATUS.active,
+        "BA": Ticker.STATUS.active,
+        "ABBV": Ticker.STATUS.disabled,
+    }
+    assert Ticker.objects.get(symbol="AA").company_name == "Alcoa Corp"
+    assert Ticker.objects.get(symbol="MO").updated_at == untouched
+    assert not diff_tickers("NYSE", build_index(exchange), rows)
+
+
+def test_reconcile_tickers_dry_run(exchange: Exchange, source: Path):
+    out = io.StringIO()
+
+    call_command("reconcile_tickers", "NYSE", "--dry-run", stdout=out)
+
+    assert out.getvalue().splitlines() == [
+        "NYSE: 0 to insert, 2 to update, 1 to disable, 1 unchanged.",
+        "~ AA Alcoa Corp",
+        "~ T AT&T",
+        "- ABBV",
+    ]
+    assert Ticker.objects.get(symbol="AA").company_name == "Alcoa"
+
+
+def test_reconcile_tickers(exchange: Exchange, source: Path):
+    call_command("reconcile_tickers", "NYSE", stdout=io.StringIO())
+    out = io.StringIO()
+
+    call_command("reconcile_tickers", "NYSE", stdout=out)
+
+    assert Ticker.objects.get(symbol="ABBV").status == Ticker.STATUS.disabled
+    assert "NYSE is already up to date" in out.getvalue()
+
+
+def test_reconcile_tickers_refuses_to_disable_everything(
+    exchange: Exchange,
+    source: Path,
+):
+    source.write_text("")
+
+    active = Ticker.objects.filter(status=Ticker.STATUS.active)
+
+    with pytest.raises(CommandError, match="Refusing to disable all 3 active"):
+        call_command("reconcile_tickers", "NYSE", stdout=io.StringIO())
+    assert set(active.values_list("symbol", flat=True)) == {"AA", "MO", "ABBV"}
+
+    call_command("reconcile_tickers", "NYSE", "--force", stdout=io.StringIO())
+    assert not active.exists()
+
+
+def test_reconcile_tickers_rejects_invalid_batch_size(source: Path):
+    with pytest.raises(CommandError, match="positive integer"):
+        call_command("reconcile_tickers", "NYSE", "--batch-size", "0")